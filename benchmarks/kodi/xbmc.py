@@ -0,0 +1,100 @@
+# benchmarks/kodi/xbmc.py
+"""
+Stand-in for Kodi's xbmc module. Builtins and log lines are recorded instead
+of executed; JSON-RPC methods can be answered through JSONRPC_HANDLERS.
+"""
+
+import json
+import time
+import weakref
+
+LOGDEBUG, LOGINFO, LOGWARNING, LOGERROR, LOGFATAL, LOGNONE = 0, 1, 2, 3, 4, 5
+
+# Uitgevoerde builtins en logregels, in volgorde
+BUILTINS = []
+LOG      = []
+
+INFOLABELS = {}
+CONDITIONS = {}
+
+# JSON-RPC methode -> callable(params) die het 'result' teruggeeft
+JSONRPC_HANDLERS = {}
+
+# Bestand dat de speler 'afspeelt'; leeg betekent niets
+PLAYING_FILE = ''
+
+_monitors = weakref.WeakSet()
+_abort = False
+
+def reset():
+    global PLAYING_FILE, _abort
+    del BUILTINS[:]
+    del LOG[:]
+    PLAYING_FILE = ''
+    _abort = False
+
+def log(msg, level=LOGDEBUG):
+    LOG.append((level, msg))
+
+def executebuiltin(command, wait=False):
+    BUILTINS.append(command)
+
+def executeJSONRPC(request):
+    req = json.loads(request)
+    method, params = req.get('method'), req.get('params', {})
+    if method == 'JSONRPC.NotifyAll':
+        for m in list(_monitors):
+            m.onNotification(params.get('sender', ''), 'Other.' + params.get('message', ''),
+                             json.dumps(params.get('data')))
+        return json.dumps({'id': req.get('id'), 'jsonrpc': '2.0', 'result': 'OK'})
+    handler = JSONRPC_HANDLERS.get(method)
+    if handler is None:
+        return json.dumps({'id': req.get('id'), 'jsonrpc': '2.0',
+                           'error': {'code': -32601, 'message': 'Method not found.'}})
+    return json.dumps({'id': req.get('id'), 'jsonrpc': '2.0', 'result': handler(params)})
+
+def getInfoLabel(label):
+    return INFOLABELS.get(label, '')
+
+def getCondVisibility(condition):
+    return CONDITIONS.get(condition, False)
+
+def sleep(ms):
+    time.sleep(ms / 1000.0)
+
+def abort():
+    global _abort
+    _abort = True
+
+class Monitor:
+    def __init__(self):
+        _monitors.add(self)
+
+    def abortRequested(self):
+        return _abort
+
+    def waitForAbort(self, timeout=0):
+        if timeout:
+            time.sleep(timeout)
+        return _abort
+
+    def onNotification(self, sender, method, data):
+        pass
+
+    def onSettingsChanged(self):
+        pass
+
+class Player:
+    def isPlaying(self):
+        return bool(PLAYING_FILE)
+
+    def isPlayingVideo(self):
+        return bool(PLAYING_FILE)
+
+    def isPlayingAudio(self):
+        return False
+
+    def getPlayingFile(self):
+        if not PLAYING_FILE:
+            raise RuntimeError("Kodi is not playing any media file")
+        return PLAYING_FILE
@@ -0,0 +1,85 @@
+# benchmarks/kodi/xbmcaddon.py
+"""
+Stand-in for Kodi's xbmcaddon. Addon info comes from the addon.xml of this
+repository and setting defaults from resources/settings.xml; SETTINGS holds
+the overrides, seeded from the JSON in $KODI_SETTINGS for child processes.
+"""
+
+import os
+import json
+import xml.etree.ElementTree as ET
+
+ADDON_PATH = os.environ.get('KODI_ADDON_PATH') or os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Overschreven instellingen, setting-id -> waarde
+SETTINGS = json.loads(os.environ.get('KODI_SETTINGS') or '{}')
+
+_info = None
+_defaults = None
+
+def _load():
+    global _info, _defaults
+    root = ET.parse(os.path.join(ADDON_PATH, 'addon.xml')).getroot()
+    _info = {
+        'id':      root.get('id'),
+        'name':    root.get('name'),
+        'version': root.get('version'),
+        'author':  root.get('provider-name'),
+        'path':    ADDON_PATH,
+        'profile': f"special://profile/addon_data/{root.get('id')}/",
+    }
+    _defaults = {}
+    settings = os.path.join(ADDON_PATH, 'resources', 'settings.xml')
+    if os.path.exists(settings):
+        for s in ET.parse(settings).getroot().iter('setting'):
+            if s.get('id'):
+                _defaults[s.get('id')] = s.get('default', '')
+
+class Addon:
+    def __init__(self, id=None):
+        if _info is None:
+            _load()
+
+    def getAddonInfo(self, key):
+        return _info.get(key, '')
+
+    def getLocalizedString(self, id):
+        return ''
+
+    def _raw(self, key):
+        if key in SETTINGS:
+            return SETTINGS[key]
+        return _defaults.get(key, '')
+
+    def getSetting(self, key):
+        value = self._raw(key)
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value)
+
+    def getSettingString(self, key):
+        return self.getSetting(key)
+
+    def getSettingBool(self, key):
+        value = self._raw(key)
+        if isinstance(value, str):
+            return value.lower() == 'true'
+        return bool(value)
+
+    def getSettingInt(self, key):
+        value = self._raw(key)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise TypeError(f"Invalid setting type for {key}")
+
+    def setSetting(self, key, value):
+        SETTINGS[key] = value
+
+    setSettingString = setSetting
+    setSettingBool   = setSetting
+    setSettingInt    = setSetting
+
+    def openSettings(self):
+        pass
@@ -0,0 +1,160 @@
+# benchmarks/kodi/xbmcgui.py
+"""
+Stand-in for Kodi's xbmcgui. Dialogs never block: they return scripted
+answers queued with answer(), or a default, and every call is counted.
+Child processes get their queue from the JSON in $KODI_ANSWERS.
+"""
+
+import os
+import json
+from collections import Counter, defaultdict, deque
+
+NOTIFICATION_INFO    = 'info'
+NOTIFICATION_WARNING = 'warning'
+NOTIFICATION_ERROR   = 'error'
+
+INPUT_ALPHANUM, INPUT_NUMERIC, INPUT_DATE, INPUT_TIME, INPUT_IPADDRESS, INPUT_PASSWORD = range(6)
+
+# Aantal aanroepen per dialoogsoort
+CALLS = Counter()
+
+# Laatste meldingen (heading, message); begrensd zodat grote batches geen geheugen vreten
+NOTIFICATIONS = deque(maxlen=1000)
+
+_answers = defaultdict(deque)
+for _kind, _values in json.loads(os.environ.get('KODI_ANSWERS') or '{}').items():
+    _answers[_kind].extend(_values)
+_windows = defaultdict(dict)
+
+def answer(kind, *values):
+    """
+    Queue answers for the next `kind` dialogs ('select', 'yesno', 'multiselect', ...).
+    """
+    _answers[kind].extend(values)
+
+def reset():
+    CALLS.clear()
+    NOTIFICATIONS.clear()
+    _answers.clear()
+    _windows.clear()
+
+def _reply(kind, default):
+    CALLS[kind] += 1
+    queue = _answers[kind]
+    return queue.popleft() if queue else default
+
+class Dialog:
+    def notification(self, heading, message, icon=NOTIFICATION_INFO, time=5000, sound=True):
+        CALLS['notification'] += 1
+        NOTIFICATIONS.append((heading, message))
+
+    def ok(self, heading, message):
+        return _reply('ok', True)
+
+    def yesno(self, heading, message, *args, **kwargs):
+        return _reply('yesno', True)
+
+    def select(self, heading, options, *args, **kwargs):
+        return _reply('select', 0 if options else -1)
+
+    def multiselect(self, heading, options, *args, **kwargs):
+        default = kwargs.get('preselect') or list(range(len(options)))
+        return _reply('multiselect', default)
+
+    def textviewer(self, heading, text, usemono=False):
+        _reply('textviewer', None)
+
+    def input(self, heading, defaultt='', type=INPUT_ALPHANUM, option=0, autoclose=0):
+        return _reply('input', defaultt)
+
+    def numeric(self, type, heading, defaultt='', bHiddenInput=False):
+        return _reply('numeric', defaultt)
+
+    def browse(self, type, heading, shares, *args, **kwargs):
+        return _reply('browse', '')
+
+class DialogProgress:
+    def create(self, heading, message=''):
+        CALLS['progress'] += 1
+
+    def update(self, percent, message=''):
+        CALLS['progress_update'] += 1
+
+    def iscanceled(self):
+        return _reply('iscanceled', False)
+
+    def close(self):
+        pass
+
+class DialogProgressBG:
+    def create(self, heading, message=''):
+        CALLS['progress_bg'] += 1
+        self._finished = False
+
+    def update(self, percent=0, heading=None, message=None):
+        CALLS['progress_bg_update'] += 1
+
+    def isFinished(self):
+        return getattr(self, '_finished', True)
+
+    def close(self):
+        self._finished = True
+
+class Window:
+    def __init__(self, existingWindowId=-1):
+        self._props = _windows[existingWindowId]
+
+    def setProperty(self, key, value):
+        self._props[key.lower()] = value
+
+    def getProperty(self, key):
+        return self._props.get(key.lower(), '')
+
+    def clearProperty(self, key):
+        self._props.pop(key.lower(), None)
+
+    def clearProperties(self):
+        self._props.clear()
+
+class ListItem:
+    def __init__(self, label='', label2='', path='', offscreen=False):
+        self._label = label
+        self._label2 = label2
+        self._path = path
+        self._props = {}
+        self.art = {}
+        self.info = {}
+        self.context_menu = []
+
+    def getLabel(self):
+        return self._label
+
+    def setLabel(self, label):
+        self._label = label
+
+    def getLabel2(self):
+        return self._label2
+
+    def setLabel2(self, label):
+        self._label2 = label
+
+    def getPath(self):
+        return self._path
+
+    def setPath(self, path):
+        self._path = path
+
+    def setProperty(self, key, value):
+        self._props[key.lower()] = value
+
+    def getProperty(self, key):
+        return self._props.get(key.lower(), '')
+
+    def setArt(self, values):
+        self.art.update(values)
+
+    def setInfo(self, type, infoLabels):
+        self.info.update(infoLabels)
+
+    def addContextMenuItems(self, items, replaceItems=False):
+        self.context_menu.extend(items)
@@ -0,0 +1,42 @@
+# benchmarks/kodi/xbmcplugin.py
+"""
+Stand-in for Kodi's xbmcplugin; directory items are collected in ITEMS.
+"""
+
+SORT_METHOD_NONE     = 0
+SORT_METHOD_LABEL    = 1
+SORT_METHOD_DATE     = 3
+SORT_METHOD_SIZE     = 4
+SORT_METHOD_FILE     = 5
+SORT_METHOD_UNSORTED = 40
+
+# (url, listitem, isFolder) van de laatste listing
+ITEMS = []
+ENDED = []
+
+def reset():
+    del ITEMS[:]
+    del ENDED[:]
+
+def addDirectoryItem(handle, url, listitem, isFolder=False, totalItems=0):
+    ITEMS.append((url, listitem, isFolder))
+    return True
+
+def addDirectoryItems(handle, items, totalItems=0):
+    ITEMS.extend(items)
+    return True
+
+def endOfDirectory(handle, succeeded=True, updateListing=False, cacheToDisc=True):
+    ENDED.append(succeeded)
+
+def addSortMethod(handle, sortMethod, labelMask='', label2Mask=''):
+    pass
+
+def setContent(handle, content):
+    pass
+
+def setPluginCategory(handle, category):
+    pass
+
+def setResolvedUrl(handle, succeeded, listitem):
+    pass
@@ -0,0 +1,237 @@
+# benchmarks/kodi/xbmcvfs.py
+"""
+Stand-in for Kodi's xbmcvfs, backed by the real filesystem.
+
+special://profile/ and special://home/ map to $KODI_PROFILE and $KODI_HOME.
+Network shares are simulated through MOUNTS ('smb://bench/movies' -> a local
+folder). translatePath leaves those paths alone, like Kodi does, so the addon
+takes its VFS code paths for them. set_latency() adds a delay to every call
+on a path prefix, with an optional spin-up delay after the disk sat idle.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+from collections import Counter
+
+PROFILE = os.environ.get('KODI_PROFILE') or os.path.join(tempfile.gettempdir(), 'kodi-standin', 'userdata')
+HOME    = os.environ.get('KODI_HOME') or os.path.join(tempfile.gettempdir(), 'kodi-standin', 'home')
+
+# VFS-prefix -> lokale map, bv. {'smb://bench/movies': '/tmp/bench/nas/movies'}
+MOUNTS = {}
+
+# Aantal aanroepen per functie, voor de rapportage van de benchmarks
+CALLS = Counter()
+
+_rules = []
+_last_access = {}
+_lock = threading.Lock()
+
+def set_latency(prefix, per_call=0.0, spinup=0.0, idle=30.0):
+    """
+    Delay every call on a path under `prefix` by `per_call` seconds. When the
+    prefix was not touched for `idle` seconds the next call also waits `spinup`.
+    """
+    _rules.append((prefix, per_call, spinup, idle))
+
+def parse_latency(spec):
+    """
+    Apply a latency spec: 'prefix=ms[/spinup_ms[/idle_s]]', comma separated.
+    """
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        prefix, _, values = part.rpartition('=')
+        nums = [float(v) for v in values.split('/')]
+        per_call = nums[0] / 1000.0
+        spinup   = nums[1] / 1000.0 if len(nums) > 1 else 0.0
+        idle     = nums[2] if len(nums) > 2 else 30.0
+        set_latency(prefix, per_call, spinup, idle)
+
+def clear_latency():
+    del _rules[:]
+    _last_access.clear()
+
+def reset():
+    CALLS.clear()
+    _last_access.clear()
+
+def _delay(name, path):
+    CALLS[name] += 1
+    for prefix, per_call, spinup, idle in _rules:
+        if not path.startswith(prefix):
+            continue
+        now = time.monotonic()
+        with _lock:
+            last = _last_access.get(prefix)
+            _last_access[prefix] = now
+        if spinup and (last is None or now - last >= idle):
+            time.sleep(spinup)
+        if per_call:
+            time.sleep(per_call)
+
+def translatePath(path):
+    for special, real in (('special://profile/', PROFILE), ('special://home/', HOME)):
+        if path.startswith(special):
+            return os.path.join(real, path[len(special):])
+    if path in ('special://profile', 'special://home'):
+        return PROFILE if path.endswith('profile') else HOME
+    return path
+
+def _real(path):
+    path = translatePath(path)
+    for prefix, real in MOUNTS.items():
+        if path == prefix or path.startswith(prefix.rstrip('/') + '/'):
+            return real + path[len(prefix.rstrip('/')):]
+    return path
+
+def listdir(path):
+    _delay('listdir', path)
+    dirs, files = [], []
+    try:
+        real = _real(path)
+        with os.scandir(real) as it:
+            for de in it:
+                (dirs if de.is_dir() else files).append(de.name)
+    except OSError:
+        pass
+    return dirs, files
+
+def exists(path):
+    _delay('exists', path)
+    real = _real(path)
+    if real.endswith('/') and len(real) > 1:
+        return os.path.isdir(real)
+    return os.path.exists(real)
+
+def copy(src, dst):
+    _delay('copy', src)
+    _delay('copy', dst)
+    try:
+        shutil.copyfile(_real(src), _real(dst))
+        return True
+    except OSError:
+        return False
+
+def rename(src, dst):
+    _delay('rename', src)
+    try:
+        # Net als Kodi: hernoemen tussen twee shares of schijven lukt niet
+        if _mount_of(src) != _mount_of(dst):
+            return False
+        os.rename(_real(src), _real(dst))
+        return True
+    except OSError:
+        return False
+
+def _mount_of(path):
+    for prefix in MOUNTS:
+        if path.startswith(prefix):
+            return prefix
+    return None
+
+def delete(path):
+    _delay('delete', path)
+    try:
+        os.remove(_real(path))
+        return True
+    except OSError:
+        return False
+
+def rmdir(path, force=False):
+    _delay('rmdir', path)
+    try:
+        if force:
+            shutil.rmtree(_real(path))
+        else:
+            os.rmdir(_real(path))
+        return True
+    except OSError:
+        return False
+
+def mkdir(path):
+    _delay('mkdir', path)
+    try:
+        os.mkdir(_real(path))
+        return True
+    except OSError:
+        return False
+
+def mkdirs(path):
+    _delay('mkdirs', path)
+    try:
+        os.makedirs(_real(path), exist_ok=True)
+        return True
+    except OSError:
+        return False
+
+def makeLegalFilename(path):
+    return path
+
+class Stat:
+    """
+    Kodi returns zeros for a path that does not exist; so does this.
+    """
+
+    def __init__(self, path):
+        _delay('stat', path)
+        try:
+            self._st = os.stat(_real(path))
+        except OSError:
+            self._st = None
+
+    def _get(self, field):
+        return int(getattr(self._st, field)) if self._st else 0
+
+    def st_size(self):
+        return self._get('st_size')
+
+    def st_mtime(self):
+        return self._get('st_mtime')
+
+    def st_atime(self):
+        return self._get('st_atime')
+
+    def st_ctime(self):
+        return self._get('st_ctime')
+
+    def st_mode(self):
+        return self._get('st_mode')
+
+class File:
+    def __init__(self, path, mode='r'):
+        _delay('file_open', path)
+        self._path = path
+        self._f = open(_real(path), 'wb' if mode == 'w' else 'rb')
+
+    def read(self, n=-1):
+        return self.readBytes(n).decode('utf-8', 'replace')
+
+    def readBytes(self, n=-1):
+        _delay('file_read', self._path)
+        return bytearray(self._f.read(n) if n and n > 0 else self._f.read())
+
+    def write(self, data):
+        _delay('file_write', self._path)
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._f.write(data)
+        return True
+
+    def size(self):
+        return os.fstat(self._f.fileno()).st_size
+
+    def seek(self, offset, whence=0):
+        return self._f.seek(offset, whence)
+
+    def tell(self):
+        return self._f.tell()
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
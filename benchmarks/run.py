@@ -0,0 +1,367 @@
+# benchmarks/run.py
+"""
+Benchmarks for the fileops, batch and ui hot paths, run outside Kodi against
+the stand-in modules in benchmarks/kodi and a synthetic library.
+
+    python3 benchmarks/run.py --files 10000 100000 --save baseline.json
+    python3 benchmarks/run.py --files 10000 --baseline baseline.json
+
+Every benchmark runs --repeat times and reports the best and median time.
+With --baseline, a result more than --threshold slower than the saved best
+time is reported as a regression and the exit code is 1. --latency adds a
+delay to stand-in VFS calls, e.g. 'smb://bench=5' for a slow share or
+'/mnt/usb=0/2000/30' for a disk that takes 2 s to spin up after 30 s idle.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+
+# Share waarnaar process_batch verplaatst; via de VFS, net als een NAS
+SHARE = "smb://bench/movies"
+
+BENCHMARKS = []
+
+def benchmark(name):
+    """
+    Register a benchmark. The function gets the Context and returns
+    (setup, run, check); setup and check may be None. setup runs untimed
+    before every repeat, after the stand-in was reset, so answers it queues
+    are used by run. check runs after the last repeat and returns an error
+    or None.
+    """
+    def wrap(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return wrap
+
+class Context:
+    def __init__(self, workdir, files, roots):
+        self.workdir = workdir
+        self.files   = files
+        self.roots   = roots
+
+    def configure(self, **overrides):
+        import xbmcaddon
+        from modules.settings import reload_settings
+        xbmcaddon.SETTINGS.clear()
+        xbmcaddon.SETTINGS.update(
+            path1=self.roots['movies_int'], path2=self.roots['movies_ext'],
+            tvpath1=self.roots['tv_int'], tvpath2=self.roots['tv_ext'],
+            use_thumbnails=True, allow_delete=True, use_custom_action=False)
+        xbmcaddon.SETTINGS.update(overrides)
+        reload_settings()
+
+    def movie_folders(self):
+        root = self.roots['movies_int']
+        return sorted(os.path.join(root, n) for n in os.listdir(root))
+
+def _reset_standin():
+    import xbmc, xbmcgui, xbmcplugin, xbmcvfs
+    for m in (xbmc, xbmcgui, xbmcplugin, xbmcvfs):
+        m.reset()
+
+def _counters():
+    """
+    Stand-in call counts shown next to each result, taken from the timed run only.
+    """
+    import xbmc, xbmcgui, xbmcvfs
+    return {
+        'vfs_calls':     sum(xbmcvfs.CALLS.values()),
+        'refreshes':     xbmc.BUILTINS.count('Container.Refresh'),
+        'notifications': xbmcgui.CALLS['notification'],
+    }
+
+@benchmark("gather_all_files")
+def bench_gather(ctx):
+    from modules.fileops import gather_all_files
+    found = []
+
+    def run():
+        found[:] = [len(gather_all_files(r)) for r in ctx.roots.values()]
+
+    def check():
+        if sum(found) < ctx.files * 0.9:
+            return f"found only {sum(found)} files"
+    return None, run, check
+
+@benchmark("list_folder_cold")
+def bench_list_cold(ctx):
+    import xbmcplugin
+    from modules.cache import listing_cache
+    from modules.ui import list_folder
+    root = ctx.roots['movies_int']
+
+    def setup():
+        ctx.configure(page_size=0)
+        listing_cache.invalidate(root)
+
+    def check():
+        expected = len(os.listdir(root))
+        if len(xbmcplugin.ITEMS) != expected:
+            return f"listed {len(xbmcplugin.ITEMS)} of {expected} entries"
+    return setup, lambda: list_folder(root), check
+
+@benchmark("list_folder_warm")
+def bench_list_warm(ctx):
+    from modules.ui import list_folder
+    root = ctx.roots['movies_int']
+
+    def setup():
+        ctx.configure(page_size=0)
+        list_folder(root)
+    return setup, lambda: list_folder(root), None
+
+@benchmark("add_to_batch_bulk")
+def bench_add_bulk(ctx):
+    from modules.batch import get_store, add_to_batch
+    store = get_store()
+    paths = ctx.movie_folders()
+
+    def check():
+        if store.count() != len(paths):
+            return f"batch holds {store.count()} of {len(paths)} items"
+    return lambda: store.replace([]), lambda: add_to_batch(paths, 'move'), check
+
+@benchmark("add_to_batch_single")
+def bench_add_single(ctx):
+    from modules.batch import get_store, add_to_batch
+    store = get_store()
+    paths = ctx.movie_folders()[:200]
+
+    def run():
+        for p in paths:
+            add_to_batch(p, 'move')
+    return lambda: store.replace([]), run, None
+
+@benchmark("bulk_select")
+def bench_bulk_select(ctx):
+    from modules.bulk import parse_filter, select
+    flt = parse_filter("ext:nfo,srt")
+    found = []
+
+    def run():
+        found[:] = [m for r in ctx.roots.values() for m in select(r, flt)]
+
+    def check():
+        if not found:
+            return "no sidecar files selected"
+    return None, run, check
+
+@benchmark("copy_dir")
+def bench_copy_dir(ctx):
+    from modules.fileops import copy_dir
+    from benchmarks.synth import make_payload, count_files
+    base = os.path.join(ctx.workdir, 'copy')
+    src, dst = os.path.join(base, 'src'), os.path.join(base, 'dst')
+    n = max(50, ctx.files // 200)
+    shutil.rmtree(base, ignore_errors=True)
+    make_payload(src, 1, n, 64)
+    src = os.path.join(src, 'Payload 00000')
+
+    def setup():
+        ctx.configure()
+        shutil.rmtree(dst, ignore_errors=True)
+
+    def check():
+        if count_files(dst) != n:
+            return f"copied {count_files(dst)} of {n} files"
+    return setup, lambda: copy_dir(src, dst), check
+
+@benchmark("process_batch")
+def bench_process_batch(ctx):
+    import xbmcgui, xbmcvfs
+    from modules.batch import get_store, process_batch
+    from benchmarks.synth import make_payload, count_files
+    store = get_store()
+    base = os.path.join(ctx.workdir, 'batch')
+    internal, nas = os.path.join(base, 'int'), os.path.join(base, 'nas')
+    # Eén op per bestand van de bibliotheek, zodat --files ook de batchgrootte schaalt
+    per_folder = 100
+    folders = max(5, ctx.files // per_folder)
+    xbmcvfs.MOUNTS[SHARE] = nas
+
+    def setup():
+        shutil.rmtree(base, ignore_errors=True)
+        os.makedirs(nas)
+        paths = make_payload(internal, folders, per_folder, 1)
+        ctx.configure(path1=internal, path2=SHARE)
+        store.replace([(p, 'move') for p in paths])
+        # "Yes to All"
+        xbmcgui.answer('select', 2)
+
+    def check():
+        if count_files(nas) != folders * per_folder:
+            return f"moved {count_files(nas)} of {folders * per_folder} files"
+    return setup, lambda: process_batch(None), check
+
+# Plugin-aanroepen zoals Kodi ze doet, voor de opstartmetingen
+STARTUP_ROUTES = [
+    ("python",          None),
+    ("menu",            ""),
+    ("section",         "?section=movies"),
+    ("folder",          "?path={folder}"),
+    ("batchlist",       "?section=batchlist"),
+    ("addtobatch",      "?addtobatch={movie}&action=move"),
+    ("removefrombatch", "?removefrombatch={movie}&action=move"),
+    ("processbatch",    "?processbatch=1"),
+    # Contextmenu-acties; {missing} bestaat niet, zodat de bibliotheek heel blijft
+    ("move",            "?move={missing}&type=file"),
+    ("delete",          "?delete={missing}"),
+    ("moveto",          "?moveto={missing}&type=file"),
+    ("batchselect",     "?batchselect={movie}"),
+    ("bulkaction",      "?bulkaction=1&path={movie}"),
+    ("dedup",           "?dedup=1"),
+    ("customaction",    "?customaction=1"),
+]
+
+# Antwoorden voor de dialogen van een aanroep; de dubbelzoeker stopt bij de
+# eerste controle, anders meet hij het hashen van de hele testbibliotheek
+STARTUP_ANSWERS = {
+    "dedup": {"iscanceled": [True, True]},
+}
+
+_BOOT = ("import sys, runpy; sys.argv = [sys.argv[1], '1', sys.argv[2]]; "
+         "runpy.run_path('default.py', run_name='__main__')")
+
+def _startup(route, query):
+    """
+    Time one plugin call of default.py in a fresh interpreter, as Kodi starts
+    one per call. 'python' times a bare interpreter with the same environment.
+    """
+    def bench(ctx):
+        import xbmcaddon
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(HERE, 'kodi'), REPO]),
+                   KODI_SETTINGS=json.dumps(xbmcaddon.SETTINGS),
+                   KODI_ANSWERS=json.dumps(STARTUP_ANSWERS.get(route, {})))
+        movie = ctx.movie_folders()[0]
+        if query is None:
+            cmd = [sys.executable, '-c', 'pass']
+        else:
+            q = query.format(folder=ctx.roots['movies_int'], movie=movie,
+                             missing=os.path.join(ctx.roots['movies_int'], 'Missing Movie.mkv'))
+            cmd = [sys.executable, '-c', _BOOT, f"plugin://{xbmcaddon.Addon().getAddonInfo('id')}/", q]
+        result = []
+
+        def run():
+            p = subprocess.run(cmd, cwd=REPO, env=env, capture_output=True, text=True)
+            result[:] = [p.returncode, p.stderr.strip().splitlines()[-1:] ]
+
+        def check():
+            if result and result[0] != 0:
+                return f"exit {result[0]}: {result[1]}"
+        return None, run, check
+    return bench
+
+for _route, _query in STARTUP_ROUTES:
+    benchmark(f"startup_{_route}")(_startup(_route, _query))
+
+def run_suite(files, args):
+    from benchmarks.synth import make_library
+    t = time.perf_counter()
+    roots = make_library(os.path.join(args.workdir, f'library-{files}'), files)
+    print(f"\n== {files} files (library ready in {time.perf_counter() - t:.1f}s)")
+    ctx = Context(args.workdir, files, roots)
+    results = {}
+    for name, fn in BENCHMARKS:
+        if args.only and name not in args.only:
+            continue
+        ctx.configure()
+        setup, run, check = fn(ctx)
+        times = []
+        for _ in range(args.repeat):
+            _reset_standin()
+            if setup:
+                setup()
+            before = _counters()
+            t = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - t)
+            counts = {k: v - before[k] for k, v in _counters().items()}
+        error = check() if check else None
+        results[f"{name}@{files}"] = dict(best=min(times), median=statistics.median(times),
+                                          error=error, **counts)
+    return results
+
+def compare(results, baseline, threshold, min_delta):
+    """
+    Print the results next to the baseline; return the keys that regressed.
+    """
+    regressions = []
+    print(f"\n{'benchmark':32} {'best':>9} {'median':>9} {'baseline':>9} {'change':>8}  vfs/refresh/notify")
+    for key, r in results.items():
+        saved = baseline.get(key, {})
+        base = saved.get('best') if not saved.get('error') else None
+        change, mark = "", ""
+        if base:
+            delta = r['best'] - base
+            change = f"{100 * delta / base:+.0f}%"
+            if delta > base * threshold and delta > min_delta:
+                regressions.append(key)
+                mark = "  REGRESSION"
+        if r['error']:
+            mark += f"  FAILED: {r['error']}"
+        base_s = f"{base:.3f}s" if base else "-"
+        print(f"{key:32} {r['best']:8.3f}s {r['median']:8.3f}s {base_s:>9} {change:>8}  "
+              f"{r['vfs_calls']}/{r['refreshes']}/{r['notifications']}{mark}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, nargs='+', default=[10000],
+                        help="library sizes to run (default 10000)")
+    parser.add_argument('--only', nargs='+', help="run only these benchmarks")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'batchman-bench'),
+                        help="where libraries are built; reused between runs")
+    parser.add_argument('--latency', default='', help="stand-in VFS latency, 'prefix=ms[/spinup_ms[/idle_s]],...'")
+    parser.add_argument('--baseline', help="compare with this results file")
+    parser.add_argument('--save', help="write the results to this file")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative slowdown counted as a regression (default 0.25)")
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    # Stand-in en addon vindbaar maken voordat er iets uit modules/ geladen wordt
+    os.environ['KODI_PROFILE'] = os.path.join(args.workdir, 'userdata')
+    os.environ['KODI_HOME']    = os.path.join(args.workdir, 'home')
+    sys.path[:0] = [os.path.join(HERE, 'kodi'), REPO]
+    import xbmcaddon
+    import xbmcvfs
+    addon = xbmcaddon.Addon()
+    os.makedirs(xbmcvfs.translatePath(addon.getAddonInfo('profile')), exist_ok=True)
+    sys.argv = [f"plugin://{addon.getAddonInfo('id')}/", '1', '']
+    if args.latency:
+        xbmcvfs.parse_latency(args.latency)
+
+    results = {}
+    for files in args.files:
+        results.update(run_suite(files, args))
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'latency': args.latency,
+                       'repeat': args.repeat, 'results': results}, f, indent=2)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+    failed = [k for k, r in results.items() if r['error']]
+    return 1 if regressions or failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
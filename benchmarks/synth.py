@@ -0,0 +1,97 @@
+# benchmarks/synth.py
+"""
+Synthetic media libraries for the benchmarks.
+
+make_library() lays out movie folders and TV shows with the usual sidecar
+files. Video files are sparse, so a 100k-file library with terabytes of
+apparent size costs only inodes. make_payload() writes small folders with
+real data for the copy and move benchmarks.
+"""
+
+import os
+import json
+import time
+import random
+
+MOVIE_FILES = ("{t}.mkv", "{t}.nfo", "poster.jpg", "{t}.en.srt")
+EPISODES_PER_SEASON = 10
+SEASONS_PER_SHOW    = 5
+
+GB = 1024 ** 3
+
+def _touch(path, size, mtime):
+    with open(path, 'wb') as f:
+        if size:
+            f.truncate(size)
+    os.utime(path, (mtime, mtime))
+
+def make_library(root, files, seed=1):
+    """
+    Create (or reuse) a library of about `files` files below `root`:
+    60% in movie folders, 40% in TV show seasons. Returns the four roots.
+    """
+    roots = {k: os.path.join(root, k) for k in ('movies_int', 'movies_ext', 'tv_int', 'tv_ext')}
+    marker = os.path.join(root, '.synth.json')
+    spec = {'files': files, 'seed': seed}
+    try:
+        with open(marker) as f:
+            if json.load(f) == spec:
+                return roots
+    except (OSError, ValueError):
+        pass
+
+    rnd = random.Random(seed)
+    now = time.time()
+    for r in roots.values():
+        os.makedirs(r, exist_ok=True)
+
+    movies = int(files * 0.6) // len(MOVIE_FILES)
+    for i in range(movies):
+        title = f"Movie {i:06d} ({1950 + i % 75})"
+        base = roots['movies_int' if i % 3 else 'movies_ext']
+        folder = os.path.join(base, title)
+        os.makedirs(folder, exist_ok=True)
+        mtime = now - rnd.uniform(0, 8 * 365 * 86400)
+        for pattern in MOVIE_FILES:
+            name = pattern.format(t=title)
+            size = int(rnd.uniform(1, 60) * GB) if name.endswith('.mkv') else rnd.randint(1000, 400000)
+            _touch(os.path.join(folder, name), size, mtime)
+
+    per_show = SEASONS_PER_SHOW * EPISODES_PER_SEASON * 2
+    shows = max(1, int(files * 0.4) // per_show)
+    for i in range(shows):
+        base = roots['tv_int' if i % 2 else 'tv_ext']
+        show = os.path.join(base, f"Show {i:05d}")
+        for s in range(1, SEASONS_PER_SHOW + 1):
+            season = os.path.join(show, f"Season {s:02d}")
+            os.makedirs(season, exist_ok=True)
+            mtime = now - rnd.uniform(0, 8 * 365 * 86400)
+            for e in range(1, EPISODES_PER_SEASON + 1):
+                stem = f"Show {i:05d} S{s:02d}E{e:02d}"
+                _touch(os.path.join(season, stem + '.mkv'), int(rnd.uniform(0.3, 4) * GB), mtime)
+                _touch(os.path.join(season, stem + '.nfo'), rnd.randint(500, 5000), mtime)
+
+    with open(marker, 'w') as f:
+        json.dump(spec, f)
+    return roots
+
+def make_payload(root, folders, files_per_folder, file_kb):
+    """
+    Write `folders` movie folders with real data below `root`; returns their paths.
+    """
+    block = os.urandom(file_kb * 1024)
+    paths = []
+    for i in range(folders):
+        folder = os.path.join(root, f"Payload {i:05d}")
+        os.makedirs(folder, exist_ok=True)
+        for j in range(files_per_folder):
+            with open(os.path.join(folder, f"part{j:03d}.mkv"), 'wb') as f:
+                f.write(block)
+        paths.append(folder)
+    return paths
+
+def count_files(root):
+    n = 0
+    for _, _, files in os.walk(root):
+        n += len(files)
+    return n
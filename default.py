@@ -1,46 +1,53 @@
 import sys
 import urllib.parse
-import xbmc
-from modules.common  import addon
-from modules.batch   import add_to_batch, remove_from_batch, process_batch
-from modules.fileops import move_item, delete_item, bulk_action
-from modules.ui      import list_main_menu, list_section, list_folder, list_batch
+from importlib import import_module
 
-handle = int(sys.argv[1])
+def _first(args, key, default=None):
+    return args.get(key, [default])[0]
 
-if __name__ == "__main__":
-    args = urllib.parse.parse_qs(sys.argv[2][1:])
-
-    if "addtobatch" in args:
-        add_to_batch(args["addtobatch"][0], args.get("action", [""])[0])
-
-    elif "removefrombatch" in args:
-        remove_from_batch(args["removefrombatch"][0], args.get("action", [""])[0])
-
-    elif "processbatch" in args:
-        process_batch(None)
-
-    elif "move" in args:
-        move_item(args["move"][0], args.get("type", [None])[0])
-
-    elif "delete" in args:
-        delete_item(args["delete"][0], args.get("type", [None])[0])
-
-    elif "bulkaction" in args:
-        bulk_action(args.get("path", [None])[0])
+def _page(args):
+    return int(_first(args, "page", "0"))
 
+def run_custom_action():
     # custom action uitvoeren via xbmc.executebuiltin als ingeschakeld
-    elif "customaction" in args and addon.getSettingBool("use_custom_action"):
-        command = addon.getSettingString("custom_action_command").strip()
-        if command:
-            xbmc.executebuiltin(command)
-
-    elif "section" in args:
-        list_section(args["section"][0])
-
+    from modules.settings import get_settings
+    s = get_settings()
+    command = s.custom_action_command.strip()
+    if s.use_custom_action and command:
+        import xbmc
+        xbmc.executebuiltin(command)
+
+# Query-parameter -> ("module:functie" of functie, argumenten uit de query).
+# De eerste parameter die voorkomt wint; alleen die module wordt geladen,
+# zodat bv. een klik op "Batch Move" niet de hele UI importeert.
+ROUTES = [
+    ("addtobatch",      "modules.batch:add_to_batch",      lambda a: (a["addtobatch"], _first(a, "action", ""))),
+    ("removefrombatch", "modules.batch:remove_from_batch", lambda a: (a["removefrombatch"], _first(a, "action", ""))),
+    ("batchselect",     "modules.ui:select_for_batch",     lambda a: (a["batchselect"][0],)),
+    ("processbatch",    "modules.batch:process_batch",     lambda a: (None,)),
+    ("move",            "modules.fileops:move_item",       lambda a: (a["move"][0], _first(a, "type"))),
+    ("moveto",          "modules.fileops:move_to",         lambda a: (a["moveto"][0], _first(a, "type"))),
+    ("delete",          "modules.fileops:delete_item",     lambda a: (a["delete"][0], _first(a, "type"))),
+    ("dedup",           "modules.ui:find_duplicates",      lambda a: ()),
+    ("rebalance",       "modules.ui:rebalance_storage",    lambda a: ()),
+    ("bulkaction",      "modules.fileops:bulk_action",     lambda a: (_first(a, "path"),)),
+    ("customaction",    run_custom_action,                 lambda a: ()),
+    ("section",         "modules.ui:list_section",         lambda a: (a["section"][0], _page(a))),
+    ("path",            "modules.ui:list_folder",          lambda a: (a["path"][0], _page(a))),
+]
+DEFAULT_ROUTE = ("modules.ui:list_main_menu", lambda a: ())
+
+def dispatch(query):
+    args = urllib.parse.parse_qs(query[1:])
+    for key, target, params in ROUTES:
+        if key in args:
+            break
     else:
-        path = args.get("path", [None])[0]
-        if path:
-            list_folder(path)
-        else:
-            list_main_menu()
+        target, params = DEFAULT_ROUTE
+    if isinstance(target, str):
+        module, _, name = target.partition(":")
+        target = getattr(import_module(module), name)
+    target(*params(args))
+
+if __name__ == "__main__":
+    dispatch(sys.argv[2])
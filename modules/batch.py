@@ -2,47 +2,111 @@
 
 import os
 import json
+import time
+import threading
 import xbmcgui
 import xbmc
 import xbmcvfs
 
-from .common import batch_file, addon, addon_id
-from .fileops import (
-    move_item, delete_item, is_dir,
-    gather_all_files, clean_empty_dirs
-)
+from . import trace, uievents
+from .common import batch_file, journal_file, store_file, addon, addon_id
+from .store import BatchStore
+from .settings import get_settings
+
+# fileops, executor, planner, voortgang en throttle zijn alleen nodig als er echt
+# een batch draait; run_batch laadt ze zelf, zodat een klik op "Batch Move" snel blijft.
 
 # Globale vlag om bevestigingen tijdens batchverwerking te omzeilen.
 BATCH_CONFIRM_ALL = False
 
-# Pad voor lockfile om actieve batchsessie te herkennen
-real_profile = xbmcvfs.translatePath(addon.getAddonInfo('profile'))
-lock_file    = os.path.join(real_profile, 'batch_running.lock')
+# Lockfile om een actieve batchsessie te herkennen; pad pas bij eerste gebruik bepaald
+_lock_file = None
+
+# De eigenaar van de lock raakt hem elke HEARTBEAT_INTERVAL seconden aan;
+# een lock die langer dan STALE_AFTER niet is aangeraakt is achtergebleven na een crash.
+HEARTBEAT_INTERVAL = 10
+STALE_AFTER        = 60
+
+# Window-property waarmee de achtergrondservice laat zien dat hij leeft
+SERVICE_HEARTBEAT = "batchman.service.heartbeat"
+
+# Batchlijst in SQLite; batchlist.json en het oude journaal worden eenmalig gemigreerd
+_store = None
+
+_heartbeat = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = BatchStore(store_file, legacy_files=(batch_file, journal_file))
+    return _store
+
+def lock_path():
+    global _lock_file
+    if _lock_file is None:
+        _lock_file = os.path.join(xbmcvfs.translatePath(addon.getAddonInfo('profile')),
+                                  'batch_running.lock')
+    return _lock_file
 
 def is_running():
+    """
+    True while a batch is running: the lockfile exists and its owner is alive.
+    """
     try:
-        return os.path.exists(lock_file)
+        return time.time() - os.path.getmtime(lock_path()) < STALE_AFTER
     except:
         return False
 
+def _beat(stop):
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        try:
+            os.utime(lock_path(), None)
+        except:
+            # Lock is verwijderd: de batch is gestopt
+            return
+
 def set_running(flag: bool):
+    global _heartbeat
     try:
-        os.makedirs(real_profile, exist_ok=True)
+        os.makedirs(os.path.dirname(lock_path()), exist_ok=True)
+        if _heartbeat:
+            _heartbeat.set()
+            _heartbeat = None
         if flag:
-            with open(lock_file, 'w'):
-                pass
+            with open(lock_path(), 'w') as f:
+                f.write(str(os.getpid()))
+            _heartbeat = threading.Event()
+            threading.Thread(target=_beat, args=(_heartbeat,), daemon=True).start()
         else:
-            if os.path.exists(lock_file):
-                os.remove(lock_file)
+            if os.path.exists(lock_path()):
+                os.remove(lock_path())
     except:
         pass
 
+def service_alive():
+    """
+    True if the background service has reported in recently.
+    """
+    try:
+        beat = float(xbmcgui.Window(10000).getProperty(SERVICE_HEARTBEAT) or 0)
+    except:
+        return False
+    return time.time() - beat < STALE_AFTER
+
+def notify_service(message, data=None):
+    """
+    Send `message` to the background service over JSON-RPC NotifyAll.
+    """
+    xbmc.executeJSONRPC(json.dumps({
+        "jsonrpc": "2.0",
+        "method":  "JSONRPC.NotifyAll",
+        "params":  {"sender": addon_id, "message": message, "data": data or {}},
+        "id":      1,
+    }))
+
 def load_batchlist():
-    if not os.path.exists(batch_file):
-        return []
     try:
-        with open(batch_file, 'r') as f:
-            return json.load(f)
+        return get_store().items()
     except:
         xbmcgui.Dialog().notification("Batch", "Could not load batch list",
                                       xbmcgui.NOTIFICATION_ERROR, 2000)
@@ -50,41 +114,90 @@ def load_batchlist():
 
 def save_batchlist(batchlist):
     try:
-        with open(batch_file, 'w') as f:
-            json.dump(batchlist, f)
+        get_store().replace([(i['path'], i['action'], i.get('target')) for i in batchlist])
     except:
         xbmcgui.Dialog().notification("Batch", "Could not save batch list",
                                       xbmcgui.NOTIFICATION_ERROR, 2000)
 
-def add_to_batch(path, action):
-    bl = load_batchlist()
-    if any(i['path'] == path and i['action'] == action for i in bl):
+def add_to_batch(paths, action):
+    """
+    Add one path or a list of paths to the batch in a single store write.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    try:
+        added = get_store().add_many([(p, action) for p in paths])
+    except:
+        xbmcgui.Dialog().notification("Batch", "Could not save batch list",
+                                      xbmcgui.NOTIFICATION_ERROR, 2000)
+        return 0
+    if not added:
         xbmcgui.Dialog().notification("Batch", "Item already in batch",
                                       xbmcgui.NOTIFICATION_INFO, 2000)
-        return
-    bl.append({'path': path, 'action': action})
-    save_batchlist(bl)
-    xbmcgui.Dialog().notification("Batch", f"Added for {action}",
-                                  xbmcgui.NOTIFICATION_INFO, 2000)
+    elif len(paths) == 1:
+        xbmcgui.Dialog().notification("Batch", f"Added for {action}",
+                                      xbmcgui.NOTIFICATION_INFO, 2000)
+    else:
+        xbmcgui.Dialog().notification("Batch", f"Added {added} items for {action}",
+                                      xbmcgui.NOTIFICATION_INFO, 2000)
+    return added
 
-def remove_from_batch(path, action):
-    bl = load_batchlist()
-    bl = [i for i in bl if not (i['path'] == path and i['action'] == action)]
-    save_batchlist(bl)
+def remove_from_batch(paths, action):
+    if isinstance(paths, str):
+        paths = [paths]
+    try:
+        get_store().remove_many([(p, action) for p in paths])
+    except:
+        xbmcgui.Dialog().notification("Batch", "Could not save batch list",
+                                      xbmcgui.NOTIFICATION_ERROR, 2000)
+        return
     xbmcgui.Dialog().notification("Batch", "Removed item from batch",
                                   xbmcgui.NOTIFICATION_INFO, 2000)
     xbmc.executebuiltin('Container.Refresh')
 
-def process_batch(_):
+def op_devices(op, target=None):
     """
-    Voer alle batch-items uit en – indien ingeschakeld – de custom action achteraf.
+    Devices touched by a batch op: the source, plus the destination for
+    moves, in the Root `target` or the default target.
     """
-    global BATCH_CONFIRM_ALL
+    from .executor import device_of
+    from .fileops import get_counterpart
+    path, action = op
+    devs = {device_of(path)}
+    if action in ('move', 'move_dir'):
+        dest = get_counterpart(path, target)
+        if dest:
+            devs.add(device_of(dest))
+    return devs
 
+def report_results(results, skipped=0):
+    """
+    Show a single summary for a finished batch, listing failed ops if any.
+    """
+    failed = [op for op, ok in results if not ok]
+    done   = len(results) - len(failed)
+    if not failed and not skipped:
+        xbmcgui.Dialog().notification("Batch", f"Batch complete ({done} done)",
+                                      xbmcgui.NOTIFICATION_INFO, 3000)
+        return
+    lines = [f"Done: {done}", f"Failed: {len(failed)}"]
+    if skipped:
+        lines.append(f"Not processed (still in batch list): {skipped}")
+    if failed:
+        lines.append("")
+        lines.extend(f"{a}: {p}" for p, a in failed)
+    xbmcgui.Dialog().textviewer("Batch report", "\n".join(lines))
+
+def process_batch(_):
+    """
+    Vraag hoe de batch verwerkt moet worden en start hem; bij voorkeur in de
+    achtergrondservice, anders direct in deze aanroep.
+    """
     # Haal custom-action instellingen
-    enabled = addon.getSettingBool("use_custom_action")
-    label   = addon.getSettingString("custom_action_label").strip()
-    command = addon.getSettingString("custom_action_command").strip()
+    settings = get_settings()
+    enabled  = settings.use_custom_action
+    label    = settings.custom_action_label.strip()
+    command  = settings.custom_action_command.strip()
     use_custom = enabled and label and command
 
     # Als er al een proces draait
@@ -93,6 +206,7 @@ def process_batch(_):
         if choice == 1:
             if xbmcgui.Dialog().yesno("Stop Batch Process", "Are you sure you want to stop the batch process?"):
                 set_running(False)
+                notify_service("stop")
                 xbmcgui.Dialog().notification("Batch", "Batch process stopped",
                                               xbmcgui.NOTIFICATION_INFO, 2000)
         return
@@ -111,63 +225,195 @@ def process_batch(_):
     if choice in (-1, 0):
         return
 
-    update_after      = (choice == 3 and use_custom)
-    BATCH_CONFIRM_ALL = (choice >= 2)
+    options = {'confirm_all': choice >= 2, 'update_after': bool(choice == 3 and use_custom)}
+
+    # Bij voorkeur in de achtergrondservice, zodat deze aanroep direct terugkeert
+    if service_alive():
+        get_store().add_job(options)
+        notify_service("wake")
+        xbmcgui.Dialog().notification("Batch", "Batch started in background",
+                                      xbmcgui.NOTIFICATION_INFO, 2000)
+        return
+
+    run_batch(**options)
+
+def run_batch(confirm_all=False, update_after=False):
+    """
+    Plan and execute the current batch list, then run the custom action if asked.
+    Runs in the background service, or inline when the service is not available.
+    """
+    global BATCH_CONFIRM_ALL
+    from .executor import run_ops
+    from .fileops import (
+        move_item, delete_item, clean_empty_dirs, get_counterpart,
+        get_move_destination
+    )
+    from .planner import expand_item, plan_capacity
+    from .progress import BatchProgress
+    from .throttle import Throttle, Stopped, lower_io_priority
+    from .library import ChangeSet, refresh_library
+
+    original = load_batchlist()
+    if not original or is_running():
+        return
+    store = get_store()
+
+    command = get_settings().custom_action_command.strip()
+    BATCH_CONFIRM_ALL = confirm_all
     set_running(True)
+    rec = trace.begin("batch")
+    stats = {}
+    try:
+        monitor = xbmc.Monitor()
 
-    # Verzamel operaties en mappen voor cleanup
-    ops = []
-    dirs_to_cleanup = set()
-    for item in original:
-        p, act = item['path'], item['action']
-        if act == 'move' and is_dir(p):
-            files = gather_all_files(p)
-            if files:
-                dirs_to_cleanup.add(p)
-                for fp in files:
-                    ops.append((fp, 'move'))
-                    dirs_to_cleanup.add(os.path.dirname(fp))
-        elif act == 'delete' and is_dir(p):
-            ops.append((p, 'delete_dir'))
-            dirs_to_cleanup.add(os.path.dirname(p))
-        else:
-            ops.append((p, act))
-            dirs_to_cleanup.add(os.path.dirname(p))
-
-    total     = len(ops)
-    remaining = list(ops)
-
-    # Uitvoeren van de batch
-    for idx, (path, action) in enumerate(ops, start=1):
-        xbmcgui.Dialog().notification(
-            "Batch Process",
-            f"Processing {idx}/{total}: {os.path.basename(path)}",
-            xbmcgui.NOTIFICATION_INFO, 2000
-        )
-        if action == 'move':
-            move_item(path, 'file')
-        elif action == 'delete_dir':
-            delete_item(path, 'dir')
-        else:
-            delete_item(path, 'file')
+        # Verzamel operaties en plan ze binnen de vrije ruimte per schijf
+        with trace.span("batch.plan"):
+            groups = [expand_item(item) for item in original]
+            scheduled, deferred = plan_capacity(groups)
+        if deferred:
+            gb = sum(g.size for g in deferred) / (1024**3)
+            names = ", ".join(os.path.basename(g.item['path']) for g in deferred[:5])
+            if not xbmcgui.Dialog().yesno(
+                    "Not enough free space",
+                    f"{len(deferred)} item(s) ({gb:.1f} GB) do not fit and stay in the batch list:\n"
+                    f"{names}\nProcess the rest?"):
+                stats['cancelled'] = True
+                return
+
+        ops = [op for g in scheduled for op in g.ops]
+        # Het doel van elk item geldt voor al zijn ops
+        targets = {op: g.target for g in scheduled for op in g.ops}
+        dirs_to_cleanup = set()
+        for g in scheduled:
+            dirs_to_cleanup |= g.cleanup
+
+        # Uitgebreide lijst eenmalig vastleggen, met het doel erbij, zodat een hervatte
+        # batch elk bestand naar dezelfde root stuurt; daarna kost elk checkpoint één regel
+        with trace.span("batch.save_list"):
+            root = lambda t: t.path if t else None
+            save_batchlist([{'path': p, 'action': a, 'target': root(targets[(p, a)])} for p, a in ops] +
+                           [dict(g.item, target=root(g.target)) for g in deferred])
+
+        op_sizes = {}
+        for g in scheduled:
+            op_sizes.update(g.op_sizes)
+        move_bytes = sum(op_sizes.get(op, 0) for op in ops if op[1] == 'move')
+        remaining  = [len(ops)]
+        progress   = BatchProgress(len(ops), move_bytes)
+        stopping   = lambda: not is_running() or monitor.abortRequested()
+        devices    = lambda op: op_devices(op, targets.get(op))
+        throttle   = Throttle(should_stop=stopping)
+        throttle.on_pause = progress.set_paused
+        # Ops die tijdens een pauze gestopt zijn; die blijven in de batchlijst staan
+        aborted    = set()
+
+        def run_op(op):
+            path, action = op
+            t0 = time.perf_counter()
+            ok = False
+            try:
+                ok = _run_op(op)
+                return ok
+            finally:
+                trace.op(path, action, time.perf_counter() - t0, ok,
+                         op_sizes.get(op, 0) if action == 'move' else 0)
+
+        def _run_op(op):
+            path, action = op
+            progress.op_started(op, op_sizes.get(op, 0) if action == 'move' else 0)
+            lower_io_priority()
+            with trace.span("store.checkpoint"):
+                store.start(path, action)
+            if action in ('move', 'move_dir'):
+                target = targets.get(op)
+                name   = target.name if target else get_move_destination(path)
+                cb = throttle.wrap(progress.copy_callback(op, name), op_devices(op, target))
+                def verified(src, dst, mode, ok, digest):
+                    store.log('verified' if ok else 'verify_failed', path, action,
+                              {'src': src, 'dst': dst, 'mode': mode, 'sha1': digest})
+                try:
+                    return move_item(path, 'file' if action == 'move' else 'dir', cb, verified, target)
+                except Stopped:
+                    aborted.add(op)
+                    return False
+            elif action == 'delete_dir':
+                return delete_item(path, 'dir')
+            return delete_item(path, 'file')
+
+        def op_done(op, ok):
+            # Aangeroepen onder de lock van de executor
+            progress.op_finished(op, ok)
+            try:
+                with trace.span("store.checkpoint"):
+                    if op in aborted:
+                        store.requeue(*op)
+                    else:
+                        remaining[0] -= 1
+                        store.finish(*op, ok)
+            except:
+                pass
+            uievents.refresh()
+
+        # Uitvoeren van de batch; met bevestiging één op tegelijk, zodat er nooit
+        # twee vragen tegelijk openstaan
+        per_device = max(1, get_settings().per_device_workers) if BATCH_CONFIRM_ALL else 1
+        workers    = None if BATCH_CONFIRM_ALL else 1
+        # Verversen en meldingen bundelen zolang de batch loopt
+        events = uievents.begin()
+        progress.start()
+        try:
+            results = run_ops(ops, run_op, devices, per_device=per_device,
+                              should_stop=stopping, on_done=op_done, workers=workers)
+        finally:
+            progress.close()
+            uievents.end(events)
+        # Afgebroken ops zijn niet mislukt maar nog niet gedaan
+        results = [(op, ok) for op, ok in results if op not in aborted]
+
+        # Opruimen lege directories
+        with trace.span("batch.cleanup"):
+            for d in dirs_to_cleanup:
+                clean_empty_dirs(d)
 
-        remaining.pop(0)
-        save_batchlist([{'path': p, 'action': a} for p, a in remaining])
-        xbmc.executebuiltin('Container.Refresh')
+        # Bijhouden welke mappen de bibliotheek opnieuw moet bekijken
+        ok_ops  = {op for op, ok in results if ok}
+        changes = ChangeSet()
+        for g in scheduled:
+            if any(op in ok_ops for op in g.ops):
+                p, act = g.item['path'], g.item['action']
+                changes.record(p, act, get_counterpart(p, g.target), is_dir=g.is_dir)
+        if changes:
+            store.log('library_changes', detail={'added':   sorted(changes.added),
+                                                 'removed': sorted(changes.removed)})
 
-    # Opruimen lege directories
-    for d in dirs_to_cleanup:
-        clean_empty_dirs(d)
+        # Afronding batch
+        with trace.span("store.compact"):
+            store.compact()
+        with trace.span("ui.report"):
+            report_results(results, remaining[0] + len(deferred))
 
-    # Afronding batch
-    save_batchlist([])
-    xbmcgui.Dialog().notification("Batch", "Batch complete",
-                                  xbmcgui.NOTIFICATION_INFO, 3000)
-    BATCH_CONFIRM_ALL = False
-    set_running(False)
+        # Voer custom actie uit als gekozen; gerichte scans alleen voor wat er veranderd is
+        with trace.span("library.refresh"):
+            if update_after and get_settings().targeted_library_scan:
+                if changes:
+                    refresh_library(changes, command)
+            elif update_after and command:
+                xbmc.executebuiltin(command)
 
-    # Voer custom actie uit als gekozen
-    if update_after:
-        xbmc.executebuiltin(command)
+        stats.update({
+            'ops_total':     len(ops),
+            'ops_failed':    sum(1 for _, ok in results if not ok),
+            'not_run':       remaining[0],
+            'deferred':      len(deferred),
+            'bytes_planned': move_bytes,
+            'per_device':    per_device,
+        })
+    finally:
+        # Ook na een fout mag de lock niet blijven hangen
+        BATCH_CONFIRM_ALL = False
+        set_running(False)
+        trace.end(rec, stats)
 
-    xbmc.executebuiltin(f'Container.Update(plugin://{addon_id})')
\ No newline at end of file
+    # Alleen terugspringen als de gebruiker nog in deze addon bladert
+    if xbmc.getInfoLabel('Container.FolderPath').startswith(f'plugin://{addon_id}'):
+        xbmc.executebuiltin(f'Container.Update(plugin://{addon_id})')
\ No newline at end of file
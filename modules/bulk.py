@@ -0,0 +1,255 @@
+# modules/bulk.py
+
+import os
+import re
+import time
+import shlex
+import fnmatch
+from collections import namedtuple
+
+from .fileops import scan_dir
+from .sizes import folder_sizes
+
+VIDEO_EXTS   = ('.mkv', '.mp4', '.m4v', '.avi', '.mov', '.wmv', '.mpg', '.mpeg',
+                '.ts', '.m2ts', '.vob', '.iso', '.webm', '.divx', '.flv')
+SIDECAR_EXTS = ('.nfo', '.srt', '.sub', '.idx', '.ass', '.ssa', '.smi', '.vtt')
+
+# Deze horen bij de map en niet bij één video
+FOLDER_SIDECARS = ('movie.nfo', 'tvshow.nfo', 'season.nfo')
+
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+AGE_UNITS  = {'': 86400, 'h': 3600, 'd': 86400, 'w': 7 * 86400, 'm': 30 * 86400, 'y': 365 * 86400}
+
+# Vaste filters in het keuzemenu, als (label, filtertekst)
+PRESETS = [
+    ("Orphaned .nfo/.srt files",           "orphans"),
+    ("Titles over 30 GB older than a year", "depth:1 size>30G age>1y"),
+    ("Sample files",                        "type:file name:*sample*"),
+]
+
+# All set terms must match. Sizes are bytes, ages seconds; kind is 'file',
+# 'dir' or None; depth 1 means direct children of the root only.
+Filter = namedtuple("Filter", "names regex exts min_size max_size min_age max_age kind depth orphans")
+
+# One selected entry; size is the folder total for directories.
+Match = namedtuple("Match", "path size is_dir")
+
+_COMPARE = re.compile(r"^(size|age)([<>])(\d+(?:\.\d+)?)([a-z]?)$", re.I)
+
+def parse_filter(text):
+    """
+    Parse a filter such as 'ext:nfo,srt size>1G age>30d'. Terms are
+    name:<glob>, re:<regex>, ext:<list>, size>N / size<N (K, M, G, T),
+    age>N / age<N (h, d, w, m, y), type:file|dir, depth:N and orphans;
+    a bare word is a name glob. Raises ValueError for an unknown term.
+    """
+    # Aanhalingstekens mogen, maar backslashes blijven staan voor re:
+    lexer = shlex.shlex(text or "", posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = ""
+    try:
+        terms = list(lexer)
+    except ValueError as e:
+        raise ValueError(f"Bad filter: {e}")
+    if not terms:
+        raise ValueError("Empty filter")
+    f = dict(names=[], regex=None, exts=(), min_size=None, max_size=None,
+             min_age=None, max_age=None, kind=None, depth=None, orphans=False)
+    for term in terms:
+        m = _COMPARE.match(term)
+        if m:
+            key, op, num, unit = m.group(1).lower(), m.group(2), float(m.group(3)), m.group(4).lower()
+            units = SIZE_UNITS if key == 'size' else AGE_UNITS
+            if unit not in units:
+                raise ValueError(f"Unknown unit in {term}")
+            f[('min_' if op == '>' else 'max_') + key] = num * units[unit]
+            continue
+        key, sep, value = term.partition(':')
+        key = key.lower()
+        if term.lower() == 'orphans':
+            f['orphans'] = True
+        elif not sep:
+            f['names'].append(term.lower())
+        elif key == 'name':
+            f['names'].append(value.lower())
+        elif key == 're':
+            try:
+                f['regex'] = re.compile(value, re.I)
+            except re.error as e:
+                raise ValueError(f"Bad regex: {e}")
+        elif key == 'ext':
+            f['exts'] = tuple('.' + x.strip().lower().lstrip('.') for x in value.split(',') if x.strip())
+        elif key == 'type' and value.lower() in ('file', 'dir'):
+            f['kind'] = value.lower()
+        elif key == 'depth' and value.isdigit() and int(value) > 0:
+            f['depth'] = int(value)
+        else:
+            raise ValueError(f"Unknown filter term: {term}")
+    if f['orphans']:
+        f['kind'] = 'file'
+    return Filter(**f)
+
+def orphans(entries):
+    """
+    Return the paths of sidecar files among one folder's `entries` that
+    belong to no video in that folder.
+    """
+    stems, has_dirs = [], False
+    for e in entries:
+        if e.is_dir:
+            has_dirs = True
+        elif e.name.lower().endswith(VIDEO_EXTS):
+            stems.append(os.path.splitext(e.name)[0].lower() + '.')
+    found = set()
+    for e in entries:
+        name = e.name.lower()
+        if e.is_dir or not name.endswith(SIDECAR_EXTS):
+            continue
+        if name in FOLDER_SIDECARS:
+            if not stems and not has_dirs:
+                found.add(e.path)
+        elif not any(name.startswith(s) for s in stems):
+            found.add(e.path)
+    return found
+
+class _Frame:
+    """
+    One open folder of select(): the totals of what was read below it so
+    far and, for a folder whose own match waits for those totals, the
+    matches found inside it.
+    """
+
+    def __init__(self, path, depth, entry=None, matching=True, candidate=False, counted=False):
+        self.path      = path
+        self.depth     = depth
+        self.entry     = entry
+        self.matching  = matching
+        self.candidate = candidate
+        self.counted   = counted
+        self.size      = 0
+        self.newest    = 0.0
+        self.held      = []
+        self.todo      = None
+
+def select(root, flt, should_stop=None, progress=None):
+    """
+    Yield a Match for every entry below `root` that passes `flt`, in one
+    pass over the tree. A matching folder is yielded as a whole and not
+    descended into. Folder sizes and ages come from the folder-size index
+    or are added up bottom-up by the same pass; matches inside a folder
+    that waits for its totals are held until the folder is decided.
+    progress(count, folder) is called once per folder.
+    """
+    now    = time.time()
+    ranged = any(v is not None for v in (flt.min_size, flt.max_size, flt.min_age, flt.max_age))
+    frames = [_Frame(root.rstrip('/'), 1)]
+    # Open mappen die nog op hun totalen wachten; de bovenste houdt nieuwe matches vast
+    holders = []
+    count   = 0
+    while frames:
+        if should_stop and should_stop():
+            return
+        f = frames[-1]
+        if f.todo is None:
+            try:
+                entries = list(scan_dir(f.path))
+            except:
+                entries = []
+            count += len(entries)
+            if progress:
+                progress(count, f.path)
+            testable = f.matching and (flt.depth is None or f.depth <= flt.depth)
+            deeper   = f.matching and (flt.depth is None or f.depth < flt.depth)
+            lonely   = orphans(entries) if testable and flt.orphans else ()
+            # Mapgroottes uit de index; één query, alleen als er mappen kunnen matchen
+            known    = folder_sizes.children(f.path) if flt.kind != 'file' else {}
+            f.todo   = []
+            for e in entries:
+                if not e.is_dir:
+                    f.size  += e.size
+                    f.newest = max(f.newest, e.mtime or 0)
+                    if testable and _passes(flt, e, lonely) and _in_range(flt, e.size, e.mtime or 0, now):
+                        m = Match(e.path, e.size, False)
+                        if holders:
+                            holders[-1].held.append(m)
+                        else:
+                            yield m
+                    continue
+                s = known.get(e.name)
+                if s:
+                    f.size  += s.bytes
+                    f.newest = max(f.newest, s.newest)
+                passes = testable and _passes(flt, e, lonely)
+                if passes and ranged and not s:
+                    # Totalen onbekend: de map wordt in deze zelfde ronde opgeteld en daarna beoordeeld
+                    f.todo.append((e, deeper, True, False))
+                    continue
+                if passes:
+                    size  = s.bytes if s else 0
+                    mtime = max(e.mtime or 0, s.newest) if s else e.mtime or 0
+                    if not ranged or _in_range(flt, size, mtime, now):
+                        m = Match(e.path, size, True)
+                        if holders:
+                            holders[-1].held.append(m)
+                        else:
+                            yield m
+                        if holders and not s:
+                            # Alleen nog optellen voor een map hoger in de boom
+                            f.todo.append((e, False, False, False))
+                        continue
+                if deeper or (holders and not s):
+                    f.todo.append((e, deeper, False, bool(s)))
+            f.todo.reverse()
+            continue
+        if f.todo:
+            e, matching, candidate, counted = f.todo.pop()
+            child = _Frame(e.path, f.depth + 1, e, matching, candidate, counted)
+            frames.append(child)
+            if candidate:
+                holders.append(child)
+            continue
+
+        frames.pop()
+        if f.candidate:
+            holders.pop()
+            mtime = max(f.entry.mtime or 0, f.newest)
+            found = [Match(f.path, f.size, True)] if _in_range(flt, f.size, mtime, now) else f.held
+            if holders:
+                holders[-1].held.extend(found)
+            else:
+                yield from found
+        if frames and not f.counted:
+            frames[-1].size  += f.size
+            frames[-1].newest = max(frames[-1].newest, f.newest)
+
+def _passes(flt, e, lonely):
+    """
+    Check the terms of `flt` that do not depend on size or age.
+    """
+    name = e.name.lower()
+    if flt.kind and flt.kind != ('dir' if e.is_dir else 'file'):
+        return False
+    if flt.orphans and e.path not in lonely:
+        return False
+    if flt.exts and (e.is_dir or not name.endswith(flt.exts)):
+        return False
+    if flt.names and not any(fnmatch.fnmatchcase(name, n) for n in flt.names):
+        return False
+    if flt.regex and not flt.regex.search(e.name):
+        return False
+    return True
+
+def _in_range(flt, size, mtime, now):
+    """
+    Check the size and age terms of `flt`.
+    """
+    if flt.min_size is not None and size < flt.min_size:
+        return False
+    if flt.max_size is not None and size > flt.max_size:
+        return False
+    age = now - mtime
+    if flt.min_age is not None and age < flt.min_age:
+        return False
+    if flt.max_age is not None and age > flt.max_age:
+        return False
+    return True
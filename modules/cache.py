@@ -0,0 +1,137 @@
+# modules/cache.py
+
+import os
+import json
+import time
+import xbmcvfs
+
+from . import trace
+from .db import Database, settled
+from .common import cache_file
+from .settings import get_settings
+
+# Standaard maximum aantal mappen in de cache
+DEFAULT_MAX_ENTRIES = 2000
+
+def dir_mtime(path):
+    """
+    Return the mtime of a directory through the VFS, or None if it cannot be read.
+    """
+    try:
+        return xbmcvfs.Stat(path).st_mtime()
+    except:
+        return None
+
+class ListingCache(Database):
+    """
+    Persistent cache of directory listings with per-entry mtime and size.
+
+    Entries are keyed by directory path and only served while the directory's
+    own mtime is unchanged. The table is bounded; the least recently used
+    directories are evicted first.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS listings (
+            path  TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            data  TEXT NOT NULL,
+            used  REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS listings_used ON listings (used);
+    """
+    TIMEOUT = 10
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(path)
+        self.max_entries = max_entries
+
+    def get(self, path, mtime):
+        with self.lock:
+            conn = self._db()
+            row = conn.execute("SELECT mtime, data FROM listings WHERE path = ?", (path,)).fetchone()
+            if not row:
+                return None
+            if row[0] != mtime:
+                with conn:
+                    conn.execute("DELETE FROM listings WHERE path = ?", (path,))
+                return None
+            with conn:
+                conn.execute("UPDATE listings SET used = ? WHERE path = ?", (time.time(), path))
+            return json.loads(row[1])
+
+    def put(self, path, mtime, data):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO listings (path, mtime, data, used) VALUES (?, ?, ?, ?)",
+                             (path, mtime, json.dumps(data), time.time()))
+                conn.execute("""
+                    DELETE FROM listings WHERE path IN (
+                        SELECT path FROM listings ORDER BY used DESC LIMIT -1 OFFSET ?)""",
+                             (self.max_entries,))
+
+    def invalidate(self, *paths):
+        """
+        Drop cached listings for `paths` and their parent directories.
+        """
+        keys = set()
+        for p in paths:
+            if not p:
+                continue
+            p = p.rstrip('/')
+            keys.add(p)
+            keys.add(os.path.dirname(p))
+        try:
+            with self.lock:
+                conn = self._db()
+                with conn:
+                    conn.executemany("DELETE FROM listings WHERE path = ?", [(k,) for k in keys])
+        except:
+            pass
+
+    def clear(self):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM listings")
+
+def _max_entries():
+    try:
+        return get_settings().listing_cache_size or DEFAULT_MAX_ENTRIES
+    except:
+        return DEFAULT_MAX_ENTRIES
+
+listing_cache = ListingCache(cache_file, _max_entries())
+
+def list_dir_cached(path):
+    """
+    Return {'dirs': [[name, mtime]], 'files': [[name, mtime, size]]} for `path`,
+    served from the cache while the directory's mtime is unchanged.
+    """
+    key   = path.rstrip('/')
+    mtime = dir_mtime(path)
+    if mtime is not None:
+        try:
+            hit = listing_cache.get(key, mtime)
+            if hit is not None:
+                trace.add("listing.cache_hit")
+                return hit
+        except:
+            pass
+
+    from .fileops import scan_dir
+    trace.add("listing.cache_miss")
+    data = {'dirs': [], 'files': []}
+    with trace.span("listing.scan"):
+        for e in scan_dir(path):
+            if e.is_dir:
+                data['dirs'].append([e.name, e.mtime])
+            else:
+                data['files'].append([e.name, e.mtime, e.size])
+    if settled(mtime):
+        try:
+            listing_cache.put(key, mtime, data)
+        except:
+            pass
+    return data
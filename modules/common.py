@@ -2,7 +2,13 @@ import xbmcaddon
 import xbmcvfs
 import os
 
-addon       = xbmcaddon.Addon()
-addon_id    = addon.getAddonInfo('id')
-profile     = addon.getAddonInfo('profile')
-batch_file  = os.path.join(xbmcvfs.translatePath(profile), "batchlist.json")
\ No newline at end of file
+addon        = xbmcaddon.Addon()
+addon_id     = addon.getAddonInfo('id')
+profile      = addon.getAddonInfo('profile')
+batch_file   = os.path.join(xbmcvfs.translatePath(profile), "batchlist.json")
+journal_file = os.path.join(xbmcvfs.translatePath(profile), "batchlist.journal")
+store_file   = os.path.join(xbmcvfs.translatePath(profile), "batch.db")
+cache_file   = os.path.join(xbmcvfs.translatePath(profile), "cache.db")
+dedup_file   = os.path.join(xbmcvfs.translatePath(profile), "dedup.db")
+sizes_file   = os.path.join(xbmcvfs.translatePath(profile), "sizes.db")
+reports_dir  = os.path.join(xbmcvfs.translatePath(profile), "reports")
\ No newline at end of file
@@ -0,0 +1,51 @@
+# modules/db.py
+
+import os
+import time
+import sqlite3
+import threading
+
+# Een map die net gewijzigd is kan binnen dezelfde seconde nog veranderen;
+# wat er zo kort daarna uit gelezen is, wordt niet als vaste stand bewaard
+SETTLE_SECONDS = 2
+
+class Database:
+    """
+    One SQLite file in the addon profile.
+
+    The connection is opened on first use and shared by all threads; callers
+    hold `lock` around every use of _db(). WAL mode with synchronous=NORMAL
+    makes every write a small crash-safe transaction that readers do not
+    block. Subclasses give their tables in SCHEMA.
+    """
+
+    SCHEMA  = ""
+    TIMEOUT = 30
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = None
+
+    def _db(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.TIMEOUT, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self.conn = conn
+            self._opened()
+        return self.conn
+
+    def _opened(self):
+        """
+        Called once, right after the connection was set up.
+        """
+
+def settled(mtime):
+    """
+    Return True when a folder with this mtime is old enough that what was
+    read from it can be kept.
+    """
+    return mtime is not None and time.time() - mtime > SETTLE_SECONDS
@@ -0,0 +1,144 @@
+# modules/dedup.py
+
+import os
+import hashlib
+
+from .db import Database
+from .fileops import walk, open_reader
+
+# Bestanden kleiner dan dit (nfo, srt, ...) worden niet vergeleken
+MIN_SIZE = 1024 * 1024
+
+# Grootte van de blokken aan begin en eind voor de snelle hash
+BLOCK_SIZE = 1024 * 1024
+
+def partial_hash(path, size):
+    """
+    Hash of the size plus the first and last BLOCK_SIZE bytes.
+    """
+    h = hashlib.sha1(str(size).encode())
+    with open_reader(path) as f:
+        h.update(f.read(BLOCK_SIZE))
+        if size > 2 * BLOCK_SIZE:
+            f.seek(size - BLOCK_SIZE)
+            h.update(f.read(BLOCK_SIZE))
+    return h.hexdigest()
+
+def full_hash(path, bufsize=8 * 1024 * 1024):
+    h = hashlib.sha1()
+    with open_reader(path) as f:
+        while True:
+            chunk = f.read(bufsize)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+class DedupIndex(Database):
+    """
+    Incremental index of file sizes and content hashes across library roots.
+
+    Rows are keyed by path and remember (size, mtime); a hash is only
+    recomputed when either changed. Duplicates are found in stages: equal
+    size, then equal head/tail hash, then equal full hash.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path    TEXT PRIMARY KEY,
+            size    INTEGER NOT NULL,
+            mtime   REAL NOT NULL,
+            partial TEXT,
+            full    TEXT,
+            seen    INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS files_size ON files (size);
+    """
+
+    def scan(self, roots, progress=None, should_stop=None):
+        """
+        Walk `roots` and bring the index up to date; returns the number of files seen.
+        progress(count, path) is called every few hundred files.
+        """
+        count = 0
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("UPDATE files SET seen = 0")
+            batch = []
+            for root in roots:
+                for e in walk(root):
+                    if e.is_dir:
+                        continue
+                    batch.append((e.path, e.size, e.mtime))
+                    count += 1
+                    if len(batch) >= 500:
+                        self._upsert(conn, batch)
+                        batch = []
+                        if progress:
+                            progress(count, e.path)
+                        if should_stop and should_stop():
+                            return count
+            self._upsert(conn, batch)
+            prefixes = [r.rstrip('/') + '/' for r in roots]
+            with conn:
+                # Verdwenen bestanden onder de gescande roots vergeten
+                for prefix in prefixes:
+                    conn.execute("DELETE FROM files WHERE seen = 0 AND substr(path, 1, ?) = ?",
+                                 (len(prefix), prefix))
+        return count
+
+    def _upsert(self, conn, rows):
+        with conn:
+            conn.executemany("""
+                INSERT INTO files (path, size, mtime, seen) VALUES (?, ?, ?, 1)
+                ON CONFLICT(path) DO UPDATE SET
+                    partial = CASE WHEN size = excluded.size AND mtime = excluded.mtime THEN partial END,
+                    full    = CASE WHEN size = excluded.size AND mtime = excluded.mtime THEN full END,
+                    size    = excluded.size,
+                    mtime   = excluded.mtime,
+                    seen    = 1""", rows)
+
+    def _fill(self, column, func, rows, progress=None, should_stop=None):
+        conn = self._db()
+        for i, (path, size) in enumerate(rows):
+            if should_stop and should_stop():
+                return False
+            try:
+                value = func(path, size)
+            except:
+                continue
+            with conn:
+                conn.execute(f"UPDATE files SET {column} = ? WHERE path = ?", (value, path))
+            if progress:
+                progress(i + 1, len(rows), path)
+        return True
+
+    def duplicates(self, min_size=MIN_SIZE, progress=None, should_stop=None):
+        """
+        Return a list of duplicate sets, each a list of (path, size, mtime).
+        """
+        with self.lock:
+            conn = self._db()
+            same_size = """
+                SELECT path, size FROM files WHERE size >= ? AND size IN (
+                    SELECT size FROM files WHERE size >= ? GROUP BY size HAVING COUNT(*) > 1)"""
+            rows = conn.execute(same_size + " AND partial IS NULL", (min_size, min_size)).fetchall()
+            if not self._fill('partial', partial_hash, rows, progress, should_stop):
+                return []
+
+            rows = conn.execute("""
+                SELECT path, size FROM files WHERE full IS NULL AND partial IN (
+                    SELECT partial FROM files WHERE size >= ? AND partial IS NOT NULL
+                    GROUP BY partial HAVING COUNT(*) > 1)""", (min_size,)).fetchall()
+            if not self._fill('full', lambda p, s: full_hash(p), rows, progress, should_stop):
+                return []
+
+            sets = {}
+            for path, size, mtime, full in conn.execute("""
+                    SELECT path, size, mtime, full FROM files WHERE full IN (
+                        SELECT full FROM files WHERE size >= ? AND full IS NOT NULL
+                        GROUP BY full HAVING COUNT(*) > 1)
+                    ORDER BY full, mtime""", (min_size,)):
+                sets.setdefault(full, []).append((path, size, mtime))
+        return list(sets.values())
@@ -0,0 +1,92 @@
+# modules/executor.py
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import xbmcvfs
+
+def device_of(path):
+    """
+    Return an identifier for the device holding `path`: the st_dev of the
+    nearest existing local ancestor, or the share root for VFS-only paths.
+    """
+    real = xbmcvfs.translatePath(path)
+    if "://" in real:
+        scheme, _, rest = real.partition("://")
+        return f"{scheme}://{rest.split('/', 1)[0]}"
+    real = real.rstrip('/') or '/'
+    while True:
+        try:
+            return os.stat(real).st_dev
+        except:
+            parent = os.path.dirname(real)
+            if parent == real:
+                return None
+            real = parent
+
+def run_ops(ops, worker, devices_for, per_device=1, should_stop=None, on_done=None, workers=None):
+    """
+    Run worker(op) for every op on a thread pool.
+    devices_for(op) returns the devices an op touches; at most `per_device`
+    ops run on any one device at a time, so ops on independent disks overlap
+    while a single disk never serves two streams beyond its limit. `workers`
+    caps the number of ops running at once over all devices; 1 runs them
+    strictly one after another.
+    on_done(op, ok) is called (serialised) after every op. Returns a list of
+    (op, ok) in the original order; ops skipped by should_stop() are missing.
+    """
+    per_device = max(1, per_device)
+    # Eén FIFO per apparaatset: alle ops in een rij wachten op dezelfde schijven,
+    # dus alleen de koppen hoeven bekeken te worden
+    queues = {}
+    for i, op in enumerate(ops):
+        devs = tuple(devices_for(op))
+        queues.setdefault(devs, deque()).append((i, op, devs))
+    all_devs = {d for devs in queues for d in devs}
+    busy     = dict.fromkeys(all_devs, 0)
+    results  = [None] * len(ops)
+    cond     = threading.Condition()
+    running  = [0]
+
+    def task(i, op, devs):
+        try:
+            ok = bool(worker(op))
+        except:
+            ok = False
+        with cond:
+            results[i] = (op, ok)
+            for d in devs:
+                busy[d] -= 1
+            running[0] -= 1
+            if on_done:
+                on_done(op, ok)
+            cond.notify_all()
+
+    max_workers = max(1, min(len(ops), per_device * max(1, len(all_devs)), workers or len(ops)))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        with cond:
+            while queues:
+                if should_stop and should_stop():
+                    break
+                if workers and running[0] >= workers:
+                    cond.wait(1.0)
+                    continue
+                # Van de rijen die nu mogen de oudste kop, zodat de volgorde bewaard blijft
+                ready = [q for devs, q in queues.items() if all(busy[d] < per_device for d in devs)]
+                if not ready:
+                    cond.wait(1.0)
+                    continue
+                q = min(ready, key=lambda q: q[0][0])
+                nxt = q.popleft()
+                if not q:
+                    del queues[nxt[2]]
+                for d in nxt[2]:
+                    busy[d] += 1
+                running[0] += 1
+                pool.submit(task, *nxt)
+            while running[0]:
+                cond.wait(1.0)
+
+    return [r for r in results if r is not None]
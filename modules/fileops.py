@@ -1,12 +1,37 @@
 # modules/fileops.py
 
 import os
+import json
+import time
+import stat
 import shutil
+from collections import namedtuple
 import xbmcvfs
 import xbmcgui
 import xbmc
 
-from .common import addon, addon_id
+from . import trace, uievents
+from .common import addon_id
+from .settings import get_settings
+from .router import get_router
+from .cache import listing_cache
+from . import sizes
+
+# Sidecar suffix for the resume journal of an interrupted copy.
+PARTIAL_SUFFIX = ".partial"
+
+# The resume offset is made durable this often, not after every chunk.
+CHECKPOINT_BYTES   = 64 * 1024 * 1024
+CHECKPOINT_SECONDS = 5.0
+
+# Verification of finished copies ('verify_mode' setting).
+VERIFY_OFF, VERIFY_FAST, VERIFY_FULL = 0, 1, 2
+VERIFY_NAMES  = {VERIFY_OFF: "off", VERIFY_FAST: "fast", VERIFY_FULL: "full"}
+SAMPLE_BLOCKS = 8
+SAMPLE_SIZE   = 64 * 1024
+
+# One directory entry as produced by scan_dir/walk.
+Entry = namedtuple("Entry", "path name is_dir size mtime")
 
 def get_free_space(path):
     """
@@ -25,62 +50,49 @@ def get_thumbnail_for_path(path):
     Return a thumbnail path based on your movie/TV locations and settings.
     Respects the 'switch_to_network' boolean to swap external<>network thumbs.
     """
-    if not addon.getSettingBool("use_thumbnails"):
+    s = get_settings()
+    if not s.use_thumbnails:
         return ""
 
-    def local(img):
-        return f"special://home/addons/{addon_id}/resources/media/{img}"
-
-    p1  = addon.getSettingString("path1")
-    p2  = addon.getSettingString("path2")
-    tv1 = addon.getSettingString("tvpath1")
-    tv2 = addon.getSettingString("tvpath2")
-
-    use_net = addon.getSettingBool("switch_to_network")
-
-    if path.startswith(p1):
-        return local("internal_movies.jpg")
-    elif path.startswith(p2):
-        return use_net and local("network_movies.jpg") or local("external_movies.jpg")
-    elif path.startswith(tv1):
-        return local("internal_tvshows.jpg")
-    elif path.startswith(tv2):
-        return use_net and local("network_tvshows.jpg") or local("external_tvshows.jpg")
-    return ""
+    root = get_router().lookup(path)
+    if root is None:
+        return ""
+    kind = "movies" if root.section == "movies" else "tvshows"
+    side = root.side
+    if side == "external" and s.switch_to_network:
+        side = "network"
+    return f"special://home/addons/{addon_id}/resources/media/{side}_{kind}.jpg"
 
 def get_move_destination(path):
     """
-    Determine whether a path will move to Internal or External.
+    Name of the location a path moves to by default (Internal, External or a named root).
     """
-    p1 = addon.getSettingString("path1")
-    p2 = addon.getSettingString("path2")
-    tv1 = addon.getSettingString("tvpath1")
-    tv2 = addon.getSettingString("tvpath2")
-    if path.startswith(p1) or path.startswith(tv1):
-        return "External"
-    if path.startswith(p2) or path.startswith(tv2):
-        return "Internal"
-    return "Unknown"
+    root = get_router().target(path)
+    if root is None:
+        return "Unknown"
+    return root.name
 
 def get_item_location(path):
     """
-    Determine whether a path currently lives in Internal or External.
+    Name of the location a path currently lives in.
     """
-    p1 = addon.getSettingString("path1")
-    p2 = addon.getSettingString("path2")
-    tv1 = addon.getSettingString("tvpath1")
-    tv2 = addon.getSettingString("tvpath2")
-    if path.startswith(p1) or path.startswith(tv1):
-        return "Internal"
-    if path.startswith(p2) or path.startswith(tv2):
-        return "External"
-    return "Unknown"
+    root = get_router().lookup(path)
+    if root is None:
+        return "Unknown"
+    return root.name
+
+def get_counterpart(path, target=None):
+    """
+    Return the path `path` would be moved to, into the Root `target` or the
+    default target, or None if it is not in a known location.
+    """
+    return get_router().counterpart(path, target)
 
 def is_dir(path):
     """
     Check if a path is a directory:
     1) Try local filesystem (os.path.isdir)
-    2) Fallback to xbmcvfs.listdir
+    2) Fallback to xbmcvfs.exists with a trailing slash
     """
     try:
         real = xbmcvfs.translatePath(path)
@@ -88,26 +100,105 @@ def is_dir(path):
             return os.path.isdir(real)
     except:
         pass
+    # listdir geeft ook voor een bestand lege lijsten; exists met '/' alleen voor een map
     try:
-        xbmcvfs.listdir(path)
-        return True
+        return xbmcvfs.exists(path.rstrip('/') + '/')
     except:
         return False
 
-def gather_all_files(folder):
-    """
-    Recursively gather all files (any extension) in folder and subfolders.
-    """
-    out = []
+def _vfs_entry(path, name, is_dir):
     try:
-        dirs, files = xbmcvfs.listdir(folder)
+        st = xbmcvfs.Stat(path)
+        return Entry(path, name, is_dir, 0 if is_dir else st.st_size(), st.st_mtime())
     except:
-        return out
-    for f in files:
-        out.append(os.path.join(folder, f))
+        return Entry(path, name, is_dir, 0, 0)
+
+def stat_path(path):
+    """
+    Return an Entry for `path` from a single stat, or None if it does not exist.
+    """
+    name = os.path.basename(path.rstrip('/'))
+    real = local_path(path)
+    if real:
+        try:
+            st = os.stat(real)
+        except:
+            return None
+        is_d = stat.S_ISDIR(st.st_mode)
+        return Entry(path, name, is_d, 0 if is_d else st.st_size, st.st_mtime)
+    if not xbmcvfs.exists(path) and not xbmcvfs.exists(path.rstrip('/') + '/'):
+        return None
+    return _vfs_entry(path, name, is_dir(path))
+
+def scan_dir(path):
+    """
+    Yield an Entry for every direct child of `path`.
+    Local folders use os.scandir (type from the listing, one stat per entry);
+    smb://, nfs:// and other VFS paths fall back to xbmcvfs. A symlink is
+    listed as a file of its own and never followed, so walks stay inside
+    the tree and deletes only remove the link.
+    """
+    real = local_path(path)
+    if real and os.path.isdir(real):
+        with os.scandir(real) as it:
+            for de in it:
+                if _is_partial(de.name):
+                    continue
+                child = os.path.join(path, de.name)
+                try:
+                    is_d = de.is_dir(follow_symlinks=False)
+                    st = de.stat(follow_symlinks=False)
+                    yield Entry(child, de.name, is_d, 0 if is_d else st.st_size, st.st_mtime)
+                except OSError:
+                    continue
+        return
+    with trace.span("vfs.listdir"):
+        dirs, files = xbmcvfs.listdir(path)
     for d in dirs:
-        out.extend(gather_all_files(os.path.join(folder, d)))
-    return out
+        yield _vfs_entry(os.path.join(path, d), d, True)
+    for f in files:
+        if not _is_partial(f):
+            yield _vfs_entry(os.path.join(path, f), f, False)
+
+def _is_partial(name):
+    # Hervatjournalen van copy_file horen niet in lijsten, dedup of bulkselectie
+    return name.endswith(PARTIAL_SUFFIX) or name.endswith(PARTIAL_SUFFIX + ".tmp")
+
+def walk(root, topdown=True):
+    """
+    Iteratively yield an Entry for everything below `root`, without recursion.
+    With topdown=False a folder is yielded after its contents, so callers can
+    delete while walking. Unreadable folders are skipped.
+    """
+    stack = [(root, None)]
+    while stack:
+        path, done_entry = stack.pop()
+        if done_entry is not None:
+            yield done_entry
+            continue
+        # Alleen het lezen afvangen; een except rond de yields zou ook GeneratorExit slikken
+        try:
+            children = list(scan_dir(path))
+        except Exception:
+            continue
+        subdirs = []
+        for e in children:
+            if e.is_dir:
+                subdirs.append(e)
+                if topdown:
+                    yield e
+            else:
+                yield e
+        for e in reversed(subdirs):
+            if not topdown:
+                stack.append((e.path, e))
+            stack.append((e.path, None))
+
+def gather_all_files(folder):
+    """
+    Gather all files (any extension) in folder and subfolders.
+    """
+    return [e.path for e in walk(folder) if not e.is_dir]
 
 def clean_empty_dirs(path):
     """
@@ -128,28 +219,36 @@ def clean_empty_dirs(path):
                 xbmcvfs.rmdir(path)
             except:
                 break
+        listing_cache.invalidate(path)
         parent = os.path.dirname(path.rstrip('/'))
         if not parent or parent == path:
             break
         path = parent
 
-def move_item(source_path, item_type):
+def _file_size(path, item_type):
+    # Grootte van een bestand vóór het verdwijnt, voor de mapgrootte-index
+    if item_type == "dir" or not sizes.enabled():
+        return None
+    e = stat_path(path)
+    return e.size if e and not e.is_dir else None
+
+def move_item(source_path, item_type, progress=None, on_verify=None, target=None):
     from .batch import BATCH_CONFIRM_ALL
+    from .throttle import Stopped
+    dest = None
     try:
-        p1  = addon.getSettingString("path1")
-        p2  = addon.getSettingString("path2")
-        tv1 = addon.getSettingString("tvpath1")
-        tv2 = addon.getSettingString("tvpath2")
-
-        if   source_path.startswith(p1):  dest = source_path.replace(p1, p2, 1)
-        elif source_path.startswith(p2):  dest = source_path.replace(p2, p1, 1)
-        elif source_path.startswith(tv1): dest = source_path.replace(tv1, tv2, 1)
-        elif source_path.startswith(tv2): dest = source_path.replace(tv2, tv1, 1)
-        else:
+        dest = get_counterpart(source_path, target)
+        if dest is None:
             xbmcgui.Dialog().ok("Move failed", "Path not in known locations.")
             return False
+        # Een niet-aangekoppelde schijf: anders belandt alles in een lege map op de interne opslag
+        root = target or get_router().target(source_path)
+        if not xbmcvfs.exists(root.path + '/'):
+            uievents.notify("Move failed", f"{root.name} is not available:\n{root.path}",
+                            xbmcgui.NOTIFICATION_ERROR, 5000)
+            return False
 
-        if xbmcvfs.exists(dest):
+        if xbmcvfs.exists(dest) and not (item_type != "dir" and has_partial(dest)):
             overwrite = BATCH_CONFIRM_ALL or xbmcgui.Dialog().yesno(
                 "Already exists", f"Overwrite {os.path.basename(dest)}?")
             if not overwrite:
@@ -159,89 +258,437 @@ def move_item(source_path, item_type):
             else:
                 xbmcvfs.delete(dest)
 
-        success = False
-        if item_type == "dir":
-            if xbmcvfs.rename(source_path, dest):
-                success = True
-            elif copy_dir(source_path, dest):
-                delete_dir(source_path)
+        parent = os.path.dirname(dest.rstrip('/'))
+        if parent and not xbmcvfs.exists(parent + '/'):
+            xbmcvfs.mkdirs(parent)
+
+        size = _file_size(source_path, item_type)
+
+        with trace.span("vfs.rename"):
+            success = xbmcvfs.rename(source_path, dest)
+        if success:
+            pass
+        elif item_type == "dir":
+            # Elk bestand verdwijnt pas uit de bron als de kopie geverifieerd is
+            if copy_dir(source_path, dest, progress, on_verify, move=True):
+                _remove_empty_dirs(source_path)
                 success = True
         else:
-            if xbmcvfs.rename(source_path, dest):
-                success = True
-            elif xbmcvfs.copy(source_path, dest):
-                xbmcvfs.delete(source_path)
+            if copy_file(source_path, dest, progress, on_verify):
+                with trace.span("vfs.delete"):
+                    xbmcvfs.delete(source_path)
                 success = True
 
         if success:
-            xbmcgui.Dialog().notification("Moved", os.path.basename(source_path),
-                                         xbmcgui.NOTIFICATION_INFO, 2000)
+            sizes.folder_sizes.moved(source_path, dest, size)
+            uievents.notify("Moved", os.path.basename(source_path),
+                            xbmcgui.NOTIFICATION_INFO, 2000)
         else:
-            xbmcgui.Dialog().notification("Error", f"Could not move {os.path.basename(source_path)}",
-                                         xbmcgui.NOTIFICATION_ERROR, 3000)
+            uievents.notify("Error", f"Could not move {os.path.basename(source_path)}",
+                            xbmcgui.NOTIFICATION_ERROR, 3000)
         return success
 
+    except Stopped:
+        # Gestopt tijdens een pauze: de bron staat nog, de batch houdt de op
+        raise
     except Exception as e:
-        xbmcgui.Dialog().notification("Error in move_item", str(e),
-                                     xbmc.NOTIFICATION_ERROR, 5000)
+        uievents.notify("Error in move_item", str(e),
+                        xbmcgui.NOTIFICATION_ERROR, 5000)
+        return False
+    finally:
+        listing_cache.invalidate(source_path, dest)
+        uievents.refresh()
+
+def move_to(path, item_type=None):
+    """
+    Let the user pick which location of its section `path` moves to, then move it.
+    """
+    from .probe import probe_roots
+    router  = get_router()
+    targets = router.targets(path)
+    if not targets:
+        xbmcgui.Dialog().ok("Move failed", "Path not in known locations.")
+        return False
+    default = router.target(path)
+    probes  = probe_roots([t.path for t in targets])
+    options = []
+    for t in targets:
+        p = probes.get(t.path)
+        free = f" ({p.free / (1024**3):.1f} GB free)" if p and p.free is not None else ""
+        options.append(f"{t.name}: {t.path}{free}")
+    choice = xbmcgui.Dialog().select(f"Move {os.path.basename(path.rstrip('/'))} to",
+                                     options, preselect=targets.index(default) if default in targets else 0)
+    if choice < 0:
+        return False
+    return move_item(path, item_type, target=targets[choice])
+
+def get_copy_buffer_size():
+    """
+    Return the copy buffer size in bytes, from the 'copy_buffer_mb' setting.
+    """
+    return max(1, get_settings().copy_buffer_mb or 16) * 1024 * 1024
+
+def local_path(path):
+    """
+    Return the real filesystem path for `path`, or None when it only exists
+    through the VFS (smb://, nfs://, ...).
+    """
+    try:
+        real = xbmcvfs.translatePath(path)
+    except:
+        return None
+    if not real or "://" in real:
+        return None
+    return real
+
+def read_partial(dst):
+    """
+    Return the resume journal of an interrupted copy to `dst`, or None.
+    """
+    real = local_path(dst)
+    if not real:
+        return None
+    try:
+        with open(real + PARTIAL_SUFFIX, 'r') as f:
+            return json.load(f)
+    except:
+        return None
+
+def has_partial(dst):
+    return read_partial(dst) is not None
+
+def _write_partial(real_dst, state):
+    tmp = real_dst + PARTIAL_SUFFIX + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, real_dst + PARTIAL_SUFFIX)
+
+def _checkpoint(fout, real_dst, state, offset):
+    # Eerst de data, dan de positie: het journaal loopt nooit voor op de schijf
+    with trace.span("copy.fsync"):
+        fout.flush()
+        os.fsync(fout.fileno())
+    state['offset'] = offset
+    _write_partial(real_dst, state)
+
+def _remove_partial(real_dst):
+    try:
+        os.remove(real_dst + PARTIAL_SUFFIX)
+    except:
+        pass
+
+class _VfsReader:
+    """
+    Minimal file-like wrapper around xbmcvfs.File for reading network paths.
+    """
+
+    def __init__(self, path):
+        self.f = xbmcvfs.File(path)
+
+    def read(self, n):
+        return bytes(self.f.readBytes(n))
+
+    def seek(self, offset, whence=0):
+        self.f.seek(offset, whence)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.f.close()
+
+def open_reader(path):
+    """
+    Open `path` for binary reading, through the local filesystem when possible.
+    """
+    real = local_path(path)
+    if real:
+        return open(real, 'rb')
+    return _VfsReader(path)
+
+def _sample_offsets(size):
+    if size <= SAMPLE_BLOCKS * SAMPLE_SIZE:
+        return [0]
+    step = (size - SAMPLE_SIZE) // (SAMPLE_BLOCKS - 1)
+    return [i * step for i in range(SAMPLE_BLOCKS)]
+
+def _verify(src, dst, total, mode, src_hash, bufsize):
+    """
+    Check a finished copy. Fast mode compares sampled blocks of both files;
+    full mode reads the destination back and compares it with the checksum
+    taken from the source while it streamed. Returns (ok, hex digest or None).
+    """
+    if mode == VERIFY_FAST:
+        with open_reader(src) as a, open_reader(dst) as b:
+            for off in _sample_offsets(total):
+                a.seek(off)
+                b.seek(off)
+                n = SAMPLE_SIZE if total > SAMPLE_BLOCKS * SAMPLE_SIZE else total
+                if a.read(n) != b.read(n):
+                    return False, None
+        return True, None
+    import hashlib
+    h = hashlib.sha1()
+    with open_reader(dst) as f:
+        while True:
+            chunk = f.read(bufsize)
+            if not chunk:
+                break
+            h.update(chunk)
+    digest = src_hash.hexdigest()
+    return h.hexdigest() == digest, digest
+
+def copy_file(src, dst, progress=None, on_verify=None):
+    """
+    Copy a single file in large chunks.
+    For local paths the running offset is journalled in `<dst>.partial` every
+    CHECKPOINT_BYTES or CHECKPOINT_SECONDS, so an interrupted copy resumes
+    from the last checkpoint on the next run. `progress` is
+    called as progress(bytes_done, bytes_total) with the starting offset
+    first, then after every chunk.
+    Depending on the 'verify_mode' setting the copy is checked before True is
+    returned; on_verify(src, dst, mode, ok, digest) receives the outcome.
+    Stopped from `progress` is passed on, with the journal kept for a resume.
+    """
+    import hashlib
+    from .throttle import Stopped
+    bufsize  = get_copy_buffer_size()
+    mode     = get_settings().verify_mode
+    parent   = os.path.dirname(dst.rstrip('/'))
+    if parent and not xbmcvfs.exists(parent + '/'):
+        xbmcvfs.mkdirs(parent)
+    real_src = local_path(src)
+    real_dst = local_path(dst)
+    if not (real_src and real_dst and os.path.isfile(real_src)):
+        return _copy_file_vfs(src, dst, bufsize, progress, mode, on_verify)
+
+    st    = os.stat(real_src)
+    total = st.st_size
+    state = read_partial(dst)
+    offset = 0
+    if (state and state.get('src') == src and state.get('size') == total
+            and state.get('mtime') == st.st_mtime and os.path.isfile(real_dst)):
+        offset = min(int(state.get('offset', 0)), os.path.getsize(real_dst))
+    else:
+        state = {'src': src, 'size': total, 'mtime': st.st_mtime, 'offset': 0}
+
+    src_hash = hashlib.sha1()
+    start    = offset
+    try:
+        _write_partial(real_dst, state)
+        with trace.span("copy.local"), \
+                open(real_src, 'rb') as fin, open(real_dst, 'r+b' if offset else 'wb') as fout:
+            # Bij hervatten moet het al gekopieerde begin alsnog in de checksum
+            if offset and mode == VERIFY_FULL:
+                left = offset
+                while left > 0:
+                    chunk = fin.read(min(bufsize, left))
+                    if not chunk:
+                        break
+                    src_hash.update(chunk)
+                    left -= len(chunk)
+            fin.seek(offset)
+            fout.seek(offset)
+            fout.truncate()
+            if progress:
+                progress(offset, total)
+            mark, mark_time = offset, time.monotonic()
+            while True:
+                chunk = fin.read(bufsize)
+                if not chunk:
+                    break
+                if mode == VERIFY_FULL:
+                    src_hash.update(chunk)
+                fout.write(chunk)
+                offset += len(chunk)
+                if offset - mark >= CHECKPOINT_BYTES or time.monotonic() - mark_time >= CHECKPOINT_SECONDS:
+                    _checkpoint(fout, real_dst, state, offset)
+                    mark, mark_time = offset, time.monotonic()
+                if progress:
+                    progress(offset, total)
+            # Alles op schijf voordat de bron verwijderd mag worden
+            with trace.span("copy.fsync"):
+                fout.flush()
+                os.fsync(fout.fileno())
+        trace.add("bytes.copied", offset - start)
+
+        if os.path.getsize(real_dst) != total:
+            return False
+        if mode != VERIFY_OFF:
+            with trace.span("copy.verify"):
+                ok, digest = _verify(src, dst, total, mode, src_hash, bufsize)
+            if on_verify:
+                on_verify(src, dst, VERIFY_NAMES[mode], ok, digest)
+            if not ok:
+                # Corrupt data: start from scratch next time.
+                os.remove(real_dst)
+                _remove_partial(real_dst)
+                return False
+        try:
+            shutil.copystat(real_src, real_dst)
+        except:
+            pass
+        _remove_partial(real_dst)
+        return True
+    except Stopped:
+        raise
+    except:
         return False
+
+def _copy_file_vfs(src, dst, bufsize, progress, mode=VERIFY_OFF, on_verify=None):
+    """
+    Chunked copy through xbmcvfs.File for network paths. The VFS has no append
+    mode, so these copies cannot be resumed; when stopped the half-written
+    destination is removed and Stopped is passed on.
+    """
+    import hashlib
+    from .throttle import Stopped
+    src_hash = hashlib.sha1()
+    try:
+        with trace.span("copy.vfs"):
+            done, total = _stream_vfs(src, dst, bufsize, progress, mode, src_hash)
+        trace.add("bytes.copied", done)
+        if done != total or xbmcvfs.Stat(dst).st_size() != total:
+            return False
+        if mode != VERIFY_OFF:
+            with trace.span("copy.verify"):
+                ok, digest = _verify(src, dst, total, mode, src_hash, bufsize)
+            if on_verify:
+                on_verify(src, dst, VERIFY_NAMES[mode], ok, digest)
+            if not ok:
+                xbmcvfs.delete(dst)
+                return False
+        return True
+    except Stopped:
+        xbmcvfs.delete(dst)
+        raise
+    except:
+        return False
+
+def _stream_vfs(src, dst, bufsize, progress, mode, src_hash):
+    """
+    Stream `src` to `dst` through xbmcvfs.File; returns (bytes written, source size).
+    """
+    fin = xbmcvfs.File(src)
+    try:
+        total = fin.size()
+        fout = xbmcvfs.File(dst, 'w')
+        done = 0
+        if progress:
+            progress(0, total)
+        try:
+            while True:
+                chunk = fin.readBytes(bufsize)
+                if not chunk:
+                    break
+                if mode == VERIFY_FULL:
+                    src_hash.update(chunk)
+                if not fout.write(chunk):
+                    break
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+        finally:
+            fout.close()
     finally:
-        xbmc.executebuiltin('Container.Refresh')
+        fin.close()
+    return done, total
 
-def copy_dir(src, dst):
+def copy_dir(src, dst, progress=None, on_verify=None, move=False):
+    """
+    Copy the tree `src` into `dst`. With `move` every source file is deleted
+    as soon as its copy passed verification. Returns True only when every
+    file was copied; skipped or failed files stay in the source.
+    """
     from .batch import BATCH_CONFIRM_ALL
+    from .throttle import Stopped
+    complete = True
     try:
         if not xbmcvfs.exists(dst):
             if not xbmcvfs.mkdir(dst):
-                xbmcgui.Dialog().notification("Error", f"Cannot create folder:\n{dst}",
-                                             xbmcgui.NOTIFICATION_ERROR, 3000)
+                uievents.notify("Error", f"Cannot create folder:\n{dst}",
+                                xbmcgui.NOTIFICATION_ERROR, 3000)
                 return False
 
-        dirs, files = xbmcvfs.listdir(src)
-        for f in files:
-            s = f"{src}/{f}"
-            d = f"{dst}/{f}"
-            if xbmcvfs.exists(d):
+        prefix = src.rstrip('/') + '/'
+        for e in walk(src):
+            d = dst.rstrip('/') + '/' + e.path[len(prefix):]
+            if e.is_dir:
+                if not xbmcvfs.exists(d + '/') and not xbmcvfs.mkdir(d):
+                    uievents.notify("Error", f"Cannot create folder:\n{d}",
+                                    xbmcgui.NOTIFICATION_ERROR, 3000)
+                    return False
+                continue
+            if xbmcvfs.exists(d) and not has_partial(d):
                 overwrite = BATCH_CONFIRM_ALL or xbmcgui.Dialog().yesno(
-                    "File exists", f"Overwrite {f}?")
+                    "File exists", f"Overwrite {e.name}?")
                 if not overwrite:
+                    complete = False
                     continue
                 xbmcvfs.delete(d)
-            if not xbmcvfs.copy(s, d):
+            if not copy_file(e.path, d, progress, on_verify):
+                complete = False
                 if not BATCH_CONFIRM_ALL:
-                    cont = xbmcgui.Dialog().yesno("Copy error", f"Cannot copy {f}, continue?")
+                    cont = xbmcgui.Dialog().yesno("Copy error", f"Cannot copy {e.name}, continue?")
                     if not cont:
                         return False
+                continue
+            if move:
+                with trace.span("vfs.delete"):
+                    xbmcvfs.delete(e.path)
 
-        for d in dirs:
-            if not copy_dir(f"{src}/{d}", f"{dst}/{d}"):
-                return False
-
-        return True
+        return complete
 
+    except Stopped:
+        raise
     except Exception as e:
-        xbmcgui.Dialog().notification("Error", f"copy_dir failed:\n{e}",
-                                     xbmcgui.NOTIFICATION_ERROR, 3000)
+        uievents.notify("Error", f"copy_dir failed:\n{e}",
+                        xbmcgui.NOTIFICATION_ERROR, 3000)
         return False
+    finally:
+        listing_cache.invalidate(dst)
+        if move:
+            listing_cache.invalidate(src)
+
+def _remove_empty_dirs(path):
+    """
+    Remove the folders below and including `path`, deepest first. A folder
+    that still holds files is left alone, so nothing that was not moved is lost.
+    """
+    for e in walk(path, topdown=False):
+        if e.is_dir:
+            xbmcvfs.rmdir(e.path)
+    xbmcvfs.rmdir(path)
+    listing_cache.invalidate(path)
 
 def delete_dir(path):
     try:
-        dirs, files = xbmcvfs.listdir(path)
-        for f in files:
-            xbmcvfs.delete(f"{path}/{f}")
-        for d in dirs:
-            delete_dir(f"{path}/{d}")
+        real = local_path(path)
+        if real and os.path.islink(real):
+            # Alleen de link zelf; wat erachter staat hoort niet bij de selectie
+            os.remove(real)
+            listing_cache.invalidate(path)
+            return
+        for e in walk(path, topdown=False):
+            trace.add("files.deleted" if not e.is_dir else "dirs.deleted")
+            if e.is_dir:
+                xbmcvfs.rmdir(e.path)
+            else:
+                xbmcvfs.delete(e.path)
         xbmcvfs.rmdir(path)
     except:
         pass
+    listing_cache.invalidate(path)
 
 def delete_item(path, item_type=None):
     from .batch import BATCH_CONFIRM_ALL
 
-    allow = addon.getSettingBool("allow_delete")
+    allow = get_settings().allow_delete
     if not allow:
-        xbmcgui.Dialog().notification("Deletion Disabled", "Deleting is disabled in settings.",
-                                     xbmcgui.NOTIFICATION_INFO, 2000)
+        uievents.notify("Deletion Disabled", "Deleting is disabled in settings.",
+                        xbmcgui.NOTIFICATION_INFO, 2000)
         return False
     try:
         if not BATCH_CONFIRM_ALL:
@@ -249,28 +696,93 @@ def delete_item(path, item_type=None):
                 return False
 
         typ = item_type or ("dir" if is_dir(path) else "file")
+        size = _file_size(path, typ)
         if typ == "dir":
-            delete_dir(path)
-            xbmcgui.Dialog().notification("Deleted folder", os.path.basename(path),
-                                         xbmcgui.NOTIFICATION_INFO, 2000)
+            with trace.span("delete.dir"):
+                delete_dir(path)
+            sizes.folder_sizes.removed(path)
+            uievents.notify("Deleted folder", os.path.basename(path),
+                            xbmcgui.NOTIFICATION_INFO, 2000)
         else:
-            if not xbmcvfs.delete(path):
-                real = xbmcvfs.translatePath(path)
-                if os.path.exists(real):
-                    os.remove(real)
-            xbmcgui.Dialog().notification("Deleted file", os.path.basename(path),
-                                         xbmcgui.NOTIFICATION_INFO, 2000)
+            with trace.span("vfs.delete"):
+                if not xbmcvfs.delete(path):
+                    real = xbmcvfs.translatePath(path)
+                    if os.path.exists(real):
+                        os.remove(real)
+            sizes.folder_sizes.removed(path, size)
+            uievents.notify("Deleted file", os.path.basename(path),
+                            xbmcgui.NOTIFICATION_INFO, 2000)
         return True
 
     except Exception as e:
-        xbmcgui.Dialog().notification("Error deleting", str(e),
-                                     xbmcgui.NOTIFICATION_ERROR, 3000)
+        uievents.notify("Error deleting", str(e),
+                        xbmcgui.NOTIFICATION_ERROR, 3000)
         return False
     finally:
-        xbmc.executebuiltin('Container.Refresh')
+        listing_cache.invalidate(path)
+        uievents.refresh()
+
+def bulk_action(path=None):
+    """
+    Select everything below `path` (or a chosen root) that passes a filter,
+    in one pass over the tree, and queue it as batch moves or deletes in a
+    single store write.
+    """
+    from .bulk import PRESETS, parse_filter, select
+    from .batch import add_to_batch
+    dialog = xbmcgui.Dialog()
+    if not path:
+        roots = sorted(get_router().roots)
+        if not roots:
+            return
+        i = dialog.select("Bulk Action: folder", [f"[{get_item_location(r)}] {r}" for r in roots])
+        if i < 0:
+            return
+        path = roots[i]
+
+    labels = [label for label, _ in PRESETS] + ["Custom filter..."]
+    i = dialog.select("Bulk Action: select", labels)
+    if i < 0:
+        return
+    if i < len(PRESETS):
+        text = PRESETS[i][1]
+    else:
+        text = dialog.input("Filter: name: re: ext: size> size< age> age< type: depth: orphans",
+                            "ext:nfo,srt age>30d")
+        if not text:
+            return
+    try:
+        flt = parse_filter(text)
+    except ValueError as e:
+        dialog.notification("Bulk Action", str(e), xbmcgui.NOTIFICATION_ERROR, 4000)
+        return
+
+    actions = ["move"]
+    if get_settings().allow_delete:
+        actions.append("delete")
+    choice = dialog.select("Bulk Action", [a.capitalize() for a in actions])
+    if choice < 0:
+        return
+
+    dlg = xbmcgui.DialogProgress()
+    dlg.create("Bulk Action", "Scanning...")
+    try:
+        matches = list(select(path, flt, should_stop=dlg.iscanceled,
+                              progress=lambda n, p: dlg.update(0, f"Scanning: {n} entries\n{os.path.basename(p)}")))
+        if dlg.iscanceled():
+            return
+    finally:
+        dlg.close()
+    if not matches:
+        dialog.notification("Bulk Action", "Nothing matches the filter", xbmcgui.NOTIFICATION_INFO, 3000)
+        return
 
-def bulk_action(path):
-    xbmcgui.Dialog().ok("Bulk Action", "Not implemented")
+    gb = sum(m.size for m in matches) / (1024**3)
+    names = ", ".join(os.path.basename(m.path) for m in matches[:5])
+    if len(matches) > 5:
+        names += f" and {len(matches) - 5} more"
+    if dialog.yesno("Bulk Action", f"Queue {len(matches)} item(s) ({gb:.1f} GB) for {actions[choice]}?\n{names}"):
+        add_to_batch([m.path for m in matches], actions[choice])
 
 def update_plex():
     script = f"special://home/addons/{addon_id}/resources/updateplex.py"
@@ -0,0 +1,58 @@
+# modules/library.py
+
+import os
+import xbmc
+
+# Boven dit aantal paden is één volledige scan goedkoper dan losse scans
+MAX_TARGETED = 25
+
+class ChangeSet:
+    """
+    Folders a batch added to or removed from the libraries.
+    """
+
+    def __init__(self):
+        self.added   = set()
+        self.removed = set()
+
+    def record(self, path, action, dest=None, is_dir=True):
+        """
+        Record a finished batch item: its own folder (or the file's parent
+        folder) disappears from the source, and a move shows up at `dest`.
+        """
+        src = path if is_dir else os.path.dirname(path)
+        self.removed.add(src)
+        if action in ('move', 'move_dir') and dest:
+            self.added.add(dest if is_dir else os.path.dirname(dest))
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+def coalesce(paths):
+    """
+    Deduplicate `paths` and drop every path that lies below another one.
+    """
+    out = []
+    for p in sorted({p.rstrip('/') for p in paths if p}):
+        if out and (p == out[-1] or p.startswith(out[-1] + '/')):
+            continue
+        out.append(p)
+    return out
+
+def refresh_library(changes, fallback_command=None):
+    """
+    Scan only what the batch touched: UpdateLibrary per added folder and
+    CleanLibrary per removed folder. Falls back to `fallback_command` (or a
+    full scan) when too much changed for targeted scans to pay off.
+    Returns the builtins that were run.
+    """
+    added   = coalesce(changes.added)
+    removed = coalesce(changes.removed)
+    if len(added) + len(removed) > MAX_TARGETED:
+        commands = [fallback_command] if fallback_command else ["UpdateLibrary(video)", "CleanLibrary(video)"]
+    else:
+        commands  = [f"UpdateLibrary(video,{p}/)" for p in added]
+        commands += [f"CleanLibrary(video,false,{p}/)" for p in removed]
+    for c in commands:
+        xbmc.executebuiltin(c)
+    return commands
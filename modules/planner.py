@@ -0,0 +1,130 @@
+# modules/planner.py
+
+import os
+from collections import namedtuple
+
+from .settings import get_settings
+from .executor import device_of
+from .router import get_router
+from .fileops import stat_path, walk, get_counterpart, get_free_space
+
+# One batch item expanded into the ops that carry it out; `target` is the
+# Root a move goes to, resolved once so every op of the item agrees on it,
+# and `is_dir` tells whether the item itself is a folder.
+Group = namedtuple("Group", "item ops size src_dev dst_dev cleanup op_sizes target is_dir")
+
+def existing_parent(path):
+    """
+    Return `path` or its nearest ancestor that exists, for statvfs.
+    """
+    while path and stat_path(path) is None:
+        parent = os.path.dirname(path.rstrip('/'))
+        if parent == path:
+            return None
+        path = parent
+    return path
+
+def expand_item(item):
+    """
+    Expand a batch item {'path', 'action'} into a Group with its byte size;
+    a move with a 'target' root path goes there instead of its default.
+    A folder move within one device stays a single rename ('move_dir');
+    across devices it becomes one op per file. Folder deletes stay a single op.
+    """
+    p, act = item['path'], item['action']
+    if act == 'move_dir':
+        # Onderbroken batch: opnieuw plannen als gewone verplaatsing
+        act  = 'move'
+        item = dict(item, action=act)
+    entry  = stat_path(p)
+    p_dir  = entry is not None and entry.is_dir
+    ops, cleanup, size = [], set(), 0
+    op_sizes = {}
+
+    src_dev = device_of(p)
+    dst_dev = None
+    dest    = None
+    target  = None
+    if act == 'move':
+        # Een geplande verplaatsing houdt zijn doel; alleen als die root niet
+        # meer bestaat wordt opnieuw gekozen
+        router  = get_router()
+        target  = router.roots.get(item.get('target')) or router.target(p)
+        dest    = get_counterpart(p, target)
+        # device_of klimt naar de dichtstbijzijnde bestaande map; bij een
+        # ontbrekende root is dat de verkeerde schijf
+        if dest and stat_path(target.path) is not None:
+            dst_dev = device_of(dest)
+    same_dev = src_dev is not None and src_dev == dst_dev
+
+    if act == 'move' and p_dir and same_dev and stat_path(dest) is None:
+        ops.append((p, 'move_dir'))
+        cleanup.add(os.path.dirname(p))
+    elif act == 'move' and p_dir:
+        for e in walk(p):
+            if e.is_dir:
+                continue
+            ops.append((e.path, 'move'))
+            op_sizes[(e.path, 'move')] = e.size
+            cleanup.add(os.path.dirname(e.path))
+            size += e.size
+        if ops:
+            cleanup.add(p)
+    elif act == 'delete' and p_dir:
+        ops.append((p, 'delete_dir'))
+        cleanup.add(os.path.dirname(p))
+        size = sum(e.size for e in walk(p) if not e.is_dir)
+    else:
+        ops.append((p, act))
+        cleanup.add(os.path.dirname(p))
+        size = entry.size if entry is not None else 0
+        op_sizes[(p, act)] = size
+
+    return Group(item, ops, size, src_dev, dst_dev, cleanup, op_sizes, target, p_dir)
+
+def plan_capacity(groups, reserve=None):
+    """
+    Order batch groups so that nothing runs out of space halfway.
+
+    Free space is simulated per device: deletes run first and free their
+    bytes, then moves are scheduled largest-first as long as the destination
+    keeps `reserve` bytes free; a move that frees space on its source may
+    make room for moves in the other direction, so passes repeat until
+    nothing else fits. Returns (scheduled groups, deferred groups).
+    """
+    if reserve is None:
+        reserve = max(0, get_settings().free_space_reserve_mb) * 1024 * 1024
+
+    free = {}
+    def known_free(dev, path):
+        if dev not in free:
+            base = existing_parent(path)
+            free[dev] = get_free_space(base) if base else None
+        return free[dev]
+
+    deletes = [g for g in groups if g.item['action'] != 'move']
+    moves   = [g for g in groups if g.item['action'] == 'move']
+
+    for g in deletes:
+        if known_free(g.src_dev, g.item['path']) is not None:
+            free[g.src_dev] += g.size
+
+    scheduled = list(deletes)
+    pending   = sorted(moves, key=lambda g: g.size, reverse=True)
+    progress  = True
+    while pending and progress:
+        progress = False
+        for g in list(pending):
+            dest = get_counterpart(g.item['path'], g.target)
+            same = g.src_dev is not None and g.src_dev == g.dst_dev
+            avail = None if same or not dest or g.dst_dev is None else known_free(g.dst_dev, dest)
+            if avail is not None and avail - g.size < reserve:
+                continue
+            if avail is not None:
+                free[g.dst_dev] -= g.size
+            if not same and known_free(g.src_dev, g.item['path']) is not None:
+                free[g.src_dev] += g.size
+            scheduled.append(g)
+            pending.remove(g)
+            progress = True
+    return scheduled, pending
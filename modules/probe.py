@@ -0,0 +1,81 @@
+# modules/probe.py
+
+import json
+import time
+import threading
+from collections import namedtuple
+import xbmcgui
+import xbmcvfs
+
+from .fileops import get_free_space
+
+# Resultaten worden op het Home-venster bewaard, zodat ze aanroepen overleven
+PROPERTY_PREFIX = "batchman.probe."
+
+# Hoe lang een meting vers is, en hoe lang we maximaal op een schijf wachten
+PROBE_TTL     = 60
+PROBE_TIMEOUT = 1.5
+
+# free/mtime may be None; ok is False for a root that could not be reached;
+# stale is True when the value comes from an older probe.
+Probe = namedtuple("Probe", "free mtime ok stale")
+
+def _window():
+    return xbmcgui.Window(10000)
+
+def _cached(path):
+    try:
+        return json.loads(_window().getProperty(PROPERTY_PREFIX + path) or "null")
+    except:
+        return None
+
+def _store(path, result):
+    try:
+        _window().setProperty(PROPERTY_PREFIX + path, json.dumps(result))
+    except:
+        pass
+
+def _probe(path):
+    """
+    Measure one root; may block for as long as the mount takes to answer.
+    """
+    free = get_free_space(path)
+    try:
+        mtime = xbmcvfs.Stat(path).st_mtime()
+    except:
+        mtime = None
+    ok = free is not None or bool(mtime) or xbmcvfs.exists(path.rstrip('/') + '/')
+    result = {'ts': time.time(), 'free': free, 'mtime': mtime or None, 'ok': ok}
+    _store(path, result)
+    return result
+
+def probe_roots(paths, timeout=PROBE_TIMEOUT, ttl=PROBE_TTL):
+    """
+    Return {path: Probe} for all `paths` without ever blocking longer than `timeout`.
+
+    Fresh cached results are used as they are. The rest are probed on
+    parallel threads; a root that does not answer in time keeps its last
+    known (stale) values, and its thread fills the cache when it finishes.
+    """
+    now = time.time()
+    results, threads = {}, {}
+    for path in paths:
+        hit = _cached(path)
+        if hit and now - hit.get('ts', 0) < ttl:
+            results[path] = Probe(hit['free'], hit['mtime'], hit['ok'], False)
+            continue
+        out = {}
+        t = threading.Thread(target=lambda p=path, o=out: o.update(_probe(p)), daemon=True)
+        t.start()
+        threads[path] = (t, out, hit)
+
+    deadline = now + timeout
+    for path, (t, out, hit) in threads.items():
+        t.join(max(0, deadline - time.time()))
+        if out:
+            results[path] = Probe(out['free'], out['mtime'], out['ok'], False)
+        elif hit:
+            results[path] = Probe(hit['free'], hit['mtime'], hit['ok'], True)
+        else:
+            results[path] = Probe(None, None, False, True)
+    return results
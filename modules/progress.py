@@ -0,0 +1,205 @@
+# modules/progress.py
+
+import os
+import time
+import threading
+from collections import deque
+import xbmcgui
+
+# Venster waarop de voortgang als properties wordt gepubliceerd (Home)
+PROPERTY_WINDOW = 10000
+PROPERTY_PREFIX = "batchman.progress."
+
+# Breedte van het venster voor de voortschrijdende MB/s
+RATE_WINDOW = 10.0
+
+# Minimale tijd tussen twee GUI-updates
+UPDATE_INTERVAL = 0.5
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0
+    return f"{n:.1f} TB"
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+class _Rate:
+    """
+    Rolling bytes-per-second over the last RATE_WINDOW seconds.
+    """
+
+    def __init__(self):
+        self.samples = deque()
+        self.total   = 0
+
+    def add(self, n, now):
+        self.total += n
+        self.samples.append((now, self.total))
+        while len(self.samples) > 2 and now - self.samples[0][0] > RATE_WINDOW:
+            self.samples.popleft()
+
+    def value(self, now):
+        if len(self.samples) < 2:
+            return 0.0
+        t0, b0 = self.samples[0]
+        span = max(now - t0, 1e-3)
+        return (self.total - b0) / span
+
+class BatchProgress:
+    """
+    Byte-level progress of a running batch.
+
+    Tracks ops and bytes done, a rolling MB/s per destination device and
+    overall, and an ETA. Shows them in a DialogProgressBG and publishes
+    them as window properties on the Home window (batchman.progress.*) so
+    skins and other scripts can read them. Safe to call from worker threads.
+    """
+
+    def __init__(self, total_ops, total_bytes, heading="Batch Process"):
+        self.total_ops   = total_ops
+        self.total_bytes = total_bytes
+        self.heading     = heading
+        self.ops_done    = 0
+        self.bytes_done  = 0
+        self.current     = {}
+        self.rate        = _Rate()
+        self.dev_rates   = {}
+        self.lock        = threading.Lock()
+        self.last_update = 0.0
+        self.started     = time.time()
+        self.window      = xbmcgui.Window(PROPERTY_WINDOW)
+        self.dialog      = None
+        self.paused      = 0
+
+    def start(self):
+        self.dialog = xbmcgui.DialogProgressBG()
+        self.dialog.create(self.heading, f"0/{self.total_ops}")
+        self._set("running", "true")
+        self._publish(force=True)
+
+    def op_started(self, op, size=0):
+        with self.lock:
+            self.current[op] = [os.path.basename(op[0]), size, 0]
+        self._publish(force=True)
+
+    def copy_callback(self, op, device=None):
+        """
+        Return a progress(done, total) callback for copy_file that feeds this op.
+        copy_file reports its starting offset first; that call is only a
+        baseline, so bytes of a resumed copy do not count as throughput.
+        A folder copy reports each of its files in turn.
+        """
+        state = {'last': 0, 'fresh': True}
+        def cb(done, total):
+            if state['fresh']:
+                state['last'], state['fresh'] = done, done >= total
+                return
+            delta = done - state['last']
+            state['last'], state['fresh'] = done, done >= total
+            if delta > 0:
+                self.add_bytes(op, delta, device)
+        return cb
+
+    def add_bytes(self, op, n, device=None):
+        now = time.time()
+        with self.lock:
+            self.bytes_done += n
+            self.rate.add(n, now)
+            if device is not None:
+                self.dev_rates.setdefault(device, _Rate()).add(n, now)
+            if op in self.current:
+                self.current[op][2] += n
+        self._publish()
+
+    def set_paused(self, flag):
+        """
+        Mark one copy as paused (or resumed) for playback; shown in the dialog.
+        """
+        with self.lock:
+            self.paused = max(0, self.paused + (1 if flag else -1))
+        self._publish(force=True)
+
+    def op_finished(self, op, ok):
+        with self.lock:
+            self.ops_done += 1
+            name, size, seen = self.current.pop(op, ("", 0, 0))
+            # Renames en deletes kopiëren niets; tel de rest van de op alsnog mee
+            if size > seen:
+                self.bytes_done += size - seen
+        self._publish(force=True)
+
+    def _set(self, key, value):
+        try:
+            self.window.setProperty(PROPERTY_PREFIX + key, str(value))
+        except:
+            pass
+
+    def snapshot(self):
+        now = time.time()
+        with self.lock:
+            speed = self.rate.value(now)
+            remaining = max(0, self.total_bytes - self.bytes_done)
+            return {
+                'ops_done':    self.ops_done,
+                'total_ops':   self.total_ops,
+                'bytes_done':  self.bytes_done,
+                'total_bytes': self.total_bytes,
+                'speed':       speed,
+                'eta':         remaining / speed if speed > 0 else None,
+                'current':     [c[0] for c in self.current.values()],
+                'devices':     {d: r.value(now) for d, r in self.dev_rates.items()},
+            }
+
+    def percent(self, snap):
+        if snap['total_bytes']:
+            return int(100 * min(snap['bytes_done'], snap['total_bytes']) / snap['total_bytes'])
+        if snap['total_ops']:
+            return int(100 * snap['ops_done'] / snap['total_ops'])
+        return 100
+
+    def _publish(self, force=False):
+        now = time.time()
+        if not force and now - self.last_update < UPDATE_INTERVAL:
+            return
+        self.last_update = now
+        snap = self.snapshot()
+        pct  = self.percent(snap)
+        mbps = snap['speed'] / (1024 * 1024)
+
+        self._set("percent", pct)
+        self._set("ops", f"{snap['ops_done']}/{snap['total_ops']}")
+        self._set("bytes", f"{format_bytes(snap['bytes_done'])} / {format_bytes(snap['total_bytes'])}")
+        self._set("speed", f"{mbps:.1f} MB/s")
+        self._set("eta", format_eta(snap['eta']))
+        self._set("current", ", ".join(snap['current']))
+        self._set("paused", "true" if self.paused else "false")
+        self._set("devices", ", ".join(f"{d}: {r / (1024 * 1024):.1f} MB/s"
+                                       for d, r in snap['devices'].items()))
+
+        if self.dialog:
+            msg = (f"{snap['ops_done']}/{snap['total_ops']}  {mbps:.1f} MB/s  "
+                   f"ETA {format_eta(snap['eta'])}  {', '.join(snap['current'])}")
+            if self.paused:
+                msg = f"Paused during playback  {msg}"
+            try:
+                self.dialog.update(pct, self.heading, msg)
+            except:
+                pass
+
+    def close(self):
+        self._publish(force=True)
+        self._set("running", "false")
+        if self.dialog:
+            try:
+                self.dialog.close()
+            except:
+                pass
+            self.dialog = None
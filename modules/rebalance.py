@@ -0,0 +1,220 @@
+# modules/rebalance.py
+
+import os
+import json
+import time
+from collections import namedtuple
+import xbmc
+
+from .settings import get_settings
+from .router import get_router
+from .executor import device_of
+from .fileops import scan_dir, walk, stat_path, get_free_space
+from .planner import existing_parent
+from .sizes import folder_sizes
+
+# Welke titels als eerste naar extern gaan ('rebalance_policy' instelling)
+POLICY_OLDEST, POLICY_UNPLAYED, POLICY_LARGEST = 0, 1, 2
+POLICY_NAMES = {
+    POLICY_OLDEST:   "Oldest first",
+    POLICY_UNPLAYED: "Least recently played",
+    POLICY_LARGEST:  "Largest first",
+}
+
+# Grenzen voor de knapsack: daarboven volstaat de gretige keuze
+DP_MAX_ITEMS = 500
+DP_BUCKETS   = 4096
+
+GB = 1024 ** 3
+
+# A movie folder, show folder or loose file on an internal root. lastplayed
+# is a timestamp, 0 when Kodi never played it (or does not know it).
+Candidate = namedtuple("Candidate", "path size mtime lastplayed dest dst_dev")
+
+# Outcome for one internal drive: free bytes now, bytes still missing to
+# reach the target, the chosen candidates and their total size.
+Plan = namedtuple("Plan", "device free deficit picked total")
+
+def measure(root, should_stop=None):
+    """
+    Yield a Candidate for every direct child of an internal `root`, with its
+    total size and newest file mtime. Folder totals come from the folder-size
+    index after an incremental refresh; a walk is the fallback. The
+    destination follows the move rules, so titles of one root can go to
+    different drives.
+    """
+    router  = get_router()
+    devices = {}
+    known   = {}
+    if folder_sizes.refresh(root, should_stop):
+        known = folder_sizes.children(root)
+    for e in scan_dir(root):
+        if should_stop and should_stop():
+            return
+        size, mtime = e.size, e.mtime
+        if e.is_dir and e.name in known:
+            size, mtime = known[e.name].bytes, max(mtime, known[e.name].newest)
+        elif e.is_dir:
+            size = 0
+            for f in walk(e.path):
+                if not f.is_dir:
+                    size += f.size
+                    mtime = max(mtime, f.mtime)
+        t = router.target(e.path)
+        if t is None:
+            yield Candidate(e.path, size, mtime, 0, None, None)
+            continue
+        if t.path not in devices:
+            devices[t.path] = device_of(t.path)
+        yield Candidate(e.path, size, mtime, 0, router.counterpart(e.path, t), devices[t.path])
+
+def _rpc(method, params):
+    try:
+        reply = json.loads(xbmc.executeJSONRPC(json.dumps(
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": 1})))
+        return reply.get("result") or {}
+    except:
+        return {}
+
+def _timestamp(text):
+    try:
+        return time.mktime(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+    except:
+        return 0
+
+def last_played():
+    """
+    Map movie folders, movie files and show folders to the time Kodi last
+    played them, from the video library over JSON-RPC.
+    """
+    played = {}
+    movies = _rpc("VideoLibrary.GetMovies", {"properties": ["file", "lastplayed"]}).get("movies", [])
+    shows  = _rpc("VideoLibrary.GetTVShows", {"properties": ["file", "lastplayed"]}).get("tvshows", [])
+    for m in movies:
+        ts = _timestamp(m.get("lastplayed", ""))
+        f = m.get("file", "")
+        if f.startswith("stack://"):
+            f = f[len("stack://"):].split(" , ")[0]
+        for key in (f, os.path.dirname(f)):
+            played[key] = max(played.get(key, 0), ts)
+    for s in shows:
+        key = s.get("file", "").rstrip("/")
+        played[key] = max(played.get(key, 0), _timestamp(s.get("lastplayed", "")))
+    return played
+
+def order(candidates, policy):
+    if policy == POLICY_LARGEST:
+        return sorted(candidates, key=lambda c: -c.size)
+    if policy == POLICY_UNPLAYED:
+        return sorted(candidates, key=lambda c: (c.lastplayed, c.mtime))
+    return sorted(candidates, key=lambda c: c.mtime)
+
+def select(candidates, need):
+    """
+    Pick candidates that free at least `need` bytes.
+
+    Takes the shortest prefix of the policy-ordered list that covers `need`,
+    then solves a knapsack over that prefix: the subset with the smallest
+    total that still covers `need`, so no more is moved than necessary and
+    nothing is moved that the policy ranks lower. Sizes are rounded down to
+    buckets of need/DP_BUCKETS, which keeps the result a true cover.
+    """
+    prefix, total = [], 0
+    for c in candidates:
+        if total >= need:
+            break
+        prefix.append(c)
+        total += c.size
+    if total <= need or len(prefix) > DP_MAX_ITEMS:
+        return prefix
+
+    bucket  = max(1, need // DP_BUCKETS)
+    weights = [c.size // bucket for c in prefix]
+    goal    = -(-need // bucket)
+    masks   = [1]
+    for w in weights:
+        masks.append(masks[-1] | (masks[-1] << w))
+    reach = masks[-1] >> goal
+    if not reach:
+        return prefix
+    s = goal + ((reach & -reach).bit_length() - 1)
+
+    picked = []
+    for i in range(len(prefix) - 1, -1, -1):
+        if (masks[i] >> s) & 1:
+            continue
+        picked.append(prefix[i])
+        s -= weights[i]
+    picked.reverse()
+    return picked
+
+def plan_rebalance(target_free, policy, exclude=(), progress=None, should_stop=None):
+    """
+    Plan moves from internal to external storage until every internal drive
+    has `target_free` bytes free. Returns one Plan per internal drive.
+    `exclude` holds paths that are already queued; progress(root) is called
+    before each root is measured.
+    """
+    reserve = max(0, get_settings().free_space_reserve_mb) * 1024 * 1024
+    played  = last_played() if policy == POLICY_UNPLAYED else {}
+    exclude = set(exclude)
+
+    by_device = {}
+    for root in get_router().roots.values():
+        if root.side != 'internal':
+            continue
+        by_device.setdefault(device_of(root.path), []).append(root)
+
+    dest_free = {}
+    def dest_room(dev, path):
+        if dev not in dest_free:
+            base = existing_parent(path)
+            free = get_free_space(base) if base else None
+            dest_free[dev] = None if free is None else free - reserve
+        return dest_free[dev]
+
+    plans = []
+    for dev, roots in by_device.items():
+        free = get_free_space(roots[0].path)
+        if free is None:
+            continue
+        deficit = target_free - free
+        if deficit <= 0:
+            plans.append(Plan(dev, free, 0, [], 0))
+            continue
+
+        candidates = []
+        for root in roots:
+            if progress:
+                progress(root.path)
+            for c in measure(root.path, should_stop):
+                if c.path in exclude or not c.size or not c.dest:
+                    continue
+                candidates.append(c._replace(lastplayed=played.get(c.path, 0)))
+            if should_stop and should_stop():
+                return plans
+
+        # In volgorde van het beleid, tot het tekort gedekt is en zolang de bestemming plaats heeft
+        fitting, covered = [], 0
+        for c in order(candidates, policy):
+            if covered >= deficit:
+                break
+            room = dest_room(c.dst_dev, c.dest)
+            if room is not None and room < c.size:
+                continue
+            # Bestaat de titel al op extern, dan zou verplaatsen samenvoegen; overslaan
+            if stat_path(c.dest) is not None:
+                continue
+            if room is not None:
+                dest_free[c.dst_dev] = room - c.size
+            fitting.append(c)
+            covered += c.size
+
+        picked = select(fitting, deficit)
+        # Niet gekozen kandidaten geven hun gereserveerde ruimte terug
+        chosen = {c.path for c in picked}
+        for c in fitting:
+            if c.path not in chosen and dest_free.get(c.dst_dev) is not None:
+                dest_free[c.dst_dev] += c.size
+        plans.append(Plan(dev, free, deficit, picked, sum(c.size for c in picked)))
+    return plans
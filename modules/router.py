@@ -0,0 +1,159 @@
+# modules/router.py
+
+import re
+from collections import namedtuple
+
+from .settings import get_settings
+
+# A configured library root: which section it belongs to, which side it is
+# on ('internal' or 'external'), the root it moves back to when no rule
+# applies, and the name it is shown and targeted by.
+Root = namedtuple("Root", "section side path counterpart name")
+
+# A move rule: items on internal storage whose path below the root matches
+# `pattern` go to the root called `target` in the same section.
+Rule = namedtuple("Rule", "pattern target")
+
+class PathRouter:
+    """
+    Map any path to the library root it lives under and pick where it moves.
+
+    Roots are kept in a trie of path components, so a lookup costs one step
+    per component and '/Movies 4K' is never taken for a file under '/Movies'.
+    Besides the internal/external pairs a section can have any number of
+    named roots; rules decide which of them is the default target for
+    items on internal storage.
+    """
+
+    def __init__(self, pairs, named=(), rules=()):
+        self.roots    = {}
+        self.trie     = {}
+        self.sections = {}
+        self.names    = {}
+        self.rules    = list(rules)
+        for section, internal, external in pairs:
+            internal, external = internal.rstrip('/'), external.rstrip('/')
+            if not internal or not external:
+                continue
+            self._add(Root(section, 'internal', internal, external, "Internal"))
+            self._add(Root(section, 'external', external, internal, "External"))
+        for section, name, path in named:
+            path = path.rstrip('/')
+            home = next((r.path for r in self.sections.get(section, ()) if r.side == 'internal'), None)
+            if path and home:
+                self._add(Root(section, 'external', path, home, name))
+
+    def _add(self, root):
+        if root.path in self.roots:
+            return
+        self.roots[root.path] = root
+        self.sections.setdefault(root.section, []).append(root)
+        self.names.setdefault((root.section, root.name.lower()), root)
+        node = self.trie
+        for part in root.path.split('/'):
+            node = node.setdefault(part, {})
+        node[None] = root
+
+    def lookup(self, path):
+        """
+        Return the Root `path` lives under (the longest matching root), or None.
+        """
+        if not path:
+            return None
+        node, found = self.trie, None
+        for part in path.split('/'):
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+    def named(self, section, name):
+        return self.names.get((section, (name or "").lower()))
+
+    def targets(self, path):
+        """
+        Return every root `path` could be moved to: the other roots of its section.
+        """
+        root = self.lookup(path)
+        if root is None:
+            return []
+        return [r for r in self.sections[root.section] if r.path != root.path]
+
+    def target(self, path):
+        """
+        Return the Root `path` moves to by default, or None. Internal items
+        follow the first matching rule; everything else goes to its counterpart.
+        """
+        root = self.lookup(path)
+        if root is None:
+            return None
+        if root.side == 'internal':
+            rel = path[len(root.path):]
+            for rule in self.rules:
+                t = self.named(root.section, rule.target)
+                if t and t.path != root.path and rule.pattern.search(rel):
+                    return t
+        return self.roots.get(root.counterpart)
+
+    def counterpart(self, path, target=None):
+        """
+        Return the path `path` would be moved to, into `target` or the
+        default target, or None.
+        """
+        root = self.lookup(path)
+        target = target or self.target(path)
+        if root is None or target is None:
+            return None
+        return target.path + path[len(root.path):]
+
+def parse_roots(text):
+    """
+    Parse the 'extra_roots' setting into (pairs, named). Entries are
+    separated by ';' and are either an internal/external pair,
+    'movies|/storage/disk2/Movies|smb://nas/Movies', or a named location,
+    'movies|NAS|smb://nas/Movies'; a middle field without '/' is a name.
+    """
+    pairs, named = [], []
+    for entry in (text or "").split(";"):
+        parts = [p.strip() for p in entry.split("|")]
+        if len(parts) != 3 or not all(parts):
+            continue
+        if '/' in parts[1]:
+            pairs.append(tuple(parts))
+        else:
+            named.append(tuple(parts))
+    return pairs, named
+
+def parse_move_rules(text):
+    """
+    Parse the 'move_rules' setting: 'pattern=name' entries separated by
+    ';', e.g. '2160p|4K=NAS;*=USB1'. The pattern is a case-insensitive
+    regular expression; '*' matches everything. Invalid entries are skipped.
+    """
+    rules = []
+    for entry in (text or "").split(";"):
+        pattern, sep, name = entry.rpartition("=")
+        pattern, name = pattern.strip(), name.strip()
+        if not sep or not pattern or not name:
+            continue
+        try:
+            rules.append(Rule(re.compile("" if pattern == "*" else pattern, re.I), name))
+        except re.error:
+            continue
+    return rules
+
+_router = None
+
+def get_router():
+    global _router
+    if _router is None:
+        s = get_settings()
+        pairs, named = parse_roots(s.extra_roots)
+        pairs = [("movies", s.path1, s.path2), ("tvshows", s.tvpath1, s.tvpath2)] + pairs
+        _router = PathRouter(pairs, named, parse_move_rules(s.move_rules))
+    return _router
+
+def reset_router():
+    global _router
+    _router = None
@@ -0,0 +1,87 @@
+# modules/service.py
+
+import time
+import threading
+import xbmc
+import xbmcgui
+
+from .common import addon_id
+from .settings import reload_settings
+from . import sizes
+from .batch import (
+    get_store, run_batch, is_running, set_running,
+    HEARTBEAT_INTERVAL, SERVICE_HEARTBEAT
+)
+
+class BatchService(xbmc.Monitor):
+    """
+    Long-running addon service that owns the batch job queue.
+
+    Plugin calls queue a job in the store and wake the service with a
+    JSON-RPC NotifyAll message; jobs are run one at a time outside the
+    plugin invocation, and unfinished jobs are picked up again after a
+    restart. A Home window property carries the service heartbeat. While
+    idle it keeps the folder-size index up to date.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.wake      = threading.Event()
+        self.window    = xbmcgui.Window(10000)
+        self.sizes_due = 0.0
+
+    def onNotification(self, sender, method, data):
+        if sender != addon_id:
+            return
+        if method.endswith("wake"):
+            self.wake.set()
+        elif method.endswith("stop"):
+            set_running(False)
+
+    def onSettingsChanged(self):
+        reload_settings()
+
+    def _heartbeat(self):
+        while not self.abortRequested():
+            self.window.setProperty(SERVICE_HEARTBEAT, str(time.time()))
+            if self.waitForAbort(HEARTBEAT_INTERVAL):
+                break
+        self.window.clearProperty(SERVICE_HEARTBEAT)
+
+    def _refresh_sizes(self):
+        # Alleen als er geen batch loopt; een nieuwe job onderbreekt de ronde
+        if time.monotonic() < self.sizes_due or not sizes.enabled() or is_running():
+            return
+        try:
+            done = sizes.refresh_all(should_stop=lambda: self.abortRequested() or self.wake.is_set())
+        except Exception as e:
+            xbmc.log(f"[{addon_id}] folder size refresh failed: {e}", xbmc.LOGWARNING)
+            done = True
+        if done:
+            self.sizes_due = time.monotonic() + sizes.REFRESH_INTERVAL
+
+    def run(self):
+        # Lock van een eerdere crash opruimen
+        if not is_running():
+            set_running(False)
+
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+        self.wake.set()
+        while not self.abortRequested():
+            if not self.wake.wait(1):
+                self._refresh_sizes()
+                continue
+            self.wake.clear()
+            while not self.abortRequested():
+                job = get_store().next_job()
+                if not job:
+                    break
+                seq, options = job
+                try:
+                    run_batch(**options)
+                except Exception as e:
+                    xbmc.log(f"[{addon_id}] batch job failed: {e}", xbmc.LOGERROR)
+                # Bij afsluiten blijft de job staan en wordt hij na herstart hervat
+                if not self.abortRequested():
+                    get_store().finish_job(seq)
+                self.sizes_due = 0.0
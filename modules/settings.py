@@ -0,0 +1,68 @@
+# modules/settings.py
+
+from collections import namedtuple
+
+from .common import addon
+
+# Instelling-id -> type; bepaalt ook de velden van de snapshot
+SPEC = {
+    'path1':                 str,
+    'path2':                 str,
+    'tvpath1':               str,
+    'tvpath2':               str,
+    'extra_roots':           str,
+    'move_rules':            str,
+    'use_thumbnails':        bool,
+    'allow_delete':          bool,
+    'switch_to_network':     bool,
+    'use_custom_action':     bool,
+    'custom_action_label':   str,
+    'custom_action_command': str,
+    'targeted_library_scan': bool,
+    'copy_buffer_mb':        int,
+    'verify_mode':           int,
+    'per_device_workers':    int,
+    'listing_cache_size':    int,
+    'folder_sizes':          bool,
+    'free_space_reserve_mb': int,
+    'page_size':             int,
+    'instrumentation':       bool,
+    'throttle_mb_s':         int,
+    'playback_mode':         int,
+    'playback_mb_s':         int,
+    'low_io_priority':       bool,
+    'rebalance_target_gb':   int,
+    'rebalance_policy':      int,
+}
+
+Settings = namedtuple("Settings", list(SPEC))
+
+_snapshot = None
+
+def _read(key, typ):
+    try:
+        if typ is bool:
+            return addon.getSettingBool(key)
+        if typ is int:
+            return addon.getSettingInt(key)
+        return addon.getSettingString(key)
+    except:
+        return typ()
+
+def get_settings():
+    """
+    Return an immutable snapshot of all addon settings, read once per invocation.
+    """
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = Settings(**{k: _read(k, t) for k, t in SPEC.items()})
+    return _snapshot
+
+def reload_settings():
+    """
+    Drop the snapshot (and the router built from it) after the settings changed.
+    """
+    global _snapshot
+    _snapshot = None
+    from . import router
+    router.reset_router()
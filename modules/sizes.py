@@ -0,0 +1,264 @@
+# modules/sizes.py
+
+import os
+from collections import namedtuple
+
+from . import trace
+from .db import Database, settled
+from .common import sizes_file
+from .settings import get_settings
+from .router import get_router
+
+# Zo vaak brengt de service de index bij als er niets anders te doen is
+REFRESH_INTERVAL = 30 * 60
+
+# Totals for one directory and everything below it.
+Size = namedtuple("Size", "bytes files newest")
+
+class FolderSizes(Database):
+    """
+    Persistent index of aggregate sizes per directory below the library roots.
+
+    Every row keeps the directory's own mtime, the bytes, file count and
+    newest mtime of its direct files, and the same totals for its whole
+    subtree. refresh() only lists directories whose mtime changed and stats
+    the others; fileops reports moves and deletes in between, so totals
+    stay right without a rescan.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS dirs (
+            path       TEXT PRIMARY KEY,
+            parent     TEXT NOT NULL,
+            mtime      REAL,
+            own_bytes  INTEGER NOT NULL,
+            own_files  INTEGER NOT NULL,
+            own_newest REAL NOT NULL,
+            bytes      INTEGER NOT NULL,
+            files      INTEGER NOT NULL,
+            newest     REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+    """
+
+    @staticmethod
+    def _below(path):
+        # '0' volgt direct op '/', dus dit bereik is precies de submappen
+        return "path = ? OR (path >= ? AND path < ?)", (path, path + '/', path + '0')
+
+    def _subtree(self, conn, path):
+        where, args = self._below(path)
+        return {r[0]: r[1:] for r in conn.execute(
+            "SELECT path, parent, mtime, own_bytes, own_files, own_newest, bytes, files, newest "
+            "FROM dirs WHERE " + where, args)}
+
+    def get(self, path):
+        """
+        Return the Size of an indexed directory, or None.
+        """
+        try:
+            with self.lock:
+                row = self._db().execute("SELECT bytes, files, newest FROM dirs WHERE path = ?",
+                                         (path.rstrip('/'),)).fetchone()
+            return Size(*row) if row else None
+        except:
+            return None
+
+    def children(self, path):
+        """
+        Return {name: Size} for the indexed subdirectories of `path`, in one query.
+        """
+        try:
+            with self.lock:
+                rows = self._db().execute("SELECT path, bytes, files, newest FROM dirs WHERE parent = ?",
+                                          (path.rstrip('/'),)).fetchall()
+        except:
+            return {}
+        return {os.path.basename(p): Size(b, f, n) for p, b, f, n in rows}
+
+    def refresh(self, root, should_stop=None):
+        """
+        Bring the index below `root` up to date. Directories whose mtime is
+        unchanged are only stat'ed; the others are listed again. Returns
+        False when stopped, in which case nothing is written.
+        """
+        from .fileops import scan_dir, stat_path
+        root = root.rstrip('/')
+        top = stat_path(root)
+        if top is None or not top.is_dir:
+            return True
+        with self.lock:
+            rows = self._subtree(self._db(), root)
+        kids = {}
+        for p, r in rows.items():
+            kids.setdefault(r[0], []).append(p)
+
+        seen, order = {}, []
+        stack = [(root, os.path.dirname(root), top.mtime)]
+        with trace.span("sizes.refresh"):
+            while stack:
+                if should_stop and should_stop():
+                    return False
+                path, parent, mtime = stack.pop()
+                old = rows.get(path)
+                subdirs = []
+                if old and old[1] == mtime:
+                    own = old[2:5]
+                    for c in kids.get(path, ()):
+                        e = stat_path(c)
+                        if e and e.is_dir:
+                            subdirs.append((c, e.mtime))
+                else:
+                    trace.add("sizes.listed")
+                    nbytes = nfiles = 0
+                    newest = 0.0
+                    try:
+                        for e in scan_dir(path):
+                            if e.is_dir:
+                                subdirs.append((e.path, e.mtime))
+                            else:
+                                nbytes += e.size
+                                nfiles += 1
+                                newest = max(newest, e.mtime or 0)
+                    except:
+                        if not old:
+                            continue
+                        # Onleesbaar: oude stand houden en later opnieuw proberen
+                        nbytes, nfiles, newest = old[2:5]
+                        subdirs = [(c, None) for c in kids.get(path, ())]
+                        mtime = None
+                    own = (nbytes, nfiles, newest)
+                    if not settled(mtime):
+                        mtime = None
+                seen[path] = (parent, mtime) + tuple(own)
+                order.append(path)
+                for c, m in subdirs:
+                    stack.append((c, path, m))
+
+        # Kinderen staan na hun ouder in `order`, dus achterstevoren optellen
+        totals, children = {}, {}
+        for path in order:
+            children.setdefault(seen[path][0], []).append(path)
+        for path in reversed(order):
+            nbytes, nfiles, newest = seen[path][2:5]
+            for c in children.get(path, ()):
+                cb, cf, cn = totals[c]
+                nbytes += cb
+                nfiles += cf
+                newest = max(newest, cn)
+            totals[path] = (nbytes, nfiles, newest)
+
+        changed = []
+        for path in order:
+            row = seen[path] + totals[path]
+            if rows.get(path) != row:
+                changed.append((path,) + row)
+        gone = [(p,) for p in rows if p not in seen]
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.executemany("DELETE FROM dirs WHERE path = ?", gone)
+                conn.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", changed)
+        trace.add("sizes.changed", len(changed) + len(gone))
+        return True
+
+    def _adjust(self, conn, path, nbytes, nfiles, own=False):
+        """
+        Add to the totals of every indexed ancestor of `path`; with `own`
+        also to the direct files of its parent.
+        """
+        parents = []
+        p = path
+        while True:
+            q = os.path.dirname(p)
+            if not q or q == p:
+                break
+            parents.append(q)
+            p = q
+        if not parents:
+            return
+        conn.executemany("UPDATE dirs SET bytes = bytes + ?, files = files + ? WHERE path = ?",
+                         [(nbytes, nfiles, q) for q in parents])
+        if own:
+            conn.execute("UPDATE dirs SET own_bytes = own_bytes + ?, own_files = own_files + ? WHERE path = ?",
+                         (nbytes, nfiles, parents[0]))
+
+    def _drop(self, conn, path):
+        row = conn.execute("SELECT bytes, files FROM dirs WHERE path = ?", (path,)).fetchone()
+        if not row:
+            return None
+        where, args = self._below(path)
+        conn.execute("DELETE FROM dirs WHERE " + where, args)
+        self._adjust(conn, path, -row[0], -row[1])
+        return row
+
+    def removed(self, path, size=None):
+        """
+        A folder or a file of `size` bytes was deleted.
+        """
+        if not enabled():
+            return
+        path = path.rstrip('/')
+        try:
+            with self.lock:
+                conn = self._db()
+                with conn:
+                    if self._drop(conn, path) is None and size is not None:
+                        self._adjust(conn, path, -size, -1, own=True)
+        except:
+            pass
+
+    def moved(self, src, dst, size=None):
+        """
+        A folder or a file of `size` bytes was moved from `src` to `dst`; the
+        folder's rows are carried over so the destination is known at once.
+        """
+        if not enabled():
+            return
+        src, dst = src.rstrip('/'), dst.rstrip('/')
+        try:
+            with self.lock:
+                conn = self._db()
+                with conn:
+                    # Een overschreven doelmap telt niet meer mee
+                    self._drop(conn, dst)
+                    rows = self._subtree(conn, src)
+                    if src in rows:
+                        self._drop(conn, src)
+                        top = rows[src]
+                        self._adjust(conn, dst, top[5], top[6])
+                        if not conn.execute("SELECT 1 FROM dirs WHERE path = ?",
+                                            (os.path.dirname(dst),)).fetchone():
+                            return
+                        conn.executemany("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+                            (dst + p[len(src):],
+                             os.path.dirname(dst) if p == src else dst + r[0][len(src):]) + r[1:]
+                            for p, r in rows.items()])
+                    elif size is not None:
+                        self._adjust(conn, src, -size, -1, own=True)
+                        self._adjust(conn, dst, size, 1, own=True)
+        except:
+            pass
+
+    def clear(self):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM dirs")
+
+folder_sizes = FolderSizes(sizes_file)
+
+def enabled():
+    try:
+        return get_settings().folder_sizes
+    except:
+        return False
+
+def refresh_all(should_stop=None):
+    """
+    Refresh the index for every configured root; returns False when stopped.
+    """
+    for root in sorted(get_router().roots):
+        if not folder_sizes.refresh(root, should_stop):
+            return False
+    return True
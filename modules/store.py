@@ -0,0 +1,225 @@
+# modules/store.py
+
+import os
+import json
+import time
+
+from .db import Database
+
+# Aantal journaalregels dat na compactie bewaard blijft
+JOURNAL_KEEP = 5000
+
+class BatchStore(Database):
+    """
+    SQLite-backed batch list keyed by (path, action).
+
+    `items` holds the queue (indexed, so duplicate checks and removals are
+    O(log n)) and the root each planned move goes to; `journal` is an
+    append-only log of start/done/failed events per op; `jobs` holds batch
+    runs submitted to the background service.
+    The database runs in WAL mode, so every checkpoint is a small
+    crash-safe transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+            path   TEXT NOT NULL,
+            action TEXT NOT NULL,
+            state  TEXT NOT NULL DEFAULT 'queued',
+            target TEXT,
+            UNIQUE (path, action)
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            seq     INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts      REAL NOT NULL,
+            options TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS journal (
+            seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts     REAL NOT NULL,
+            event  TEXT NOT NULL,
+            path   TEXT,
+            action TEXT,
+            detail TEXT
+        );
+    """
+
+    def __init__(self, path, legacy_files=()):
+        super().__init__(path)
+        self.legacy_files = legacy_files
+
+    def _opened(self):
+        self._migrate()
+
+    def _migrate(self):
+        # Lijsten van voor de doelkolom krijgen hem erbij; hun items worden opnieuw gerouteerd
+        cols = [r[1] for r in self.conn.execute("PRAGMA table_info(items)")]
+        if 'target' not in cols:
+            with self.conn:
+                self.conn.execute("ALTER TABLE items ADD COLUMN target TEXT")
+        # batchlist.json of het oude journaalbestand eenmalig overnemen
+        for legacy in self.legacy_files:
+            if not os.path.exists(legacy):
+                continue
+            items = []
+            try:
+                with open(legacy, 'r') as f:
+                    if legacy.endswith('.json'):
+                        items = [(i['path'], i['action']) for i in json.load(f)]
+                    else:
+                        pending = {}
+                        for line in f:
+                            try:
+                                rec = json.loads(line)
+                            except:
+                                continue
+                            key = (rec.get('p'), rec.get('a'))
+                            if rec.get('e') == 'enqueue':
+                                pending.setdefault(key, True)
+                            elif rec.get('e') in ('remove', 'done', 'failed'):
+                                pending.pop(key, None)
+                        items = list(pending)
+            except:
+                continue
+            self.add_many(items)
+            try:
+                os.remove(legacy)
+            except:
+                pass
+
+    def _log(self, conn, event, path=None, action=None, detail=None):
+        if detail is not None and not isinstance(detail, str):
+            detail = json.dumps(detail)
+        conn.execute("INSERT INTO journal (ts, event, path, action, detail) VALUES (?, ?, ?, ?, ?)",
+                     (time.time(), event, path, action, detail))
+
+    def count(self):
+        with self.lock:
+            return self._db().execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def contains(self, path, action):
+        with self.lock:
+            return self._db().execute(
+                "SELECT 1 FROM items WHERE path = ? AND action = ?", (path, action)).fetchone() is not None
+
+    def page(self, offset=0, limit=-1):
+        """
+        Return queued items as [{'path', 'action'}] in queue order, `limit` at a
+        time. Planned moves also carry the path of their target root in 'target'.
+        """
+        with self.lock:
+            rows = self._db().execute(
+                "SELECT path, action, target FROM items ORDER BY seq LIMIT ? OFFSET ?",
+                (limit, offset)).fetchall()
+        items = []
+        for p, a, t in rows:
+            item = {'path': p, 'action': a}
+            if t:
+                item['target'] = t
+            items.append(item)
+        return items
+
+    def items(self):
+        return self.page()
+
+    def add_many(self, items):
+        """
+        Enqueue [(path, action), ...] in one transaction; returns how many were new.
+        """
+        with self.lock:
+            conn = self._db()
+            with conn:
+                before = conn.total_changes
+                conn.executemany("INSERT OR IGNORE INTO items (path, action) VALUES (?, ?)", items)
+                return conn.total_changes - before
+
+    def remove_many(self, items):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                before = conn.total_changes
+                conn.executemany("DELETE FROM items WHERE path = ? AND action = ?", items)
+                return conn.total_changes - before
+
+    def replace(self, items):
+        """
+        Atomically replace the whole queue with `items` [(path, action), ...];
+        an item may add the path of its target root as a third field.
+        """
+        rows = [(i[0], i[1], i[2] if len(i) > 2 else None) for i in items]
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM items")
+                conn.executemany("INSERT OR IGNORE INTO items (path, action, target) VALUES (?, ?, ?)", rows)
+
+    def start(self, path, action):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("UPDATE items SET state = 'started' WHERE path = ? AND action = ?",
+                             (path, action))
+                self._log(conn, 'start', path, action)
+
+    def finish(self, path, action, ok, detail=None):
+        """
+        Record the outcome of an op and take it off the queue.
+        """
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM items WHERE path = ? AND action = ?", (path, action))
+                self._log(conn, 'done' if ok else 'failed', path, action, detail)
+
+    def requeue(self, path, action):
+        """
+        Put an op that was stopped halfway back in the queue for the next run.
+        """
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("UPDATE items SET state = 'queued' WHERE path = ? AND action = ?",
+                             (path, action))
+                self._log(conn, 'aborted', path, action)
+
+    def log(self, event, path=None, action=None, detail=None):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                self._log(conn, event, path, action, detail)
+
+    def add_job(self, options):
+        """
+        Queue a batch run with `options` for the background service.
+        """
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("INSERT INTO jobs (ts, options) VALUES (?, ?)",
+                             (time.time(), json.dumps(options)))
+
+    def next_job(self):
+        """
+        Return (seq, options) of the oldest queued job, or None.
+        """
+        with self.lock:
+            row = self._db().execute("SELECT seq, options FROM jobs ORDER BY seq LIMIT 1").fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def finish_job(self, seq):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM jobs WHERE seq = ?", (seq,))
+
+    def compact(self):
+        """
+        Drop old journal events and checkpoint the WAL into the database.
+        """
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.execute("DELETE FROM journal WHERE seq <= (SELECT MAX(seq) FROM journal) - ?",
+                             (JOURNAL_KEEP,))
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
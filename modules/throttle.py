@@ -0,0 +1,178 @@
+# modules/throttle.py
+
+import time
+import shutil
+import threading
+import subprocess
+import xbmc
+
+from .settings import get_settings
+from .executor import device_of
+
+# Wat er gebeurt als er wordt afgespeeld van een schijf waar de batch op werkt
+PLAYBACK_IGNORE, PLAYBACK_SLOW, PLAYBACK_PAUSE = 0, 1, 2
+
+# Hoe lang de afspeelstatus geldig blijft voordat Player opnieuw gevraagd wordt
+PLAYER_POLL = 2.0
+
+# Zoveel seconden aan data mag in één keer doorschieten
+BURST = 0.5
+
+MB = 1024 * 1024
+
+class Stopped(Exception):
+    """
+    Raised from a throttled copy callback when the batch is stopped while
+    paused; the copy gives up and keeps its resume journal.
+    """
+
+class _Bucket:
+    """
+    Rate limiter for one device: every consumer reserves its bytes on a
+    shared timeline and sleeps once it runs more than BURST seconds ahead.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next = 0.0
+
+    def reserve(self, n, rate):
+        with self.lock:
+            now   = time.monotonic()
+            start = max(now, self.next)
+            self.next = start + n / rate
+            return self.next - now - BURST
+
+class _Playback:
+    """
+    Device of the file Kodi is playing, polled at most every PLAYER_POLL seconds.
+    """
+
+    def __init__(self):
+        self.lock    = threading.Lock()
+        self.checked = 0.0
+        self.device  = None
+
+    def current(self):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.checked < PLAYER_POLL:
+                return self.device
+            self.checked = now
+            self.device  = None
+            try:
+                player = xbmc.Player()
+                if player.isPlaying():
+                    self.device = device_of(player.getPlayingFile())
+            except:
+                pass
+            return self.device
+
+class Throttle:
+    """
+    Per-device bandwidth limit for one batch, from the settings:
+    'throttle_mb_s' caps every device (0 = unlimited), and while Kodi plays
+    from a device the batch touches, 'playback_mode' slows that device down
+    to 'playback_mb_s' or pauses it until playback stops.
+    """
+
+    def __init__(self, should_stop=None):
+        s = get_settings()
+        self.rate          = max(0, s.throttle_mb_s) * MB
+        self.mode          = s.playback_mode
+        self.playback_rate = max(1, s.playback_mb_s) * MB
+        self.should_stop   = should_stop or (lambda: False)
+        self.buckets       = {}
+        self.lock          = threading.Lock()
+        self.playback      = _Playback()
+        self.on_pause      = None
+
+    def _bucket(self, device):
+        with self.lock:
+            b = self.buckets.get(device)
+            if b is None:
+                b = self.buckets[device] = _Bucket()
+            return b
+
+    def _rate_for(self, device):
+        if self.mode != PLAYBACK_IGNORE and device is not None and self.playback.current() == device:
+            if self.mode == PLAYBACK_PAUSE:
+                return None
+            return min(self.rate, self.playback_rate) if self.rate else self.playback_rate
+        return self.rate
+
+    def wait(self, devices, n):
+        """
+        Block until `n` more bytes may be moved on `devices`. Returns False
+        when the batch is being stopped.
+        """
+        for dev in devices:
+            rate = self._rate_for(dev)
+            if rate is None and self.on_pause:
+                self.on_pause(True)
+            while rate is None:
+                if self.should_stop():
+                    return False
+                time.sleep(1.0)
+                rate = self._rate_for(dev)
+                if rate is not None and self.on_pause:
+                    self.on_pause(False)
+            if not rate:
+                continue
+            delay = self._bucket(dev).reserve(n, rate)
+            if delay > 0:
+                time.sleep(delay)
+        return True
+
+    @property
+    def active(self):
+        return bool(self.rate) or self.mode != PLAYBACK_IGNORE
+
+    def wrap(self, progress, devices):
+        """
+        Wrap a copy progress callback so every reported chunk passes the limiter.
+        """
+        if not self.active:
+            return progress
+        state = {'last': None}
+        def cb(done, total):
+            last = state['last']
+            state['last'] = None if done >= total else done
+            if last is not None and done > last:
+                ok = self.wait(devices, done - last)
+            elif last is None and done < total:
+                # Begin van een bestand: pauzeren kan al voordat er iets gelezen is
+                ok = self.wait(devices, 0)
+            else:
+                ok = True
+            if not ok:
+                raise Stopped()
+            if progress:
+                progress(done, total)
+        return cb
+
+_lowered = set()
+_ionice  = None
+
+def lower_io_priority():
+    """
+    Give the calling thread the lowest best-effort I/O priority via ionice,
+    so Kodi's own reads (playback) win. Done once per thread; a no-op where
+    ionice is not available.
+    """
+    global _ionice
+    if not get_settings().low_io_priority or not hasattr(threading, "get_native_id"):
+        return
+    tid = threading.get_native_id()
+    if tid in _lowered:
+        return
+    _lowered.add(tid)
+    if _ionice is None:
+        _ionice = shutil.which("ionice") or ""
+    if not _ionice:
+        return
+    try:
+        subprocess.run([_ionice, "-c", "2", "-n", "7", "-p", str(tid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=2)
+    except:
+        pass
@@ -0,0 +1,185 @@
+# modules/trace.py
+
+import os
+import json
+import time
+import threading
+import xbmc
+
+from .common import reports_dir
+from .settings import get_settings
+
+# Aantal rapporten dat in de profielmap bewaard blijft
+REPORTS_KEEP = 20
+
+# Maximaal aantal ops met eigen regel in een rapport; de rest telt alleen mee
+MAX_OPS = 20000
+
+class _Noop:
+    """
+    Span returned while nothing is recorded; entering and leaving it costs nothing.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+_NOOP = _Noop()
+
+class _Span:
+    __slots__ = ("rec", "name", "t0")
+
+    def __init__(self, rec, name):
+        self.rec  = rec
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.rec.add_time(self.name, time.perf_counter() - self.t0)
+        return False
+
+class Recorder:
+    """
+    Timings, counters and per-op results of one batch or plugin call.
+    """
+
+    def __init__(self, label):
+        self.label    = label
+        self.started  = time.time()
+        self.t0       = time.perf_counter()
+        self.spans    = {}
+        self.counters = {}
+        self.ops      = []
+        self.lock     = threading.Lock()
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            s = self.spans.get(name)
+            if s is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                s[0] += 1
+                s[1] += seconds
+                if seconds > s[2]:
+                    s[2] = seconds
+
+    def add(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def op(self, path, action, seconds, ok, nbytes=0):
+        with self.lock:
+            if len(self.ops) < MAX_OPS:
+                self.ops.append({'path': path, 'action': action, 'seconds': round(seconds, 4),
+                                 'bytes': nbytes, 'ok': bool(ok)})
+
+    def as_dict(self, extra=None):
+        duration = time.perf_counter() - self.t0
+        with self.lock:
+            report = {
+                'label':    self.label,
+                'started':  time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+                'duration': round(duration, 3),
+                'spans':    {k: {'count': c, 'total': round(t, 4), 'max': round(m, 4)}
+                             for k, (c, t, m) in sorted(self.spans.items(), key=lambda kv: -kv[1][1])},
+                'counters': dict(sorted(self.counters.items())),
+                'ops':      list(self.ops),
+            }
+        if extra:
+            report.update(extra)
+        return report
+
+    def summary(self):
+        """
+        One log line: total time and the five most expensive spans.
+        """
+        with self.lock:
+            top = sorted(self.spans.items(), key=lambda kv: -kv[1][1])[:5]
+        parts = [f"{k} {t:.3f}s/{c}x" for k, (c, t, _) in top]
+        return f"{self.label}: {time.perf_counter() - self.t0:.3f}s; " + ", ".join(parts)
+
+# Actieve opname van dit proces, of None als instrumentatie uit staat
+_recorder = None
+
+def begin(label):
+    """
+    Start recording if the 'instrumentation' setting is on and nothing else
+    is being recorded. Returns the Recorder to hand to end(), or None.
+    """
+    global _recorder
+    if _recorder is not None:
+        return None
+    try:
+        if not get_settings().instrumentation:
+            return None
+    except:
+        return None
+    _recorder = Recorder(label)
+    return _recorder
+
+def end(rec, extra=None, write=True):
+    """
+    Stop recording `rec`. Writes a JSON report to the profile's reports folder
+    (or only logs a summary with write=False) and returns the report path.
+    """
+    global _recorder
+    if rec is None:
+        return None
+    if _recorder is rec:
+        _recorder = None
+    xbmc.log(f"[batchman] {rec.summary()}", xbmc.LOGINFO)
+    if not write:
+        return None
+    try:
+        os.makedirs(reports_dir, exist_ok=True)
+        name = f"{rec.label}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(rec.started))}.json"
+        path = os.path.join(reports_dir, name)
+        with open(path, 'w') as f:
+            json.dump(rec.as_dict(extra), f, indent=1)
+        _prune()
+        return path
+    except:
+        return None
+
+def _prune():
+    reports = [n for n in os.listdir(reports_dir) if n.endswith('.json')]
+    by_age  = sorted(reports, key=lambda n: os.path.getmtime(os.path.join(reports_dir, n)))
+    for n in by_age[:-REPORTS_KEEP]:
+        try:
+            os.remove(os.path.join(reports_dir, n))
+        except:
+            pass
+
+def span(name):
+    """
+    Time a block: `with trace.span("copy.local"): ...`.
+    """
+    rec = _recorder
+    if rec is None:
+        return _NOOP
+    return _Span(rec, name)
+
+def add(name, n=1):
+    """
+    Add `n` to a counter (bytes, cache hits, ...).
+    """
+    rec = _recorder
+    if rec is not None:
+        rec.add(name, n)
+
+def op(path, action, seconds, ok, nbytes=0):
+    """
+    Record the outcome and duration of one batch op.
+    """
+    rec = _recorder
+    if rec is not None:
+        rec.op(path, action, seconds, ok, nbytes)
+
+def active():
+    return _recorder is not None
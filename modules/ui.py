@@ -9,37 +9,54 @@ import os
 import time
 import xbmcvfs
 
-from .common import addon, addon_id
-from .batch import load_batchlist, remove_from_batch
+from . import trace
+from .common import addon_id, dedup_file
+from .settings import get_settings
+from .router import parse_roots, get_router
+from .cache import list_dir_cached
+from . import sizes
 from .fileops import (
     get_move_destination,
     get_item_location,
-    move_item,
-    delete_item,
-    bulk_action,
-    get_thumbnail_for_path,
-    get_free_space
+    get_thumbnail_for_path
 )
 
-handle = int(sys.argv[1])
+# probe, dedup en batch worden pas geladen door de functies die ze nodig hebben,
+# zodat elke plugin-aanroep alleen betaalt voor wat hij gebruikt.
+
+def _handle():
+    return int(sys.argv[1])
 
 def list_main_menu():
     add_section("Movies", "movies")
     add_section("TV Shows", "tvshows")
     add_section("Batch List", "batchlist")
-
-    if addon.getSettingBool("use_custom_action"):
-        label = addon.getSettingString("custom_action_label").strip()
-        script = addon.getSettingString("custom_action_script").strip()
-        if label and script:
+    add_section("Find Duplicates", "duplicates")
+    add_section("Rebalance Storage", "rebalance")
+    add_section("Bulk Actions", "bulk")
+
+    s = get_settings()
+    if s.use_custom_action:
+        label = s.custom_action_label.strip()
+        command = s.custom_action_command.strip()
+        if label and command:
             add_section(label, "custom_action")
 
-    xbmcplugin.endOfDirectory(handle)
+    xbmcplugin.endOfDirectory(_handle())
 
 def add_section(title, section):
     if section == "custom_action":
         url = f"plugin://{addon_id}?customaction=1"
         is_folder = False
+    elif section == "duplicates":
+        url = f"plugin://{addon_id}?dedup=1"
+        is_folder = False
+    elif section == "rebalance":
+        url = f"plugin://{addon_id}?rebalance=1"
+        is_folder = False
+    elif section == "bulk":
+        url = f"plugin://{addon_id}?bulkaction=1"
+        is_folder = False
     else:
         url = f"plugin://{addon_id}?section={section}"
         is_folder = True
@@ -47,7 +64,7 @@ def add_section(title, section):
     li = xbmcgui.ListItem(label=title)
     li.setProperty("IsFolder", "true" if is_folder else "false")
 
-    if addon.getSettingBool("use_thumbnails"):
+    if get_settings().use_thumbnails:
         art_map = {
             'movies':        "main_movies.jpg",
             'tvshows':       "main_tvshows.jpg",
@@ -59,27 +76,52 @@ def add_section(title, section):
             thumb = f"special://home/addons/{addon_id}/resources/media/{art}"
             li.setArt({'thumb': thumb, 'icon': thumb})
 
-    xbmcplugin.addDirectoryItem(handle, url, li, isFolder=is_folder)
+    xbmcplugin.addDirectoryItem(_handle(), url, li, isFolder=is_folder)
+
+def list_section(section, page=0):
+    if section == "batchlist":
+        list_batch(page)
+        return
 
-def list_section(section):
-    sw_net = addon.getSettingBool("switch_to_network")
+    s = get_settings()
+    sw_net = s.switch_to_network
+    roots = []
     if section == "movies":
-        add_dir("Internal Storage Movies", addon.getSettingString("path1"))
         ext_label = "Network Location Movies" if sw_net else "External USB Movies"
-        add_dir(ext_label, addon.getSettingString("path2"))
+        roots += [("Internal Storage Movies", s.path1), (ext_label, s.path2)]
     elif section == "tvshows":
-        add_dir("Internal Storage TV Shows", addon.getSettingString("tvpath1"))
         ext_label = "Network Location TV Shows" if sw_net else "External USB TV Shows"
-        add_dir(ext_label, addon.getSettingString("tvpath2"))
-    elif section == "batchlist":
-        list_batch()
-    xbmcplugin.endOfDirectory(handle)
-
-def add_dir(name, path):
-    free = get_free_space(path)
-    if free is not None:
-        gb = free / (1024**3)
-        name = f"{name} [COLOR lightblue]({gb:.1f} GB free)[/COLOR]"
+        roots += [("Internal Storage TV Shows", s.tvpath1), (ext_label, s.tvpath2)]
+
+    # Extra locatieparen en benoemde opslaglocaties uit de instellingen
+    pairs, named = parse_roots(s.extra_roots)
+    for sec, internal, external in pairs:
+        if sec == section:
+            roots.append((f"Internal Storage {os.path.basename(internal)}", internal))
+            roots.append((f"External {os.path.basename(external)}", external))
+    for sec, name, path in named:
+        if sec == section:
+            roots.append((name, path))
+
+    # Alle schijven tegelijk meten; een slapende of dode mount blokkeert het menu niet
+    from .probe import probe_roots
+    probes = probe_roots([p for _, p in roots])
+    for name, path in roots:
+        add_dir(name, path, probes.get(path))
+    xbmcplugin.endOfDirectory(_handle())
+
+def add_dir(name, path, probe=None):
+    if probe is None:
+        from .probe import probe_roots
+        probe = probe_roots([path])[path]
+    if not probe.ok and not probe.stale:
+        name = f"{name} [COLOR red](unreachable)[/COLOR]"
+    elif probe.free is not None:
+        gb = probe.free / (1024**3)
+        mark = "~" if probe.stale else ""
+        name = f"{name} [COLOR lightblue]({mark}{gb:.1f} GB free)[/COLOR]"
+    elif probe.stale:
+        name = f"{name} [COLOR grey](not responding)[/COLOR]"
 
     url = f"plugin://{addon_id}?path={urllib.parse.quote(path)}"
     li = xbmcgui.ListItem(label=name)
@@ -90,26 +132,71 @@ def add_dir(name, path):
     if thumb:
         li.setArt({'thumb': thumb, 'icon': thumb})
 
-    try:
-        real = xbmcvfs.translatePath(path)
-        mtime = os.path.getmtime(real)
-        date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
-    except:
-        date_str = ""
+    date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(probe.mtime)) if probe.mtime else ""
     li.setInfo('video', {'title': name, 'date': date_str})
 
-    xbmcplugin.addDirectoryItem(handle, url, li, isFolder=True)
-    xbmcplugin.addSortMethod(handle, xbmcplugin.SORT_METHOD_LABEL)
-    xbmcplugin.setContent(handle, "videos")
+    xbmcplugin.addDirectoryItem(_handle(), url, li, isFolder=True)
+    xbmcplugin.addSortMethod(_handle(), xbmcplugin.SORT_METHOD_LABEL)
+    xbmcplugin.setContent(_handle(), "videos")
+
+def page_size():
+    """
+    Entries per page from the 'page_size' setting; 0 means everything on one page.
+    """
+    return max(0, get_settings().page_size)
 
-def list_batch():
-    bl = load_batchlist()
-    allow_del = addon.getSettingBool("allow_delete")
+def next_page_item(url, page, total, size):
+    li = xbmcgui.ListItem(label=f"[B]Next page[/B] ({page + 2}/{-(-total // size)})", offscreen=True)
+    li.setProperty("IsFolder", "true")
+    li.setProperty("SpecialSort", "bottom")
+    return (f"{url}&page={page + 1}", li, True)
+
+def _ctx_templates(kind, allow_del):
+    """
+    Context menu entries for a folder listing as (label, url template) pairs;
+    only the quoted path is filled in per entry.
+    """
+    base = sys.argv[0]
+    delete = f"RunPlugin({base}?delete={{q}}&type=dir)" if kind == "dir" else f"RunPlugin({base}?delete={{q}})"
+    ctx = [("[COLOR lightblue]Move[/COLOR] to other location",
+            f"RunPlugin({base}?move={{q}}&type={kind})")]
+    # Met meer dan twee locaties in een sectie mag de gebruiker kiezen
+    if any(len(r) > 2 for r in get_router().sections.values()):
+        ctx.append(("[COLOR lightblue]Move to...[/COLOR]",
+                    f"RunPlugin({base}?moveto={{q}}&type={kind})"))
+    if allow_del:
+        ctx.append((f"[COLOR orange]Delete[/COLOR] {'folder' if kind == 'dir' else 'file'}", delete))
+    ctx.append(("[B]Batch[/B] [COLOR lightblue]Move[/COLOR]",
+                f"RunPlugin({base}?addtobatch={{q}}&action=move)"))
+    if allow_del:
+        ctx.append(("[B]Batch[/B] [COLOR orange]Delete[/COLOR]",
+                    f"RunPlugin({base}?addtobatch={{q}}&action=delete)"))
+    if kind == "dir":
+        ctx.append(("[B]Bulk[/B] select by filter...",
+                    f"RunPlugin({base}?bulkaction=1&path={{q}})"))
+    return ctx
+
+def list_batch(page=0):
+    rec = trace.begin("list_batch")
+    try:
+        _list_batch(page)
+    finally:
+        trace.end(rec, write=False)
+
+def _list_batch(page):
+    from .batch import get_store
+    store = get_store()
+    size  = page_size()
+    with trace.span("store.page"):
+        total = store.count()
+        bl    = store.page(page * size, size) if size else store.items()
+    media = f"special://home/addons/{addon_id}/resources/media"
+    items = []
 
     if not bl:
-        li = xbmcgui.ListItem(label="No items in batch list")
+        li = xbmcgui.ListItem(label="No items in batch list", offscreen=True)
         li.setProperty("IsPlayable", "false")
-        xbmcplugin.addDirectoryItem(handle, "", li, isFolder=False)
+        items.append(("", li, False))
     else:
         for item in bl:
             action, path = item['action'], item['path']
@@ -117,7 +204,7 @@ def list_batch():
             parent = os.path.basename(os.path.dirname(path))
             title  = f"{parent} – {base}"
 
-            if action == 'move':
+            if action in ('move', 'move_dir'):
                 location = get_move_destination(path)
                 thumb    = "batch_move.jpg"
                 label    = f"[COLOR lightblue]Move to {location}:[/COLOR] {title}"
@@ -126,105 +213,231 @@ def list_batch():
                 thumb    = "batch_delete.jpg"
                 label    = f"[COLOR orange]Delete from {location}:[/COLOR] {title}"
 
-            li = xbmcgui.ListItem(label=label)
+            li = xbmcgui.ListItem(label=label, offscreen=True)
             li.setProperty("IsFolder", "false")
             li.setProperty("IsPlayable", "false")
-            li.setArt({'thumb': f"special://home/addons/{addon_id}/resources/media/{thumb}"})
+            li.setArt({'thumb': f"{media}/{thumb}"})
 
             remove_url = f"{sys.argv[0]}?removefrombatch={urllib.parse.quote(path)}&action={action}"
             li.addContextMenuItems([("[B]Remove from Batch[/B]", f"RunPlugin({remove_url})")])
-            xbmcplugin.addDirectoryItem(handle, "", li, isFolder=False)
+            items.append(("", li, False))
+
+        if size and (page + 1) * size < total:
+            items.append(next_page_item(f"{sys.argv[0]}?section=batchlist", page, total, size))
 
-    proc = xbmcgui.ListItem(label="Batch Process")
-    proc_url = f"{sys.argv[0]}?processbatch=1"
-    proc.setArt({'thumb': f"special://home/addons/{addon_id}/resources/media/startbatch.jpg"})
+    proc = xbmcgui.ListItem(label=f"Batch Process ({total} items)", offscreen=True)
+    proc.setArt({'thumb': f"{media}/startbatch.jpg"})
     proc.setProperty("IsPlayable", "false")
-    xbmcplugin.addDirectoryItem(handle, proc_url, proc, isFolder=False)
+    items.append((f"{sys.argv[0]}?processbatch=1", proc, False))
 
-    xbmcplugin.endOfDirectory(handle)
+    with trace.span("ui.add_items"):
+        xbmcplugin.addDirectoryItems(_handle(), items, len(items))
+        xbmcplugin.endOfDirectory(_handle())
 
-def list_folder(path):
+def list_folder(path, page=0):
+    rec = trace.begin("list_folder")
     try:
-        dirs, files = xbmcvfs.listdir(path)
-        allow_del = addon.getSettingBool("allow_delete")
+        _list_folder(path, page)
+    finally:
+        trace.end(rec, {'path': path}, write=False)
 
-        for d in dirs:
-            fpath = os.path.join(path, d)
-            li = xbmcgui.ListItem(label=f"[{d}]")
-            li.setProperty("IsFolder", "true")
-            li.setPath(fpath)
-            url = f"{sys.argv[0]}?path={urllib.parse.quote(fpath)}"
-
-            thumb = get_thumbnail_for_path(path)
-            if thumb:
-                li.setArt({'thumb': thumb, 'icon': thumb})
-
-            try:
-                mtime = os.path.getmtime(xbmcvfs.translatePath(fpath))
-                date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
-            except:
-                date_str = ""
-            li.setInfo('video', {'title': d, 'date': date_str})
-
-            ctx = [
-                ("[COLOR lightblue]Move[/COLOR] to other location",
-                 f"RunPlugin({sys.argv[0]}?move={urllib.parse.quote(fpath)}&type=dir)")
-            ]
-            if allow_del:
-                ctx.append(("[COLOR orange]Delete[/COLOR] folder",
-                            f"RunPlugin({sys.argv[0]}?delete={urllib.parse.quote(fpath)}&type=dir)"))
-            ctx.append(("[B]Batch[/B] [COLOR lightblue]Move[/COLOR]",
-                        f"RunPlugin({sys.argv[0]}?addtobatch={urllib.parse.quote(fpath)}&action=move)"))
-            if allow_del:
-                ctx.append(("[B]Batch[/B] [COLOR orange]Delete[/COLOR]",
-                            f"RunPlugin({sys.argv[0]}?addtobatch={urllib.parse.quote(fpath)}&action=delete)"))
-            li.addContextMenuItems(ctx)
-            xbmcplugin.addDirectoryItem(handle, url, li, isFolder=True)
-
-        for f in files:
-            fpath = os.path.join(path, f)
-            li = xbmcgui.ListItem(label=f)
+def _list_folder(path, page):
+    try:
+        with trace.span("listing.get"):
+            listing = list_dir_cached(path)
+        allow_del = get_settings().allow_delete
+        quote = urllib.parse.quote
+        base = sys.argv[0]
+        select_ctx = ("[B]Batch[/B] select multiple...", f"RunPlugin({base}?batchselect={quote(path)})")
+        dir_ctx  = _ctx_templates("dir", allow_del)
+        file_ctx = _ctx_templates("file", allow_del)
+        dir_thumb = get_thumbnail_for_path(path)
+        srt_thumb = f"special://home/addons/{addon_id}/resources/media/srt.jpg"
+        # Mapgroottes komen uit de index: één query, geen extra I/O
+        dir_sizes = sizes.folder_sizes.children(path) if sizes.enabled() else {}
+
+        # Vooraf sorteren zodat pagina's over aanroepen heen consistent zijn
+        entries = ([(d, mtime, None) for d, mtime in sorted(listing['dirs'], key=lambda e: e[0].lower())] +
+                   sorted(listing['files'], key=lambda e: e[0].lower()))
+        size = page_size()
+        total = len(entries)
+        if size:
+            entries = entries[page * size:(page + 1) * size]
+
+        items = []
+        for name, mtime, fsize in entries:
+            fpath = os.path.join(path, name)
+            q = quote(fpath)
+            date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime)) if mtime else ""
+
+            if fsize is None:
+                li = xbmcgui.ListItem(label=f"[{name}]", offscreen=True)
+                li.setProperty("IsFolder", "true")
+                li.setPath(fpath)
+                if dir_thumb:
+                    li.setArt({'thumb': dir_thumb, 'icon': dir_thumb})
+                info = {'title': name, 'date': date_str}
+                known = dir_sizes.get(name)
+                if known:
+                    info['size'] = known.bytes
+                li.setInfo('video', info)
+                li.addContextMenuItems([(l, t.format(q=q)) for l, t in dir_ctx] + [select_ctx])
+                items.append((f"{base}?path={q}", li, True))
+                continue
+
+            li = xbmcgui.ListItem(label=name, offscreen=True)
             li.setPath(fpath)
-
-            if f.lower().endswith(('.nfo', '.txt', '.srt')):
+            is_folder = name.lower().endswith(('.nfo', '.txt', '.srt'))
+            if is_folder:
                 li.setProperty("IsPlayable", "false")
                 li.setProperty("IsFolder", "true")
-                thumb = f"special://home/addons/{addon_id}/resources/media/srt.jpg"
-                li.setArt({'thumb': thumb, 'icon': thumb})
+                li.setArt({'thumb': srt_thumb, 'icon': srt_thumb})
             else:
                 li.setProperty("IsPlayable", "true")
+            li.setInfo('video', {'title': name, 'date': date_str, 'size': fsize})
+            li.addContextMenuItems([(l, t.format(q=q)) for l, t in file_ctx] + [select_ctx])
+            items.append((fpath, li, is_folder))
+
+        if size and (page + 1) * size < total:
+            items.append(next_page_item(f"{base}?path={quote(path)}", page, total, size))
+        trace.add("ui.items", len(items))
 
-            try:
-                real = xbmcvfs.translatePath(fpath)
-                mtime = os.path.getmtime(real)
-                size = os.path.getsize(real)
-                date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
-            except:
-                size = 0
-                date_str = ""
-            li.setInfo('video', {'title': f, 'date': date_str, 'size': size})
-
-            ctx = [
-                ("[COLOR lightblue]Move[/COLOR] to other location",
-                 f"RunPlugin({sys.argv[0]}?move={urllib.parse.quote(fpath)}&type=file)")
-            ]
-            if allow_del:
-                ctx.append(("[COLOR orange]Delete[/COLOR] file",
-                            f"RunPlugin({sys.argv[0]}?delete={urllib.parse.quote(fpath)})"))
-            ctx.append(("[B]Batch[/B] [COLOR lightblue]Move[/COLOR]",
-                        f"RunPlugin({sys.argv[0]}?addtobatch={urllib.parse.quote(fpath)}&action=move)"))
-            if allow_del:
-                ctx.append(("[B]Batch[/B] [COLOR orange]Delete[/COLOR]",
-                            f"RunPlugin({sys.argv[0]}?addtobatch={urllib.parse.quote(fpath)}&action=delete)"))
-            li.addContextMenuItems(ctx)
-
-            is_folder = f.lower().endswith(('.nfo', '.txt', '.srt'))
-            xbmcplugin.addDirectoryItem(handle, fpath, li, isFolder=is_folder)
-
-        xbmcplugin.addSortMethod(handle, xbmcplugin.SORT_METHOD_LABEL)
-        xbmcplugin.setContent(handle, "videos")
-        xbmcplugin.endOfDirectory(handle)
+        with trace.span("ui.add_items"):
+            xbmcplugin.addDirectoryItems(_handle(), items, len(items))
+            xbmcplugin.addSortMethod(_handle(), xbmcplugin.SORT_METHOD_LABEL)
+            xbmcplugin.addSortMethod(_handle(), xbmcplugin.SORT_METHOD_SIZE)
+            xbmcplugin.setContent(_handle(), "videos")
+            xbmcplugin.endOfDirectory(_handle())
 
     except Exception as e:
         xbmcgui.Dialog().notification("Error", f"Cannot open folder:\n{e}",
                                       xbmcgui.NOTIFICATION_ERROR, 4000)
+
+def select_for_batch(path):
+    """
+    Let the user pick several entries of a folder and add them to the batch at once.
+    """
+    actions = ["move"]
+    if get_settings().allow_delete:
+        actions.append("delete")
+    from .batch import add_to_batch
+    choice = xbmcgui.Dialog().select("Batch action", [a.capitalize() for a in actions])
+    if choice < 0:
+        return
+    try:
+        dirs, files = xbmcvfs.listdir(path)
+    except:
+        return
+    names = [f"[{d}]" for d in dirs] + list(files)
+    picked = xbmcgui.Dialog().multiselect("Add to batch", names)
+    if not picked:
+        return
+    entries = list(dirs) + list(files)
+    add_to_batch([os.path.join(path, entries[i]) for i in picked], actions[choice])
+
+def find_duplicates():
+    """
+    Scan all library roots for duplicate files and offer to queue the
+    redundant copies as batch deletes.
+    """
+    from .dedup import DedupIndex
+    from .batch import add_to_batch
+    roots = sorted(get_router().roots)
+    if not roots:
+        return
+    index = DedupIndex(dedup_file)
+    dlg = xbmcgui.DialogProgress()
+    dlg.create("Find Duplicates", "Scanning libraries...")
+    try:
+        index.scan(roots,
+                   progress=lambda n, p: dlg.update(0, f"Scanning: {n} files\n{os.path.basename(p)}"),
+                   should_stop=dlg.iscanceled)
+        if dlg.iscanceled():
+            return
+        sets = index.duplicates(
+            progress=lambda i, n, p: dlg.update(int(100 * i / n), f"Comparing {i}/{n}\n{os.path.basename(p)}"),
+            should_stop=dlg.iscanceled)
+        if dlg.iscanceled():
+            return
+    finally:
+        dlg.close()
+
+    if not sets:
+        xbmcgui.Dialog().notification("Find Duplicates", "No duplicates found",
+                                      xbmcgui.NOTIFICATION_INFO, 3000)
+        return
+
+    # Per set de oudste kopie houden; de rest staat voorgeselecteerd
+    options, paths, preselect = [], [], []
+    for copies in sets:
+        for i, (path, size, mtime) in enumerate(copies):
+            loc = get_item_location(path)
+            options.append(f"[{loc}] {path} ({size / (1024**3):.2f} GB)")
+            paths.append((path, copies))
+            if i > 0:
+                preselect.append(len(options) - 1)
+    picked = xbmcgui.Dialog().multiselect("Queue duplicates for deletion", options, preselect=preselect)
+    if not picked:
+        return
+
+    chosen = {paths[i][0] for i in picked}
+    # Nooit alle kopieën van een bestand verwijderen
+    safe = [paths[i][0] for i in picked
+            if any(p not in chosen for p, _, _ in paths[i][1])]
+    if len(safe) < len(chosen):
+        xbmcgui.Dialog().notification("Find Duplicates", "Skipped sets where every copy was selected",
+                                      xbmcgui.NOTIFICATION_WARNING, 3000)
+    if safe:
+        add_to_batch(safe, "delete")
+
+def rebalance_storage():
+    """
+    Plan moves from internal to external storage until internal drives have
+    the configured amount free, and offer to queue them as batch moves.
+    """
+    from .rebalance import plan_rebalance, POLICY_NAMES, GB
+    from .batch import add_to_batch, get_store
+    s = get_settings()
+    policies = sorted(POLICY_NAMES)
+    choice = xbmcgui.Dialog().select("Rebalance Storage: move first",
+                                     [POLICY_NAMES[p] for p in policies],
+                                     preselect=policies.index(s.rebalance_policy)
+                                     if s.rebalance_policy in policies else 0)
+    if choice < 0:
+        return
+    target = max(0, s.rebalance_target_gb) * GB
+
+    # Wat al in de batch staat telt niet mee
+    queued = {item['path'] for item in get_store().items()}
+    dlg = xbmcgui.DialogProgress()
+    dlg.create("Rebalance Storage", "Measuring libraries...")
+    try:
+        plans = plan_rebalance(target, policies[choice], exclude=queued,
+                               progress=lambda p: dlg.update(0, f"Measuring\n{p}"),
+                               should_stop=dlg.iscanceled)
+        if dlg.iscanceled():
+            return
+    finally:
+        dlg.close()
+
+    picked = [c for p in plans for c in p.picked]
+    if not any(p.deficit for p in plans):
+        free = min((p.free for p in plans), default=0)
+        xbmcgui.Dialog().notification("Rebalance Storage", f"Already {free / GB:.1f} GB free",
+                                      xbmcgui.NOTIFICATION_INFO, 3000)
+        return
+    if not picked:
+        xbmcgui.Dialog().notification("Rebalance Storage", "Nothing fits on external storage",
+                                      xbmcgui.NOTIFICATION_WARNING, 3000)
+        return
+
+    total = sum(c.size for c in picked)
+    short = sum(max(0, p.deficit - p.total) for p in plans)
+    names = ", ".join(os.path.basename(c.path) for c in picked[:5])
+    if len(picked) > 5:
+        names += f" and {len(picked) - 5} more"
+    message = f"Move {len(picked)} items ({total / GB:.1f} GB) to external storage?\n{names}"
+    if short:
+        message += f"\n{short / GB:.1f} GB short of the target"
+    if xbmcgui.Dialog().yesno("Rebalance Storage", message):
+        add_to_batch([c.path for c in picked], "move")
@@ -0,0 +1,124 @@
+# modules/uievents.py
+
+import time
+import threading
+from collections import Counter
+import xbmc
+import xbmcgui
+
+from . import trace
+
+# Tijdens een batch hooguit één Container.Refresh per zoveel seconden
+REFRESH_INTERVAL = 5.0
+
+# en hooguit één samenvattende melding per zoveel seconden
+SUMMARY_INTERVAL = 10.0
+
+class Coalescer:
+    """
+    Collects refreshes and notifications while a batch runs. Refreshes are
+    rate-limited; info notifications are counted per heading and shown as
+    one periodic summary. flush() runs a refresh that is still pending.
+    """
+
+    def __init__(self):
+        self.lock         = threading.Lock()
+        self.last_refresh = 0.0
+        self.pending      = False
+        self.last_summary = time.monotonic()
+        self.counts       = Counter()
+        self.errors       = 0
+
+    def refresh(self):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.last_refresh < REFRESH_INTERVAL:
+                self.pending = True
+                trace.add("ui.refresh_coalesced")
+                return
+            self.last_refresh = now
+            self.pending = False
+        _refresh()
+
+    def notify(self, heading, message, icon, ms):
+        with self.lock:
+            if icon == xbmcgui.NOTIFICATION_ERROR:
+                self.errors += 1
+            else:
+                self.counts[heading] += 1
+            trace.add("ui.notification_coalesced")
+            now = time.monotonic()
+            if now - self.last_summary < SUMMARY_INTERVAL:
+                return
+            summary = self._take_summary(now)
+        if summary:
+            _notify("Batch", summary, xbmcgui.NOTIFICATION_INFO, 3000)
+
+    def _take_summary(self, now):
+        parts = [f"{h}: {n}" for h, n in sorted(self.counts.items())]
+        if self.errors:
+            parts.append(f"Errors: {self.errors}")
+        self.counts.clear()
+        self.errors = 0
+        self.last_summary = now
+        return ", ".join(parts)
+
+    def flush(self):
+        """
+        Run a pending refresh. Counted notifications are dropped: the batch
+        report that follows covers them.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, False
+            self.counts.clear()
+            self.errors = 0
+        if pending:
+            _refresh()
+
+_active = None
+
+def begin():
+    """
+    Start coalescing UI events for a batch; returns the Coalescer for end().
+    """
+    global _active
+    if _active is None:
+        _active = Coalescer()
+        return _active
+    return None
+
+def end(coalescer):
+    global _active
+    if coalescer is None:
+        return
+    if _active is coalescer:
+        _active = None
+    coalescer.flush()
+
+def _refresh():
+    with trace.span("ui.refresh"):
+        xbmc.executebuiltin('Container.Refresh')
+
+def _notify(heading, message, icon, ms):
+    with trace.span("ui.notification"):
+        xbmcgui.Dialog().notification(heading, message, icon, ms)
+
+def refresh():
+    """
+    Container.Refresh, rate-limited while a batch runs.
+    """
+    c = _active
+    if c is None:
+        _refresh()
+    else:
+        c.refresh()
+
+def notify(heading, message, icon=xbmcgui.NOTIFICATION_INFO, ms=2000):
+    """
+    Show a notification, or count it towards the periodic summary while a batch runs.
+    """
+    c = _active
+    if c is None:
+        _notify(heading, message, icon, ms)
+    else:
+        c.notify(heading, message, icon, ms)
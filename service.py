@@ -0,0 +1,4 @@
+from modules.service import BatchService
+
+if __name__ == "__main__":
+    BatchService().run()
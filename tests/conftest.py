@@ -0,0 +1,55 @@
+# tests/conftest.py
+"""
+Run the addon modules outside Kodi against the stand-ins in benchmarks/kodi.
+Every test starts with reset stand-ins and default settings.
+"""
+
+import os
+import sys
+import tempfile
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+
+# Profielmap vastleggen voordat modules/common.py zijn paden bepaalt
+_home = tempfile.mkdtemp(prefix='batchman-tests-')
+os.environ['KODI_PROFILE'] = os.path.join(_home, 'userdata')
+os.environ['KODI_HOME']    = os.path.join(_home, 'home')
+sys.path[:0] = [os.path.join(REPO, 'benchmarks', 'kodi'), REPO]
+
+@pytest.fixture(autouse=True)
+def kodi():
+    import xbmc, xbmcgui, xbmcplugin, xbmcvfs, xbmcaddon
+    from modules.settings import reload_settings
+    for m in (xbmc, xbmcgui, xbmcplugin, xbmcvfs):
+        m.reset()
+    xbmcvfs.MOUNTS.clear()
+    xbmcaddon.SETTINGS.clear()
+    reload_settings()
+    yield
+
+@pytest.fixture
+def configure():
+    """
+    Override addon settings for one test: configure(path1=..., verify_mode=2).
+    """
+    import xbmcaddon
+    from modules.settings import reload_settings
+    def apply(**overrides):
+        xbmcaddon.SETTINGS.update(overrides)
+        reload_settings()
+    return apply
+
+@pytest.fixture
+def library(tmp_path, configure):
+    """
+    Internal and external movie roots on the same disk, configured as path1/path2.
+    """
+    internal = tmp_path / 'int' / 'Movies'
+    external = tmp_path / 'ext' / 'Movies'
+    internal.mkdir(parents=True)
+    external.mkdir(parents=True)
+    configure(path1=str(internal), path2=str(external),
+              tvpath1=str(tmp_path / 'int' / 'TV'), tvpath2=str(tmp_path / 'ext' / 'TV'))
+    return internal, external
@@ -0,0 +1,92 @@
+# tests/test_batch.py
+
+import time
+import threading
+
+import xbmcgui
+import xbmcvfs
+
+from modules import batch
+
+def _queue(items, action):
+    batch.get_store().replace([])
+    batch.add_to_batch(items, action)
+
+def test_confirmation_prompts_never_overlap(tmp_path, configure, monkeypatch):
+    # Twee shares zijn twee apparaten; zonder "Yes to All" mag dat niet parallel
+    for share in ('a', 'b'):
+        (tmp_path / share).mkdir()
+        xbmcvfs.MOUNTS[f'smb://{share}/Movies'] = str(tmp_path / share)
+    configure(path1='smb://a/Movies', path2='smb://b/Movies', allow_delete=True)
+    paths = []
+    for share in ('a', 'b'):
+        for i in range(3):
+            (tmp_path / share / f'{i}.mkv').write_bytes(b'x')
+            paths.append(f'smb://{share}/Movies/{i}.mkv')
+    _queue(paths, 'delete')
+
+    lock, state = threading.Lock(), {'open': 0, 'peak': 0, 'asked': 0}
+    def yesno(self, heading, message, *args, **kwargs):
+        with lock:
+            state['open'] += 1
+            state['asked'] += 1
+            state['peak'] = max(state['peak'], state['open'])
+        time.sleep(0.05)
+        with lock:
+            state['open'] -= 1
+        return True
+    monkeypatch.setattr(xbmcgui.Dialog, 'yesno', yesno)
+
+    batch.run_batch(confirm_all=False)
+    assert state['asked'] == len(paths)
+    assert state['peak'] == 1
+
+def test_library_changes_know_folders_from_files(library, monkeypatch):
+    from modules import library as lib
+    internal, external = library
+    (internal / 'Film (1999)').mkdir()
+    (internal / 'Film (1999)' / 'Film.mkv').write_bytes(b'x')
+    (internal / 'Loose.mkv').write_bytes(b'x')
+    recorded = {}
+    record = lib.ChangeSet.record
+    def spy(self, path, action, dest=None, is_dir=True):
+        recorded[path] = is_dir
+        return record(self, path, action, dest, is_dir)
+    monkeypatch.setattr(lib.ChangeSet, 'record', spy)
+
+    _queue([str(internal / 'Film (1999)'), str(internal / 'Loose.mkv')], 'move')
+    batch.run_batch(confirm_all=True)
+    assert recorded == {str(internal / 'Film (1999)'): True, str(internal / 'Loose.mkv'): False}
+    assert (external / 'Film (1999)' / 'Film.mkv').exists() and (external / 'Loose.mkv').exists()
+
+def test_resumed_batch_keeps_the_planned_target(tmp_path, configure, monkeypatch):
+    from modules import fileops
+    from modules.throttle import Stopped
+    internal = tmp_path / 'int'
+    for share in ('nas', 'usb'):
+        (tmp_path / share).mkdir()
+        xbmcvfs.MOUNTS[f'smb://{share}/Movies'] = str(tmp_path / share)
+    # De map zelf gaat naar extern; een los .srt-bestand zou naar USB1 gaan
+    configure(path1=str(internal), path2='smb://nas/Movies',
+              extra_roots='movies|USB1|smb://usb/Movies', move_rules=r'\.srt$=USB1')
+    film = internal / 'Film'
+    film.mkdir(parents=True)
+    (film / 'Film.mkv').write_bytes(b'x' * 10)
+    (film / 'Film.srt').write_bytes(b'y')
+    _queue([str(film)], 'move')
+
+    move_item = fileops.move_item
+    def interrupted(path, *args, **kwargs):
+        if path.endswith('.srt'):
+            raise Stopped()
+        return move_item(path, *args, **kwargs)
+    monkeypatch.setattr(fileops, 'move_item', interrupted)
+    batch.run_batch(confirm_all=True)
+    assert batch.get_store().items() == [
+        {'path': str(film / 'Film.srt'), 'action': 'move', 'target': 'smb://nas/Movies'}]
+
+    monkeypatch.setattr(fileops, 'move_item', move_item)
+    batch.run_batch(confirm_all=True)
+    assert batch.get_store().count() == 0
+    assert (tmp_path / 'nas' / 'Film' / 'Film.srt').exists()
+    assert not (tmp_path / 'usb' / 'Film').exists()
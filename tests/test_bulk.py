@@ -0,0 +1,86 @@
+# tests/test_bulk.py
+
+import os
+import time
+
+import pytest
+
+from modules import bulk
+from modules.bulk import parse_filter, select
+
+MB = 1024 * 1024
+
+def test_parse_filter_terms():
+    f = parse_filter("ext:NFO,.srt size>1.5G age<30d type:file depth:2 '*Sample*' re:\\d{4}")
+    assert f.exts == ('.nfo', '.srt')
+    assert f.min_size == 1.5 * 1024 ** 3 and f.max_size is None
+    assert f.max_age == 30 * 86400 and f.min_age is None
+    assert f.kind == 'file' and f.depth == 2
+    assert f.names == ['*sample*']
+    assert f.regex.search("Film 1999")
+
+def test_parse_filter_orphans_means_files():
+    f = parse_filter("orphans")
+    assert f.orphans and f.kind == 'file'
+
+@pytest.mark.parametrize("text", ["", "   ", "size>10Q", "age>3x", "type:link", "depth:0",
+                                  "depth:x", "re:(", "colour:red", "'unclosed"])
+def test_parse_filter_rejects(text):
+    with pytest.raises(ValueError):
+        parse_filter(text)
+
+def _file(path, size, days=0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.truncate(size)
+    t = time.time() - days * 86400
+    os.utime(path, (t, t))
+
+@pytest.fixture
+def tree(tmp_path):
+    _file(tmp_path / 'Big' / 'big.mkv', 6 * MB)
+    _file(tmp_path / 'Big' / 'Extras' / 'sample.mkv', 2 * MB)
+    _file(tmp_path / 'Small' / 'small.mkv', 1 * MB, days=40)
+    _file(tmp_path / 'Small' / 'Nested' / 'huge.mkv', 9 * MB)
+    _file(tmp_path / 'Small' / 'Nested' / 'huge.nfo', 100)
+    _file(tmp_path / 'loose.srt', 100)
+    return tmp_path
+
+def _select(root, text):
+    return sorted((os.path.relpath(m.path, root), m.size, m.is_dir) for m in select(str(root), parse_filter(text)))
+
+def _counting(monkeypatch):
+    calls = []
+    scan = bulk.scan_dir
+    monkeypatch.setattr(bulk, 'scan_dir', lambda p: (calls.append(p), scan(p))[1])
+    return calls
+
+def test_folder_totals_in_one_pass(tree, monkeypatch):
+    calls = _counting(monkeypatch)
+    assert _select(tree, "type:dir size>7M") == [
+        ('Big', 8 * MB, True),
+        ('Small', 10 * MB + 100, True),
+    ]
+    # Elke map hooguit één keer gelezen
+    assert len(calls) == len(set(calls)) == 5
+
+def test_inner_matches_kept_when_folder_fails(tree):
+    assert _select(tree, "size>5M") == [
+        ('Big', 8 * MB, True),
+        ('Small', 10 * MB + 100, True),
+    ]
+    assert _select(tree, "depth:1 type:dir size>9M") == [('Small', 10 * MB + 100, True)]
+    # Small is te groot voor deze grens, zijn submap niet
+    assert _select(tree, "type:dir size>9M size<10M") == [('Small/Nested', 9 * MB + 100, True)]
+
+def test_age_uses_newest_file(tree):
+    assert _select(tree, "type:file age>30d") == [('Small/small.mkv', 1 * MB, False)]
+    assert _select(tree, "depth:1 type:dir age>30d") == []
+
+def test_folder_without_size_terms_is_not_walked(tree, monkeypatch):
+    calls = _counting(monkeypatch)
+    assert _select(tree, "depth:1 type:dir name:big") == [('Big', 0, True)]
+    assert calls == [str(tree)]
+
+def test_orphans(tree):
+    assert _select(tree, "orphans") == [('loose.srt', 100, False)]
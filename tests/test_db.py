@@ -0,0 +1,51 @@
+# tests/test_db.py
+
+import json
+import time
+import sqlite3
+
+from modules.db import Database, settled
+from modules.store import BatchStore
+from modules.cache import ListingCache
+
+class Notes(Database):
+    SCHEMA = "CREATE TABLE IF NOT EXISTS notes (text TEXT);"
+
+def test_database_opens_once_in_wal(tmp_path):
+    db = Notes(str(tmp_path / 'sub' / 'notes.db'))
+    conn = db._db()
+    assert db._db() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    conn.execute("INSERT INTO notes VALUES ('x')")
+
+def test_settled():
+    assert settled(time.time() - 60)
+    assert not settled(time.time())
+    assert not settled(None)
+
+def test_store_migrates_legacy_list(tmp_path):
+    legacy = tmp_path / 'batchlist.json'
+    legacy.write_text(json.dumps([{'path': '/a', 'action': 'move'}, {'path': '/b', 'action': 'delete'}]))
+    store = BatchStore(str(tmp_path / 'batch.db'), legacy_files=(str(legacy),))
+    assert store.items() == [{'path': '/a', 'action': 'move'}, {'path': '/b', 'action': 'delete'}]
+    assert not legacy.exists()
+
+def test_listing_cache_keyed_on_mtime(tmp_path):
+    cache = ListingCache(str(tmp_path / 'cache.db'))
+    cache.put('/movies', 100.0, {'dirs': [], 'files': [['a.mkv', 1.0, 5]]})
+    assert cache.get('/movies', 100.0) == {'dirs': [], 'files': [['a.mkv', 1.0, 5]]}
+    assert cache.get('/movies', 101.0) is None
+
+def test_store_adds_target_column(tmp_path):
+    path = tmp_path / 'old.db'
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE items (seq INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL, "
+                 "action TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'queued', UNIQUE (path, action))")
+    conn.execute("INSERT INTO items (path, action) VALUES ('/a', 'move')")
+    conn.commit()
+    conn.close()
+    store = BatchStore(str(path))
+    assert store.items() == [{'path': '/a', 'action': 'move'}]
+    store.replace([('/a', 'move', '/ext'), ('/b', 'delete')])
+    assert store.items() == [{'path': '/a', 'action': 'move', 'target': '/ext'},
+                             {'path': '/b', 'action': 'delete'}]
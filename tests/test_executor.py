@@ -0,0 +1,92 @@
+# tests/test_executor.py
+
+import time
+import threading
+from collections import Counter
+
+from modules.executor import run_ops
+
+class Tracker:
+    """
+    Worker that records how many ops run at once, per device and in total.
+    """
+
+    def __init__(self, delay=0.02):
+        self.lock    = threading.Lock()
+        self.delay   = delay
+        self.active  = Counter()
+        self.peak    = Counter()
+        self.total   = 0
+        self.maximum = 0
+        self.order   = []
+
+    def __call__(self, op):
+        name, devs = op
+        with self.lock:
+            self.order.append(name)
+            self.total += 1
+            self.maximum = max(self.maximum, self.total)
+            for d in devs:
+                self.active[d] += 1
+                self.peak[d] = max(self.peak[d], self.active[d])
+        time.sleep(self.delay)
+        with self.lock:
+            self.total -= 1
+            for d in devs:
+                self.active[d] -= 1
+        return True
+
+def devices(op):
+    return op[1]
+
+def test_one_op_per_device():
+    ops = [(f"a{i}", ('A',)) for i in range(4)] + [(f"b{i}", ('B',)) for i in range(4)]
+    t = Tracker()
+    results = run_ops(ops, t, devices, per_device=1)
+    assert [op for op, ok in results] == ops
+    assert all(ok for op, ok in results)
+    assert t.peak == {'A': 1, 'B': 1}
+    # Verschillende schijven lopen wel naast elkaar
+    assert t.maximum == 2
+
+def test_per_device_limit():
+    ops = [(f"a{i}", ('A',)) for i in range(6)]
+    t = Tracker()
+    run_ops(ops, t, devices, per_device=2)
+    assert t.peak['A'] == 2
+
+def test_move_holds_both_devices():
+    ops = [("move", ('A', 'B')), ("readA", ('A',)), ("readB", ('B',))]
+    t = Tracker()
+    run_ops(ops, t, devices, per_device=1)
+    assert t.peak == {'A': 1, 'B': 1}
+    assert t.order[0] == "move"
+
+def test_workers_one_is_sequential():
+    ops = [(f"{d}{i}", (d,)) for i in range(3) for d in "ABC"]
+    t = Tracker()
+    results = run_ops(ops, t, devices, per_device=2, workers=1)
+    assert t.maximum == 1
+    assert t.order == [op[0] for op in ops]
+    assert len(results) == len(ops)
+
+def test_failures_and_on_done():
+    done = []
+    def worker(op):
+        if op[0] == "bad":
+            raise OSError("disk gone")
+        return op[0] != "no"
+    ops = [("ok", ('A',)), ("bad", ('A',)), ("no", ('B',))]
+    results = run_ops(ops, worker, devices, on_done=lambda op, ok: done.append((op[0], ok)))
+    assert results == [(ops[0], True), (ops[1], False), (ops[2], False)]
+    assert sorted(done) == [("bad", False), ("no", False), ("ok", True)]
+
+def test_should_stop_skips_remaining():
+    started = []
+    def worker(op):
+        started.append(op)
+        return True
+    ops = [(f"a{i}", ('A',)) for i in range(5)]
+    results = run_ops(ops, worker, devices, should_stop=lambda: len(started) >= 2)
+    assert len(results) < len(ops)
+    assert [op for op, ok in results] == ops[:len(results)]
@@ -0,0 +1,98 @@
+# tests/test_fileops.py
+
+import os
+
+import xbmcvfs
+
+from modules import batch, fileops
+
+def test_delete_dir_does_not_follow_symlinks(tmp_path):
+    keep = tmp_path / 'keep'
+    keep.mkdir()
+    (keep / 'important.mkv').write_bytes(b'x')
+    folder = tmp_path / 'Film'
+    (folder / 'sub').mkdir(parents=True)
+    (folder / 'film.mkv').write_bytes(b'x')
+    os.symlink(keep, folder / 'linked')
+    os.symlink(keep / 'important.mkv', folder / 'sub' / 'file-link.mkv')
+
+    fileops.delete_dir(str(folder))
+    assert not folder.exists()
+    assert (keep / 'important.mkv').exists()
+
+def test_symlinked_folder_is_removed_as_a_link(tmp_path):
+    keep = tmp_path / 'keep'
+    keep.mkdir()
+    (keep / 'important.mkv').write_bytes(b'x')
+    os.symlink(keep, tmp_path / 'Film')
+
+    fileops.delete_dir(str(tmp_path / 'Film'))
+    assert not os.path.lexists(tmp_path / 'Film')
+    assert (keep / 'important.mkv').exists()
+
+def test_walk_survives_symlink_loop(tmp_path):
+    (tmp_path / 'a').mkdir()
+    os.symlink(tmp_path, tmp_path / 'a' / 'loop')
+    entries = list(fileops.walk(str(tmp_path)))
+    assert sorted(os.path.relpath(e.path, tmp_path) for e in entries) == ['a', 'a/loop']
+    loop = next(e for e in entries if e.name == 'loop')
+    assert not loop.is_dir
+
+def test_share_file_is_not_a_folder(tmp_path, configure):
+    xbmcvfs.MOUNTS['smb://nas/Movies'] = str(tmp_path)
+    (tmp_path / 'Film').mkdir()
+    (tmp_path / 'Film' / 'film.mkv').write_bytes(b'x')
+    assert fileops.stat_path('smb://nas/Movies/Film/film.mkv').is_dir is False
+    assert fileops.stat_path('smb://nas/Movies/Film').is_dir is True
+    assert fileops.stat_path('smb://nas/Movies/missing.mkv') is None
+
+def test_batch_delete_on_share(tmp_path, configure):
+    xbmcvfs.MOUNTS['smb://nas/Movies'] = str(tmp_path)
+    configure(path1='smb://nas/Movies', path2=str(tmp_path / 'other'), allow_delete=True)
+    (tmp_path / 'film.mkv').write_bytes(b'x')
+    batch.get_store().replace([])
+    batch.add_to_batch(['smb://nas/Movies/film.mkv'], 'delete')
+    batch.run_batch(confirm_all=True)
+    assert not (tmp_path / 'film.mkv').exists()
+
+def _source(tmp_path, mb):
+    src = tmp_path / 'src' / 'film.mkv'
+    src.parent.mkdir()
+    src.write_bytes(os.urandom(mb * 1024 * 1024))
+    return src
+
+def test_copy_checkpoints_instead_of_syncing_every_chunk(tmp_path, configure, monkeypatch):
+    configure(copy_buffer_mb=1)
+    src = _source(tmp_path, 8)
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: (synced.append(fd), real_fsync(fd)))
+    monkeypatch.setattr(fileops, 'CHECKPOINT_BYTES', 4 * 1024 * 1024)
+    monkeypatch.setattr(fileops, 'CHECKPOINT_SECONDS', 3600)
+
+    dst = tmp_path / 'dst' / 'film.mkv'
+    assert fileops.copy_file(str(src), str(dst))
+    assert dst.read_bytes() == src.read_bytes()
+    assert not os.path.exists(str(dst) + fileops.PARTIAL_SUFFIX)
+    # Start, twee checkpoints (data + journaal) en de laatste data-fsync
+    assert len(synced) == 1 + 2 * 2 + 1
+
+def test_interrupted_copy_resumes_from_checkpoint(tmp_path, configure, monkeypatch):
+    configure(copy_buffer_mb=1)
+    src = _source(tmp_path, 6)
+    monkeypatch.setattr(fileops, 'CHECKPOINT_BYTES', 2 * 1024 * 1024)
+    dst = tmp_path / 'dst' / 'film.mkv'
+
+    def stop_at_5mb(done, total):
+        if done >= 5 * 1024 * 1024:
+            raise KeyboardInterrupt
+    assert not fileops.copy_file(str(src), str(dst), stop_at_5mb)
+    state = fileops.read_partial(str(dst))
+    assert state['offset'] == 4 * 1024 * 1024
+    # Het journaal blijft verborgen voor lijsten, dedup en bulkselectie
+    assert [e.name for e in fileops.scan_dir(str(dst.parent))] == ['film.mkv']
+
+    starts = []
+    assert fileops.copy_file(str(src), str(dst), lambda done, total: starts.append(done))
+    assert starts[0] == 4 * 1024 * 1024
+    assert dst.read_bytes() == src.read_bytes()
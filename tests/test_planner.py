@@ -0,0 +1,86 @@
+# tests/test_planner.py
+
+import os
+
+import pytest
+
+from modules import batch, planner
+from modules.planner import Group, expand_item, plan_capacity
+from modules.router import get_router
+
+def test_missing_destination_root_fails_the_move(library):
+    internal, external = library
+    os.rmdir(external)
+    film = internal / 'Film'
+    film.mkdir()
+    (film / 'film.mkv').write_bytes(b'x')
+    (internal / 'single.mkv').write_bytes(b'x')
+
+    g = expand_item({'path': str(film), 'action': 'move'})
+    assert g.dst_dev is None
+    assert all(action != 'move_dir' for _, action in g.ops)
+
+    batch.get_store().replace([])
+    batch.add_to_batch([str(film), str(internal / 'single.mkv')], 'move')
+    batch.run_batch(confirm_all=True)
+    assert (film / 'film.mkv').exists() and (internal / 'single.mkv').exists()
+    assert not external.exists()
+
+INT, EXT = '/int/Movies', '/ext/Movies'
+
+@pytest.fixture
+def disks(configure, monkeypatch):
+    """
+    Two simulated devices, 'int' and 'ext'; set their free bytes in the dict.
+    """
+    configure(path1=INT, path2=EXT, free_space_reserve_mb=0)
+    free = {}
+    monkeypatch.setattr(planner, 'existing_parent', lambda path: path)
+    monkeypatch.setattr(planner, 'get_free_space', lambda path: free.get(path.split('/')[1]))
+    return free
+
+def _group(path, action, size):
+    dev = path.split('/')[1]
+    dst = {'int': 'ext', 'ext': 'int'}[dev] if action == 'move' else None
+    target = get_router().target(path) if action == 'move' else None
+    ops = [(path, action)]
+    return Group({'path': path, 'action': action}, ops, size, dev, dst, set(), {}, target, False)
+
+def _names(groups):
+    return [g.item['path'].rsplit('/', 1)[1] for g in groups]
+
+def test_deletes_run_first_and_make_room(disks):
+    disks.update(int=0, ext=100)
+    groups = [_group(f'{EXT}/in.mkv', 'move', 5), _group(f'{INT}/old.mkv', 'delete', 8)]
+    scheduled, deferred = plan_capacity(groups)
+    assert _names(scheduled) == ['old.mkv', 'in.mkv'] and deferred == []
+
+    scheduled, deferred = plan_capacity(groups[:1])
+    assert scheduled == [] and _names(deferred) == ['in.mkv']
+
+def test_move_out_makes_room_for_move_in(disks):
+    disks.update(int=2, ext=2)
+    groups = [_group(f'{EXT}/big.mkv', 'move', 4), _group(f'{INT}/small.mkv', 'move', 2)]
+    scheduled, deferred = plan_capacity(groups)
+    # Groot eerst past niet; na de kleine verhuizing wel
+    assert _names(scheduled) == ['small.mkv', 'big.mkv'] and deferred == []
+
+def test_largest_first_within_a_pass(disks):
+    disks.update(int=0, ext=100)
+    groups = [_group(f'{INT}/{n}.mkv', 'move', s) for n, s in (('a', 1), ('b', 30), ('c', 5))]
+    scheduled, _ = plan_capacity(groups)
+    assert _names(scheduled) == ['b.mkv', 'c.mkv', 'a.mkv']
+
+def test_reserve_is_kept_free(disks):
+    disks.update(int=0, ext=10)
+    groups = [_group(f'{INT}/a.mkv', 'move', 6), _group(f'{INT}/b.mkv', 'move', 3)]
+    scheduled, deferred = plan_capacity(groups, reserve=2)
+    # 6 laat 4 over, daarna zou 3 onder de reserve van 2 zakken
+    assert _names(scheduled) == ['a.mkv'] and _names(deferred) == ['b.mkv']
+    scheduled, deferred = plan_capacity(groups, reserve=1)
+    assert deferred == []
+
+def test_unknown_free_space_does_not_block(disks):
+    disks.update(int=0)
+    scheduled, deferred = plan_capacity([_group(f'{INT}/a.mkv', 'move', 50)])
+    assert _names(scheduled) == ['a.mkv'] and deferred == []
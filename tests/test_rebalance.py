@@ -0,0 +1,52 @@
+# tests/test_rebalance.py
+
+import random
+
+import pytest
+
+from modules import rebalance
+from modules.rebalance import Candidate, select
+
+GB = 1024 ** 3
+
+def _cands(*sizes):
+    return [Candidate(f"/m/{i}", s, i, 0, f"/x/{i}", "ext") for i, s in enumerate(sizes)]
+
+def _sizes(picked):
+    return [c.size for c in picked]
+
+def test_nothing_needed():
+    assert select(_cands(5, 6), 0) == []
+    assert select([], 10) == []
+
+def test_not_enough_takes_everything():
+    assert _sizes(select(_cands(3, 4), 10)) == [3, 4]
+
+def test_exact_prefix_is_kept():
+    assert _sizes(select(_cands(4, 6, 1), 10)) == [4, 6]
+
+def test_smallest_cover_within_prefix():
+    # Voorvoegsel 6+3+5; 6+5 dekt ook en verplaatst minder
+    assert _sizes(select(_cands(6, 3, 5), 10)) == [6, 5]
+
+def test_never_reaches_past_prefix():
+    # 10 alleen zou volstaan, maar het beleid zet hem achter het voorvoegsel
+    assert _sizes(select(_cands(6, 3, 5, 10), 10)) == [6, 5]
+
+def test_large_prefix_falls_back_to_greedy(monkeypatch):
+    monkeypatch.setattr(rebalance, 'DP_MAX_ITEMS', 2)
+    assert _sizes(select(_cands(6, 3, 5), 10)) == [6, 3, 5]
+
+def test_rounding_keeps_a_true_cover():
+    rng = random.Random(7)
+    for _ in range(200):
+        sizes = [rng.randrange(1, 50 * GB) for _ in range(rng.randrange(1, 40))]
+        need  = rng.randrange(1, sum(sizes) + 1)
+        cands = _cands(*sizes)
+        picked = select(cands, need)
+        prefix = next(cands[:i] for i in range(1, len(cands) + 1) if sum(sizes[:i]) >= need)
+        assert sum(_sizes(picked)) >= need
+        assert sum(_sizes(picked)) <= sum(_sizes(prefix))
+        assert set(picked) <= set(prefix)
+        # Volgorde van het beleid blijft behouden
+        assert picked == [c for c in prefix if c in picked]
@@ -0,0 +1,71 @@
+# tests/test_router.py
+
+from modules.router import PathRouter, parse_roots, parse_move_rules, get_router
+
+PAIRS = [
+    ("movies",  "/storage/Movies",    "smb://nas/Movies"),
+    ("movies",  "/storage/Movies 4K", "smb://nas/UHD"),
+    ("tvshows", "/storage/TV",        "smb://nas/TV"),
+]
+
+def _router(named=(), rules=""):
+    return PathRouter(PAIRS, named, parse_move_rules(rules))
+
+def test_longest_prefix_wins():
+    r = _router()
+    assert r.lookup("/storage/Movies/Film (1999)/Film.mkv").path == "/storage/Movies"
+    assert r.lookup("/storage/Movies 4K/Film (1999)").path == "/storage/Movies 4K"
+    assert r.lookup("smb://nas/UHD/Film.mkv").side == "external"
+    assert r.lookup("/storage/Movies").path == "/storage/Movies"
+
+def test_prefix_needs_whole_components():
+    r = _router()
+    assert r.lookup("/storage/Moviesextra/Film.mkv") is None
+    assert r.lookup("/storage") is None
+    assert r.lookup("") is None
+
+def test_nested_root_inside_another():
+    r = PathRouter(PAIRS + [("music", "/storage/Movies/Soundtracks", "smb://nas/Music")])
+    assert r.lookup("/storage/Movies/Soundtracks/a.flac").section == "music"
+    assert r.lookup("/storage/Movies/Film.mkv").section == "movies"
+
+def test_counterpart_keeps_relative_path():
+    r = _router()
+    assert r.counterpart("/storage/Movies 4K/Film/Film.mkv") == "smb://nas/UHD/Film/Film.mkv"
+    assert r.counterpart("smb://nas/TV/Show/S01") == "/storage/TV/Show/S01"
+    assert r.counterpart("/elsewhere/Film.mkv") is None
+
+def test_named_roots_and_rules():
+    named = [("movies", "USB1", "/media/usb1/Movies")]
+    r = _router(named, rules="2160p|4K=NAS;remux=usb1")
+    # 'NAS' bestaat niet als naam; de regel wordt overgeslagen
+    assert r.target("/storage/Movies/Film 2160p.mkv").path == "smb://nas/Movies"
+    assert r.target("/storage/Movies/Film REMUX.mkv").name == "USB1"
+    assert r.counterpart("/storage/Movies/Film REMUX.mkv") == "/media/usb1/Movies/Film REMUX.mkv"
+    # Een benoemde root verhuist terug naar de interne map van zijn sectie
+    assert r.target("/media/usb1/Movies/Film.mkv").path == "/storage/Movies"
+    # Regels gelden alleen voor interne opslag
+    assert r.target("smb://nas/Movies/Film REMUX.mkv").path == "/storage/Movies"
+    # Alle andere roots van de sectie, ook het tweede paar
+    assert {t.path for t in r.targets("/storage/Movies/x")} == {
+        "smb://nas/Movies", "/storage/Movies 4K", "smb://nas/UHD", "/media/usb1/Movies"}
+    assert r.targets("/storage/TV/Show") == [r.lookup("smb://nas/TV")]
+
+def test_named_root_without_home_is_dropped():
+    r = _router([("music", "USB1", "/media/usb1/Music")])
+    assert r.lookup("/media/usb1/Music/a.flac") is None
+
+def test_parse_roots_and_rules():
+    pairs, named = parse_roots("movies|/a|smb://b ; movies|NAS|smb://nas/M; broken|x; tv||/c")
+    assert pairs == [("movies", "/a", "smb://b")]
+    assert named == [("movies", "NAS", "smb://nas/M")]
+    rules = parse_move_rules("2160p=NAS; (=USB; noname=; *=USB1")
+    assert [r.target for r in rules] == ["NAS", "USB1"]
+    assert rules[1].pattern.search("anything")
+
+def test_router_follows_settings(configure):
+    configure(path1="/storage/Movies", path2="smb://nas/Movies",
+              extra_roots="movies|USB1|/media/usb1/Movies", move_rules="*=USB1")
+    assert get_router().target("/storage/Movies/Film.mkv").name == "USB1"
+    configure(move_rules="")
+    assert get_router().target("/storage/Movies/Film.mkv").name == "External"